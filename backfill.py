@@ -0,0 +1,139 @@
+"""
+Récupération en arrière-plan des messages source manqués (trous dans la numérotation des jeux)
+"""
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+TELEGRAM_MAX_IDS = 100 # Nombre maximal d'ids par appel get_messages
+
+class GapBackfiller:
+    """
+    File de plages d'ids de messages à récupérer. Les plages adjacentes ou
+    qui se chevauchent sont fusionnées, chaque plage est récupérée par lots
+    (`fetch(ids)` -> messages) puis chaque message est passé à `handle(message)`.
+    Au plus `max_concurrency` lots sont en vol simultanément. Un lot dont la
+    récupération échoue est remis en file, au plus `max_retries` fois par id.
+    """
+
+    def __init__(self, fetch, handle, max_concurrency: int = 2, remember: int = 2000,
+                 max_retries: int = 3, retry_delay: float = 1.0):
+        self.fetch = fetch
+        self.handle = handle
+        self.max_concurrency = max_concurrency
+        self.remember = remember
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self._ranges = []  # [(début, fin)] inclusives, triées et disjointes
+        self._seen = set()  # Ids déjà traités (en direct ou récupérés)
+        self._in_flight = set()  # Ids des lots en cours de récupération
+        self._failures = {}  # Id -> échecs de récupération
+        self._workers = set()
+        self.fetched = 0
+        self.abandoned = 0 # Ids abandonnés après max_retries échecs
+
+    def mark_seen(self, message_id: int):
+        """Signale un message reçu en direct (il ne sera pas récupéré)."""
+        self._seen.add(message_id)
+        self._forget_old()
+
+    def _forget_old(self):
+        if len(self._seen) > self.remember:
+            for old_id in sorted(self._seen)[:self.remember // 2]:
+                self._seen.discard(old_id)
+
+    @property
+    def pending(self) -> int:
+        return sum(end - start + 1 for start, end in self._ranges)
+
+    def request(self, start: int, end: int):
+        """Ajoute la plage d'ids [start, end] et démarre des workers si besoin (non bloquant)."""
+        if end < start:
+            return
+        self._add_range(start, end)
+        while len(self._workers) < self.max_concurrency and self._ranges:
+            task = asyncio.create_task(self._worker())
+            self._workers.add(task)
+            task.add_done_callback(self._workers.discard)
+
+    def _add_range(self, start: int, end: int):
+        merged = []
+        for r_start, r_end in self._ranges:
+            if r_end + 1 < start or end + 1 < r_start:
+                merged.append((r_start, r_end))
+            else:
+                start, end = min(start, r_start), max(end, r_end)
+        merged.append((start, end))
+        merged.sort()
+        self._ranges = merged
+
+    def _next_batch(self):
+        """Retire jusqu'à TELEGRAM_MAX_IDS ids non encore vus de la première plage."""
+        while self._ranges:
+            start, end = self._ranges[0]
+            batch_end = min(end, start + TELEGRAM_MAX_IDS - 1)
+            if batch_end == end:
+                self._ranges.pop(0)
+            else:
+                self._ranges[0] = (batch_end + 1, end)
+            ids = [i for i in range(start, batch_end + 1) if i not in self._seen and i not in self._in_flight]
+            if ids:
+                return ids
+        return None
+
+    async def _worker(self):
+        while True:
+            ids = self._next_batch()
+            if ids is None:
+                return
+            self._in_flight.update(ids)
+            try:
+                messages = await self.fetch(ids)
+            except Exception as e:
+                self._in_flight.difference_update(ids)
+                retry = self._record_failure(ids)
+                logger.error(
+                    "Erreur récupération des messages manqués %s-%s (%s ids remis en file): %s",
+                    ids[0], ids[-1], len(retry), e
+                )
+                if retry:
+                    await asyncio.sleep(self.retry_delay)
+                    self._requeue(retry)
+                continue
+            self._in_flight.difference_update(ids)
+            for message_id in ids:
+                self._failures.pop(message_id, None)
+            self._seen.update(ids)
+            self._forget_old()
+            for message in messages:
+                if message is None:
+                    continue
+                self.fetched += 1
+                try:
+                    await self.handle(message)
+                except Exception:
+                    logger.exception("Erreur traitement d'un message récupéré")
+
+    def _record_failure(self, ids: list) -> list:
+        """Compte un échec pour chaque id et retourne ceux qui ont encore droit à un essai."""
+        retry = []
+        for message_id in ids:
+            failures = self._failures.get(message_id, 0) + 1
+            if failures > self.max_retries:
+                self._failures.pop(message_id, None)
+                self.abandoned += 1
+            else:
+                self._failures[message_id] = failures
+                retry.append(message_id)
+        return retry
+
+    def _requeue(self, ids: list):
+        """Remet en file les ids (triés) par plages contiguës."""
+        start = previous = ids[0]
+        for message_id in ids[1:]:
+            if message_id != previous + 1:
+                self._add_range(start, previous)
+                start = message_id
+            previous = message_id
+        self._add_range(start, previous)
@@ -0,0 +1,248 @@
+"""
+Simulation des règles de prédiction et de vérification sur les jeux de l'archive (/simulate)
+
+`run_backtest` s'exécute dans un processus du pool de simulation: il ne lit que
+l'archive (mmap, sans copie) et n'importe rien du bot. L'annulation passe par un
+tableau d'indicateurs partagé, hérité par les processus du pool à leur création.
+
+Les processus du pool sont créés par fork: `start_pool()` doit être appelé avant
+que le processus du bot n'ait d'autre thread (journalisation, asyncio.to_thread),
+sinon un processus du pool pourrait hériter d'un verrou tenu par un de ces threads.
+"""
+import os
+import asyncio
+import signal
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from time import monotonic
+
+from frequency_model import FrequencyModel
+from game_archive import ArchiveView
+
+CHECK_EVERY = 256 # Jeux simulés entre deux vérifications d'annulation et de délai
+
+# Règle de parité (get_predicted_suit de main.py) sur les codes couleur ♥=0, ♠=1, ♦=2, ♣=3:
+# jeu pair ♠<->♣ et ♥<->♦, jeu impair ♠<->♥ et ♦<->♣
+PARITY_MAPPING = (
+    (2, 3, 0, 1),  # Pair
+    (1, 0, 3, 2),  # Impair
+)
+
+_cancel_flags = None # Indicateur par emplacement de simulation (1 = annulée)
+
+def init_worker(cancel_flags):
+    """Initialiseur des processus du pool."""
+    global _cancel_flags
+    _cancel_flags = cancel_flags
+    # Processus créé par fork depuis le bot: ses signaux ne doivent pas réveiller la boucle du bot
+    signal.set_wakeup_fd(-1)
+    for signum in (signal.SIGTERM, signal.SIGHUP):
+        signal.signal(signum, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # Priorité basse: sur une machine à un seul cœur, le bot garde la main sur le processeur
+    try:
+        os.nice(10)
+    except (AttributeError, OSError):
+        pass
+
+def run_backtest(archive_dir: str, games: int, a_offset: int, r_offset: int, gaps: list,
+                 predictor: str = 'parity', frequency_window: int = 2000, frequency_min_samples: int = 20,
+                 timeout: float = 120.0, slot: int = None) -> dict:
+    """
+    Rejoue les `games` derniers jeux archivés avec la configuration donnée
+    (/a, /r, /ec; le blocage /time, lié à l'heure, n'est pas simulé). Retourne
+    les compteurs de résultats; `status` vaut 'done', 'cancelled' ou 'timeout'
+    (résultats partiels dans les deux derniers cas).
+    """
+    started = monotonic()
+    deadline = started + timeout
+    result = {
+        'status': 'done', 'games': 0, 'first_game': None, 'last_game': None,
+        'predictions': 0, 'wins': 0, 'losses': 0, 'unresolved': 0,
+        'wins_by_attempt': [0] * (r_offset + 1), 'max_loss_streak': 0,
+    }
+    model = FrequencyModel(frequency_window, frequency_min_samples) if predictor == 'frequency' else None
+    pending = {} # Jeu cible -> code couleur prédite
+    current_game = 0
+    ec_first_trigger_done = False
+    ec_gap_index = 0
+    ec_last_source_game = 0
+    loss_streak = 0
+
+    with ArchiveView(archive_dir) as view:
+        columns = view.columns
+        game_col, value_col, suit_col, mask_col = (
+            columns['game'], columns['g2_value'], columns['g2_suit'], columns['g1_mask']
+        )
+        start = max(0, len(view) - games)
+        for row in range(start, len(view)):
+            if (row - start) % CHECK_EVERY == 0:
+                if _cancel_flags is not None and slot is not None and _cancel_flags[slot]:
+                    result['status'] = 'cancelled'
+                    break
+                if monotonic() > deadline:
+                    result['status'] = 'timeout'
+                    break
+
+            game = game_col[row]
+            if game < current_game:
+                # Nouvelle journée (numéros repartis de 1): les prédictions en cours ne seront jamais vérifiées
+                result['unresolved'] += len(pending)
+                pending.clear()
+            if result['first_game'] is None:
+                result['first_game'] = game
+            result['last_game'] = game
+            result['games'] += 1
+
+            # --- Prédiction (message en cours du jeu) ---
+            current_game = game
+            suit = suit_col[row]
+            if suit >= 0:
+                predicted = PARITY_MAPPING[game % 2][suit]
+                if model is not None:
+                    model.observe_context(game, suit, value_col[row])
+                    code = model.predict(suit, game, value_col[row], a_offset)
+                    if code >= 0:
+                        predicted = code
+
+                should_trigger = True
+                if gaps:
+                    if not ec_first_trigger_done:
+                        ec_last_source_game = game
+                        ec_first_trigger_done = True
+                    elif game >= ec_last_source_game + gaps[ec_gap_index]:
+                        ec_gap_index = (ec_gap_index + 1) % len(gaps)
+                        ec_last_source_game = game
+                    else:
+                        should_trigger = False
+
+                target = game + a_offset
+                if should_trigger and target not in pending and target > current_game:
+                    pending[target] = predicted
+                    result['predictions'] += 1
+
+            # --- Vérification (jeu finalisé) ---
+            mask = mask_col[row]
+            if model is not None:
+                model.observe_result(game, mask, (a_offset,))
+            for target, predicted in list(pending.items()):
+                if not target <= game <= target + r_offset:
+                    continue
+                if mask & (1 << predicted):
+                    result['wins'] += 1
+                    result['wins_by_attempt'][game - target] += 1
+                    loss_streak = 0
+                    del pending[target]
+                elif game == target + r_offset:
+                    result['losses'] += 1
+                    loss_streak += 1
+                    result['max_loss_streak'] = max(result['max_loss_streak'], loss_streak)
+                    del pending[target]
+
+    result['unresolved'] += len(pending)
+    resolved = result['wins'] + result['losses']
+    result['hit_rate'] = result['wins'] / resolved if resolved else 0.0
+    result['elapsed'] = monotonic() - started
+    return result
+
+class SimulationJob:
+    __slots__ = ('id', 'owner', 'params', 'slot', 'future', 'cancelled', 'created_at')
+
+    def __init__(self, job_id: int, owner: str, params: dict, slot: int):
+        self.id = job_id
+        self.owner = owner # Bot qui a lancé la simulation
+        self.params = params # Arguments de run_backtest
+        self.slot = slot
+        self.future = None # concurrent.futures.Future du pool
+        self.cancelled = False
+        self.created_at = monotonic()
+
+    @property
+    def running(self) -> bool:
+        return self.future is not None and self.future.running()
+
+class SimulationRunner:
+    """
+    Pool de processus des simulations, au plus `max_jobs` simulations en file
+    ou en cours. Les processus sont créés une fois pour toutes par `start_pool()`;
+    la soumission se fait dans un thread: la boucle asyncio n'attend que le résultat.
+    """
+
+    def __init__(self, workers: int = 1, max_jobs: int = 4, timeout: float = 120.0):
+        self.workers = workers
+        self.max_jobs = max_jobs
+        self.timeout = timeout
+        self.jobs = {} # Id -> SimulationJob
+        self._pool = None
+        self._flags = None
+        self._next_id = 1
+
+    def start_pool(self):
+        """
+        Crée tous les processus du pool, au chargement du bot: avant le premier
+        thread (voir l'en-tête du module), et le fork d'un processus encore petit
+        est rapide. Le pool n'est jamais recréé ensuite.
+        """
+        if self._pool is None:
+            # fork: les processus n'ont pas à réimporter main.py (spawn et forkserver relancent le module du bot)
+            context = multiprocessing.get_context('fork' if 'fork' in multiprocessing.get_all_start_methods() else None)
+            self._flags = context.RawArray('b', self.max_jobs)
+            self._pool = ProcessPoolExecutor(
+                self.workers, mp_context=context, initializer=init_worker, initargs=(self._flags,)
+            )
+            # Avec fork, la première soumission crée tous les processus (depuis ce thread)
+            self._pool.submit(int).result()
+
+    @property
+    def available(self) -> bool:
+        return self._pool is not None
+
+    def _submit(self, job: SimulationJob):
+        if self._pool is None:
+            raise RuntimeError("pool de simulation non démarré ou arrêté")
+        self._flags[job.slot] = 1 if job.cancelled else 0
+        return self._pool.submit(run_backtest, **job.params, timeout=self.timeout, slot=job.slot)
+
+    def create(self, owner: str, **params) -> SimulationJob:
+        """Réserve une simulation (None si `max_jobs` sont déjà en file ou en cours)."""
+        used = {job.slot for job in self.jobs.values()}
+        free = [slot for slot in range(self.max_jobs) if slot not in used]
+        if not free:
+            return None
+        job = SimulationJob(self._next_id, owner, params, free[0])
+        self._next_id += 1
+        self.jobs[job.id] = job
+        return job
+
+    async def run(self, job: SimulationJob):
+        """
+        Exécute la simulation dans le pool et retourne ses résultats (None si
+        elle a été annulée avant de démarrer).
+        """
+        try:
+            if job.cancelled:
+                return None
+            job.future = await asyncio.to_thread(self._submit, job)
+            return await asyncio.wrap_future(job.future)
+        except asyncio.CancelledError:
+            if job.future is not None and job.future.cancelled():
+                return None # Retirée de la file par cancel()
+            self.cancel(job)
+            raise
+        finally:
+            self.jobs.pop(job.id, None)
+
+    def cancel(self, job: SimulationJob):
+        """Annule une simulation: retirée de la file, ou arrêtée à sa prochaine vérification."""
+        job.cancelled = True
+        if self._flags is not None:
+            self._flags[job.slot] = 1
+        if job.future is not None:
+            job.future.cancel()
+
+    def shutdown(self):
+        for job in list(self.jobs.values()):
+            self.cancel(job)
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
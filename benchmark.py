@@ -0,0 +1,221 @@
+"""
+Banc de latence de bout en bout par implémentation de boucle (EVENT_LOOP)
+
+    python benchmark.py --loop asyncio --loop uvloop --games 1000 --rate 50
+
+Chaque boucle est mesurée dans un processus neuf qui lance le vrai bot (main.main())
+sur l'API simulée (fake_telegram.py) et un flux de jeux synthétiques sur le canal
+source, dans un répertoire temporaire. Mesures:
+- latence de bout en bout: de l'arrivée du message source (⏰) jusqu'à l'envoi de la prédiction
+- retard d'ordonnancement: écart entre réveil prévu et réel d'une tâche réveillée chaque milliseconde
+- coût d'un passage de boucle à vide: `await asyncio.sleep(0)`, avant le démarrage du bot
+"""
+import os
+import re
+import sys
+import json
+import random
+import socket
+import asyncio
+import argparse
+import tempfile
+import subprocess
+from time import perf_counter
+
+from event_loop import available_backends, run as run_event_loop
+from loop_monitor import percentile
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+PREDICTION_PATTERN = re.compile(r'📲Game:(\d+):')
+SLEEP0_ITERATIONS = 100000
+LAG_INTERVAL = 0.001 # Période de la tâche de mesure du retard (secondes)
+DRAIN_TIMEOUT = 10.0 # Attente maximale des derniers traitements après le flux
+
+def summarize(values: list) -> dict:
+    """p50/p99/p99.9/max (ms) d'une série de mesures."""
+    values = sorted(values)
+    return {
+        'samples': len(values),
+        'p50': round(percentile(values, 0.50), 3),
+        'p99': round(percentile(values, 0.99), 3),
+        'p999': round(percentile(values, 0.999), 3),
+        'max': round(values[-1], 3) if values else 0.0,
+    }
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+# --- Processus de mesure (un par boucle) ---
+
+async def measure_sleep0(iterations: int) -> float:
+    """Durée moyenne (µs) d'un passage de boucle: `await asyncio.sleep(0)`."""
+    started = perf_counter()
+    for _ in range(iterations):
+        await asyncio.sleep(0)
+    return (perf_counter() - started) / iterations * 1e6
+
+async def tick_lag(samples: list, interval: float):
+    while True:
+        expected = perf_counter() + interval
+        await asyncio.sleep(interval)
+        samples.append(max(0.0, (perf_counter() - expected) * 1000))
+
+async def measure(args) -> dict:
+    import main
+    from event_loop import current_backend
+    from fake_telegram import synthetic_game_texts
+
+    sleep0_us = await measure_sleep0(SLEEP0_ITERATIONS)
+
+    bot = asyncio.create_task(main.main())
+    while main.processing_state != 'running':
+        if bot.done():
+            raise RuntimeError("le bot s'est arrêté pendant le démarrage")
+        await asyncio.sleep(0.01)
+    await asyncio.sleep(0.5) # Fin du démarrage (serveur web, tâches de fond)
+
+    client = main.client
+    loop = asyncio.get_running_loop()
+    emitted = {} # Jeu source -> instant d'arrivée du message ⏰
+    latencies = []
+
+    def on_sent(message):
+        match = PREDICTION_PATTERN.match(message.message or '')
+        if match:
+            received_at = emitted.pop(int(match.group(1)) - main.primary.a_offset, None)
+            if received_at is not None:
+                latencies.append((perf_counter() - received_at) * 1000)
+
+    client.on_sent = on_sent
+    lag_samples = []
+    ticker = asyncio.create_task(tick_lag(lag_samples, LAG_INTERVAL))
+
+    rng = random.Random(args.seed)
+    interval = 1 / args.rate
+    finalize_after = args.finalize_ms / 1000
+    started = perf_counter()
+    next_at = started
+    for number in range(1, args.games + 1):
+        pending, final = synthetic_game_texts(number, rng)
+        emitted[number] = perf_counter()
+        message = client.emit_message(main.SOURCE_CHANNEL_ID, pending)
+        loop.call_later(finalize_after, client.emit_edit, main.SOURCE_CHANNEL_ID, message.id, final)
+        next_at += interval
+        await asyncio.sleep(max(0.0, next_at - perf_counter()))
+    elapsed = perf_counter() - started
+
+    # Derniers traitements: événements distribués, file source vide, envois terminés
+    deadline = perf_counter() + DRAIN_TIMEOUT
+    await asyncio.sleep(finalize_after)
+    while perf_counter() < deadline and (client._dispatching or main.source_lane.depth or main.outbound_depth()):
+        await asyncio.sleep(0.01)
+    ticker.cancel()
+
+    for tenant in main.tenants:
+        await tenant.client.disconnect()
+    try:
+        await asyncio.wait_for(bot, 5)
+    except (asyncio.TimeoutError, asyncio.CancelledError):
+        pass
+
+    return {
+        'backend': current_backend(),
+        'python': sys.version.split()[0],
+        'games': args.games,
+        'rate': args.rate,
+        'elapsed_s': round(elapsed, 2),
+        'predictions': len(latencies),
+        'latency_ms': summarize(latencies),
+        'loop_lag_ms': summarize(lag_samples),
+        'sleep0_us': round(sleep0_us, 3),
+        'api_calls': client.stats['calls'],
+    }
+
+def run_worker(args):
+    """Processus de mesure: l'environnement du bot est fixé avant l'import de config.py."""
+    os.environ.update(
+        API_ID='1', API_HASH='benchmark', BOT_TOKEN='1:benchmark', ADMIN_ID='1',
+        FAKE_TELEGRAM=f"latency_ms={args.api_latency_ms},latency_sigma=0,seed={args.seed}",
+        HANDOVER_SOCKET='', CONFIG_WATCH_INTERVAL='0', PORT=str(free_port()),
+    )
+    result = run_event_loop(measure(args), args.loop[0])
+    with open(args.out, 'w') as f:
+        json.dump(result, f)
+
+# --- Processus principal ---
+
+def run_backend(backend: str, args) -> dict:
+    with tempfile.TemporaryDirectory(prefix='bench_') as workdir:
+        out = os.path.join(workdir, 'result.json')
+        command = [
+            sys.executable, os.path.join(REPO_DIR, 'benchmark.py'), '--worker', '--out', out,
+            '--loop', backend, '--games', str(args.games), '--rate', str(args.rate),
+            '--finalize-ms', str(args.finalize_ms), '--api-latency-ms', str(args.api_latency_ms),
+            '--seed', str(args.seed),
+        ]
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, (REPO_DIR, os.getenv('PYTHONPATH')))))
+        # Journaux du bot ignorés: seul le fichier de résultats compte
+        completed = subprocess.run(command, cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        if completed.returncode != 0 or not os.path.exists(out):
+            error = completed.stderr.decode(errors='replace').strip().splitlines()
+            return {'backend': backend, 'error': error[-1] if error else f"code {completed.returncode}"}
+        with open(out) as f:
+            return json.load(f)
+
+def format_table(results: list) -> str:
+    header = (f"{'Boucle':<9} {'Prédictions':>11} | {'Latence p50':>11} {'p99':>8} {'p99.9':>8} {'max':>8} ms"
+              f" | {'Retard p50':>10} {'p99':>7} {'p99.9':>7} {'max':>7} ms | {'sleep(0)':>9}")
+    lines = [header, '-' * len(header)]
+    for result in results:
+        if 'error' in result:
+            lines.append(f"{result['backend']:<9} {result['error']}")
+            continue
+        lat, lag = result['latency_ms'], result['loop_lag_ms']
+        lines.append(
+            f"{result['backend']:<9} {result['predictions']:>11} | {lat['p50']:>11.3f} {lat['p99']:>8.3f}"
+            f" {lat['p999']:>8.3f} {lat['max']:>8.3f}    | {lag['p50']:>10.3f} {lag['p99']:>7.3f}"
+            f" {lag['p999']:>7.3f} {lag['max']:>7.3f}    | {result['sleep0_us']:>6.2f} µs"
+        )
+    return "\n".join(lines)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Latence de bout en bout du bot par implémentation de boucle")
+    parser.add_argument('--loop', action='append', choices=('asyncio', 'uvloop'),
+                        help="boucle à mesurer (répétable; défaut: asyncio et uvloop)")
+    parser.add_argument('--games', type=int, default=1000, help="jeux synthétiques publiés (défaut: 1000)")
+    parser.add_argument('--rate', type=float, default=50.0, help="jeux par seconde (défaut: 50)")
+    parser.add_argument('--finalize-ms', type=float, default=5.0,
+                        help="délai entre le message ⏰ et son édition finalisée (défaut: 5 ms)")
+    parser.add_argument('--api-latency-ms', type=float, default=0.0,
+                        help="latence de l'API simulée par appel (défaut: 0, coût du bot seul)")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--json', metavar='FICHIER', help="écrit aussi les résultats en JSON")
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--out', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    args.loop = args.loop or ['asyncio', 'uvloop']
+    return args
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.worker:
+        run_worker(args)
+        return
+
+    results = []
+    for backend in args.loop:
+        if backend not in available_backends():
+            results.append({'backend': backend, 'error': "non installé (pip install uvloop)"})
+            continue
+        print(f"⏱️ {backend}: {args.games} jeux à {args.rate:g}/s...", file=sys.stderr)
+        results.append(run_backend(backend, args))
+
+    print(format_table(results))
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Journalisation non bloquante du bot (file d'attente + thread d'écriture)
+"""
+import sys
+import json
+import queue
+import atexit
+import logging
+import logging.handlers
+from datetime import datetime, timezone
+from time import monotonic
+
+# Champs structurés acceptés via `extra={...}` et recopiés dans la sortie JSON
+STRUCTURED_FIELDS = ('tenant', 'game', 'stage', 'latency_ms', 'target', 'suit', 'attempt', 'category', 'suppressed')
+
+# Catégories de journal d'audit (changements de réglage): chaque ligne est émise, jamais échantillonnée
+AUDIT_CATEGORIES = frozenset({'tuning_applied', 'tuning_proposed', 'tuning_settings'})
+
+class JsonFormatter(logging.Formatter):
+    """Formate chaque enregistrement en une ligne JSON."""
+
+    def format(self, record):
+        payload = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'msg': record.getMessage(),
+        }
+        for field in STRUCTURED_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                payload[field] = value
+        if record.exc_info:
+            payload['exc'] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+class SamplingFilter(logging.Filter):
+    """
+    Limite les lignes répétitives: pour une même `category`, au plus une ligne
+    est émise par intervalle, les suivantes sont comptées puis signalées
+    (`suppressed`) sur la prochaine ligne émise. Les catégories d'audit
+    (AUDIT_CATEGORIES) ne sont pas limitées.
+    """
+
+    def __init__(self, interval: float):
+        super().__init__()
+        self.interval = interval
+        self._last_emit = {}
+        self._suppressed = {}
+
+    def filter(self, record):
+        category = getattr(record, 'category', None)
+        if category is None or category in AUDIT_CATEGORIES or self.interval <= 0:
+            return True
+        key = (getattr(record, 'tenant', None), category)  # Chaque bot a ses propres intervalles
+        now = monotonic()
+        last = self._last_emit.get(key)
+        if last is not None and now - last < self.interval:
+            self._suppressed[key] = self._suppressed.get(key, 0) + 1
+            return False
+        self._last_emit[key] = now
+        suppressed = self._suppressed.pop(key, 0)
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler qui ne formate rien dans le thread appelant: le message, les
+    arguments et la trace sont formatés par le thread du QueueListener.
+    """
+
+    def prepare(self, record):
+        return record
+
+_listener = None
+
+def setup_logging(level=logging.INFO, json_format: bool = True, sample_interval: float = 30.0):
+    """Installe la file de journalisation sur le logger racine et démarre le thread d'écriture."""
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    if json_format:
+        stream_handler.setFormatter(JsonFormatter())
+    else:
+        stream_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+
+    log_queue = queue.SimpleQueue()  # Non bornée: put() ne bloque jamais la boucle
+    queue_handler = DeferredQueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter(sample_interval))
+
+    root = logging.getLogger()
+    root.handlers[:] = [queue_handler]
+    root.setLevel(level)
+
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+    return _listener
+
+def queued_records() -> int:
+    """Enregistrements en attente d'écriture dans la file de journalisation."""
+    return _listener.queue.qsize() if _listener is not None else 0
+
+def stop_logging():
+    """Vide la file et arrête le thread d'écriture."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
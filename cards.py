@@ -0,0 +1,94 @@
+"""
+Décodage des cartes des groupes du canal source en codes entiers et tables de points du baccara
+
+Une carte est codée `valeur * 4 + couleur`: valeur A=1 ... K=13 (0 = inconnue, voir
+game_archive.card_value_code), couleur selon prediction_records.SUIT_CODES. Une main
+(un groupe) est un `bytes` de codes; ses propriétés sont lues dans des tables calculées
+une fois au chargement du module.
+"""
+import re
+
+from config import SUIT_NORMALIZE
+from game_archive import CARD_VALUE_CODES
+from prediction_records import SUIT_CODES, suit_from_code
+
+N_SUITS = 4
+N_VALUES = 14
+N_CARD_CODES = N_VALUES * N_SUITS
+MAX_HAND_CARDS = 6 # Au-delà (message mal formé), les cartes suivantes sont ignorées
+
+# Valeur optionnelle puis couleur, sans groupes capturants: findall retourne les cartes
+CARD_PATTERN = re.compile(r'(?:10|[A2-9JQKT])?[♠♥♦♣❤]\ufe0f?', re.IGNORECASE)
+
+VALUE_NAMES = ('', 'A', '2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K')
+
+def card_code(value: int, suit: int) -> int:
+    return value * N_SUITS + suit
+
+# Tables indexées par code de carte
+CARD_VALUE = bytes(code // N_SUITS for code in range(N_CARD_CODES))
+CARD_SUIT = bytes(code % N_SUITS for code in range(N_CARD_CODES))
+CARD_SUIT_BIT = bytes(1 << (code % N_SUITS) for code in range(N_CARD_CODES))
+# Points au baccara: A=1, 2 à 9 = valeur, 10/J/Q/K = 0 (carte sans valeur: 0)
+CARD_POINTS = bytes(value if value < 10 else 0 for value in CARD_VALUE)
+# Parité de la valeur (A, 3, 5, 7, 9, J, K impaires)
+CARD_ODD = bytes(value % 2 for value in CARD_VALUE)
+
+# Total d'une main (chiffre des unités) indexé par la somme des points
+HAND_TOTALS = bytes(points % 10 for points in range(9 * MAX_HAND_CARDS + 1))
+
+# Texte d'une carte tel que le trouve CARD_PATTERN -> code (toutes les graphies possibles)
+TOKEN_CODES = {}
+for _value_text, _value in list(CARD_VALUE_CODES.items()) + [('', 0)]:
+    for _suit_text in ('♠', '♥', '♦', '♣', '❤'):
+        _code = card_code(_value, SUIT_CODES[SUIT_NORMALIZE.get(_suit_text, _suit_text)])
+        for _token in (_value_text + _suit_text, _value_text.lower() + _suit_text):
+            TOKEN_CODES[_token] = _code
+            TOKEN_CODES[_token + '\ufe0f'] = _code
+del _value_text, _value, _suit_text, _code, _token
+
+HAND_CACHE_SIZE = 1024 # Un même groupe revient à chaque édition du message d'un jeu
+_hand_cache = {}
+
+def decode_hand(group_str: str) -> bytes:
+    """Codes des cartes d'un groupe, dans l'ordre du message."""
+    hand = _hand_cache.get(group_str)
+    if hand is None:
+        tokens = CARD_PATTERN.findall(group_str)
+        if len(tokens) > MAX_HAND_CARDS:
+            del tokens[MAX_HAND_CARDS:]
+        hand = bytes(map(TOKEN_CODES.__getitem__, tokens))
+        if len(_hand_cache) >= HAND_CACHE_SIZE:
+            _hand_cache.clear()
+        _hand_cache[group_str] = hand
+    return hand
+
+def hand_points(hand: bytes) -> int:
+    points = 0
+    for code in hand:
+        points += CARD_POINTS[code]
+    return points
+
+def hand_total(hand: bytes) -> int:
+    """Total de la main au baccara (0 à 9)."""
+    return HAND_TOTALS[hand_points(hand)]
+
+def is_natural(hand: bytes) -> bool:
+    """Abattage: 8 ou 9 avec les deux premières cartes."""
+    return len(hand) == 2 and HAND_TOTALS[CARD_POINTS[hand[0]] + CARD_POINTS[hand[1]]] >= 8
+
+def hand_mask(hand: bytes) -> int:
+    """Masque des couleurs présentes dans la main (bit `1 << code couleur`)."""
+    mask = 0
+    for code in hand:
+        mask |= CARD_SUIT_BIT[code]
+    return mask
+
+def format_hand(hand: bytes, display: dict = None) -> str:
+    """Texte d'une main (`K♠9♥`); `display` remplace les symboles de couleur (SUIT_DISPLAY)."""
+    display = display or {}
+    text = ""
+    for code in hand:
+        suit = suit_from_code(CARD_SUIT[code])
+        text += VALUE_NAMES[CARD_VALUE[code]] + display.get(suit, suit)
+    return text
@@ -4,8 +4,8 @@ Configuration du bot Telegram de prédiction Baccarat
 import os
 import json # NOUVEAU
 
-def parse_channel_id(env_var: str, default: str) -> int:
-    value = os.getenv(env_var) or default
+def normalize_channel_id(value: str) -> int:
+    value = value.strip()
     if value.startswith('-100'):
         return int(value)
     try:
@@ -16,14 +16,112 @@ def parse_channel_id(env_var: str, default: str) -> int:
     except ValueError:
         return 0
 
+def parse_channel_id(env_var: str, default: str) -> int:
+    value = os.getenv(env_var) or default
+    return normalize_channel_id(value)
+
+def parse_channel_ids(env_var: str) -> list:
+    """Liste d'ids séparés par des virgules (ids invalides ignorés)."""
+    ids = [normalize_channel_id(v) for v in (os.getenv(env_var) or '').split(',') if v.strip()]
+    return [i for i in ids if i]
+
 SOURCE_CHANNEL_ID = parse_channel_id('SOURCE_CHANNEL_ID', '-1002682552255')
 PREDICTION_CHANNEL_ID = parse_channel_id('PREDICTION_CHANNEL_ID', '-1003343276131')
+# Canaux/groupes supplémentaires recevant aussi chaque prédiction (ex: "-100111,-100222")
+EXTRA_PREDICTION_CHANNEL_IDS = parse_channel_ids('EXTRA_PREDICTION_CHANNEL_IDS')
+PREDICTION_CHANNEL_IDS = list(dict.fromkeys(
+    [i for i in [PREDICTION_CHANNEL_ID] if i] + EXTRA_PREDICTION_CHANNEL_IDS
+))
 ADMIN_ID = int(os.getenv('ADMIN_ID') or '0')
 API_ID = int(os.getenv('API_ID') or '0')
 API_HASH = os.getenv('API_HASH') or ''
 BOT_TOKEN = os.getenv('BOT_TOKEN') or ''
 PORT = int(os.getenv('PORT') or '10000')
 
+# Session Telethon persistante (clé d'auth, datacenter, cache des entités).
+# TELEGRAM_SESSION (StringSession exportée par /session) sert à l'initialiser.
+SESSION_FILE = os.getenv('SESSION_FILE') or 'bot_session'
+TELEGRAM_SESSION = os.getenv('TELEGRAM_SESSION') or ''
+
+# Bots supplémentaires servis par le même processus (fichier JSON, voir tenants.py).
+# Ils partagent la lecture du canal source; chacun a son token, son admin et ses canaux.
+TENANTS_FILE = os.getenv('TENANTS_FILE') or 'tenants.json'
+
+# Client Telegram simulé pour les tests hors ligne (voir fake_telegram.py): vide = API réelle,
+# sinon `1` ou des options `cle=valeur` séparées par des virgules (ex: "latency_ms=80,flood_rate=0.01,feed_interval=5")
+FAKE_TELEGRAM = os.getenv('FAKE_TELEGRAM') or ''
+
+# Implémentation de la boucle asyncio (voir event_loop.py): `auto` (uvloop s'il est installé),
+# `asyncio` (boucle standard) ou `uvloop`. Comparer avec `python benchmark.py` avant de choisir.
+EVENT_LOOP = os.getenv('EVENT_LOOP') or 'auto'
+
+# Seuils de disponibilité (/health): au-delà, le endpoint répond 503
+HEALTH_MAX_LOOP_LAG_MS = float(os.getenv('HEALTH_MAX_LOOP_LAG_MS') or '1000')  # p99 du retard de boucle
+HEALTH_MAX_SOURCE_AGE = float(os.getenv('HEALTH_MAX_SOURCE_AGE') or '3600')  # Secondes sans message source
+HEALTH_MAX_OUTBOUND = int(os.getenv('HEALTH_MAX_OUTBOUND') or '50')  # Envois/éditions Telegram en cours
+
+# Objectifs de latence (SLO), en millisecondes (0 = objectif désactivé): publication de la
+# prédiction après le message source, édition du statut après la finalisation. Une alerte est
+# envoyée à l'admin quand moins de SLO_TARGET des mesures de la fenêtre respectent l'objectif
+SLO_PREDICTION_MS = float(os.getenv('SLO_PREDICTION_MS') or '500')
+SLO_STATUS_MS = float(os.getenv('SLO_STATUS_MS') or '2000')
+SLO_TARGET = float(os.getenv('SLO_TARGET') or '0.95')
+SLO_WINDOW_SECONDS = float(os.getenv('SLO_WINDOW_SECONDS') or '600')  # Fenêtre glissante d'évaluation
+SLO_ALERT_INTERVAL = float(os.getenv('SLO_ALERT_INTERVAL') or '1800')  # Au plus une alerte par objectif et par intervalle
+SLO_MIN_SAMPLES = int(os.getenv('SLO_MIN_SAMPLES') or '5')  # Mesures minimales avant d'alerter
+
+# Historique des prédictions terminées (/export). L'endpoint HTTP /export
+# n'est actif que si EXPORT_TOKEN est défini (paramètre ?token=...).
+HISTORY_FILE = os.getenv('HISTORY_FILE') or 'predictions_history.csv'
+# Les résultats sont mis en attente puis écrits dans un thread toutes les HISTORY_FLUSH_INTERVAL secondes
+HISTORY_FLUSH_INTERVAL = float(os.getenv('HISTORY_FLUSH_INTERVAL') or '5')
+EXPORT_TOKEN = os.getenv('EXPORT_TOKEN') or ''
+
+# Rechargement à chaud de bot_config.json: intervalle de surveillance en secondes
+# (0 = désactivé; SIGHUP déclenche aussi un rechargement)
+CONFIG_WATCH_INTERVAL = float(os.getenv('CONFIG_WATCH_INTERVAL') or '2')
+
+# Passation sans interruption entre deux processus du bot (socket Unix local, vide = désactivée)
+HANDOVER_SOCKET = os.getenv('HANDOVER_SOCKET', '/tmp/baccarat_bot_handover.sock')
+HANDOVER_TIMEOUT = float(os.getenv('HANDOVER_TIMEOUT') or '15')  # Attente max de l'état de l'ancien processus
+HANDOVER_DRAIN_TIMEOUT = float(os.getenv('HANDOVER_DRAIN_TIMEOUT') or '10')  # Vidage des envois en cours
+HANDOVER_PREPARE_TIMEOUT = float(os.getenv('HANDOVER_PREPARE_TIMEOUT') or '120')  # Sessions reprises sans demande d'état dans ce délai
+
+# Récupération des messages source manqués (trous dans les numéros de jeu)
+BACKFILL_MAX_GAP = int(os.getenv('BACKFILL_MAX_GAP') or '200')  # Nombre max d'ids récupérés par trou
+BACKFILL_CONCURRENCY = int(os.getenv('BACKFILL_CONCURRENCY') or '2')  # Lots get_messages simultanés
+
+# Files de traitement: événements source en attente au-delà desquels les plus anciens sont
+# abandonnés, et attente max (secondes) de la file source derrière une commande admin en cours
+SOURCE_LANE_CAPACITY = int(os.getenv('SOURCE_LANE_CAPACITY') or '1000')
+CONTROL_LANE_MAX_HOLD = float(os.getenv('CONTROL_LANE_MAX_HOLD') or '0.5')
+
+# Essais par envoi/édition et par destination (délai exponentiel à partir de DESTINATION_RETRY_DELAY)
+DESTINATION_MAX_RETRIES = int(os.getenv('DESTINATION_MAX_RETRIES') or '3')
+DESTINATION_RETRY_DELAY = float(os.getenv('DESTINATION_RETRY_DELAY') or '1')
+
+# Archive colonnaire des jeux finalisés (analyses et backtests, vide = désactivée)
+ARCHIVE_DIR = os.getenv('ARCHIVE_DIR', 'game_archive')
+# Les jeux archivés sont mis en mémoire tampon puis écrits dans un thread toutes les ARCHIVE_FLUSH_INTERVAL secondes
+ARCHIVE_FLUSH_INTERVAL = float(os.getenv('ARCHIVE_FLUSH_INTERVAL') or '5')
+
+# Éviction continue de l'état (dédoublonnage, prédictions jamais vérifiées): une entrée
+# est retirée quand elle dépasse l'âge STATE_HORIZON_SECONDS ou quand elle est à plus de
+# STATE_HORIZON_GAMES jeux du jeu source courant (jeux de la veille après le retour à #1)
+STATE_HORIZON_SECONDS = float(os.getenv('STATE_HORIZON_SECONDS') or '7200')
+STATE_HORIZON_GAMES = int(os.getenv('STATE_HORIZON_GAMES') or '200')
+# Resets complets programmés (toutes les 2h et à 00h59 WAT). Désactivés par défaut:
+# ces échéances ne sont plus que des points de maintenance (éviction + journal)
+SCHEDULED_RESETS = (os.getenv('SCHEDULED_RESETS') or '0').lower() in ('1', 'true', 'yes', 'on')
+
+# Rapport quotidien (00h59 WAT): envoyé à l'admin, et aussi aux canaux de prédiction si activé
+DAILY_REPORT_TO_CHANNEL = (os.getenv('DAILY_REPORT_TO_CHANNEL') or '0').lower() in ('1', 'true', 'yes', 'on')
+
+# Journalisation: 'json' (structurée) ou 'text', et intervalle d'échantillonnage
+# des lignes répétitives (secondes, 0 = désactivé)
+LOG_FORMAT = (os.getenv('LOG_FORMAT') or 'json').lower()
+LOG_SAMPLE_SECONDS = float(os.getenv('LOG_SAMPLE_SECONDS') or '30')
+
 SUIT_MAPPING_EVEN = {'♠': '♣', '♣': '♠', '♦': '♥', '♥': '♦'}
 SUIT_MAPPING_ODD = {'♠': '♥', '♣': '♦', '♦': '♣', '♥': '♠'}
 ALL_SUITS = ['♥', '♠', '♦', '♣']
@@ -36,6 +134,28 @@ SUIT_NORMALIZE = {'❤️': '♥', '❤': '♥', '♥️': '♥', '♠️': '♠
 A_OFFSET_DEFAULT = 1 # Décalage de prédiction (N -> N + A_OFFSET)
 R_OFFSET_DEFAULT = 0 # Nombre d'essais de vérification (N+0 à N+R_OFFSET)
 
+# Prédicteur par fréquences (/model): jeux observés par fenêtre glissante et observations
+# minimales d'un contexte avant de l'utiliser (sinon repli sur la même couleur et parité)
+FREQUENCY_WINDOW = int(os.getenv('FREQUENCY_WINDOW') or '2000')
+FREQUENCY_MIN_SAMPLES = int(os.getenv('FREQUENCY_MIN_SAMPLES') or '20')
+
+# Réglage automatique de A/R (/tune): jeux évalués par fenêtre glissante, jeux minimum avant
+# une proposition, pénalité par essai supplémentaire (R), avance minimale du meilleur score
+# sur le réglage actuel et délai minimal entre deux changements (secondes)
+TUNING_WINDOW = int(os.getenv('TUNING_WINDOW') or '500')
+TUNING_MIN_SAMPLES = int(os.getenv('TUNING_MIN_SAMPLES') or '200')
+TUNING_R_PENALTY = float(os.getenv('TUNING_R_PENALTY') or '0.05')
+TUNING_MARGIN = float(os.getenv('TUNING_MARGIN') or '0.02')
+TUNING_INTERVAL = float(os.getenv('TUNING_INTERVAL') or '1800')
+
+# Simulations /simulate: processus du pool (0: /simulate désactivé, aucun processus créé),
+# simulations en file ou en cours (au plus), durée maximale d'une simulation (secondes)
+# et nombre maximal de jeux rejoués
+SIMULATION_WORKERS = int(os.getenv('SIMULATION_WORKERS') or '0')
+SIMULATION_MAX_JOBS = int(os.getenv('SIMULATION_MAX_JOBS') or '4')
+SIMULATION_TIMEOUT = float(os.getenv('SIMULATION_TIMEOUT') or '120')
+SIMULATION_MAX_GAMES = int(os.getenv('SIMULATION_MAX_GAMES') or '100000')
+
 # Emojis de vérification selon l'offset (N+0, N+1, N+2, etc.)
 VERIFICATION_EMOJIS = {
     0: "✅0️⃣",  # 1er essai (N+0)
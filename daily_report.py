@@ -0,0 +1,111 @@
+"""
+Compteurs de la journée en cours (rapport quotidien), mis à jour à chaque événement
+"""
+from time import time as wall_time
+
+from config import ALL_SUITS
+from streaks import MAX_ATTEMPT
+
+MAX_PERIODS = 50 # Périodes /ec et /time conservées par journée
+
+class DailyStats:
+    """
+    Prédictions, résultats, essais gagnants, résultats par couleur et périodes
+    des modes /ec et /time depuis le début de la journée. Toutes les mises à
+    jour sont en O(1); le rapport se lit directement dans ces compteurs.
+    """
+
+    def __init__(self, started_at: float = None):
+        self.started_at = wall_time() if started_at is None else started_at  # Epoch
+        self.predictions = 0
+        self.wins = 0
+        self.losses = 0
+        self.expired = 0 # Retirées par l'éviction sans vérification
+        self.attempts = [0] * (MAX_ATTEMPT + 1)
+        self.suit_wins = [0] * len(ALL_SUITS) # Par code couleur prédite
+        self.suit_losses = [0] * len(ALL_SUITS)
+        # [mode, détail, début, fin prévue ou réelle (None = indéterminée), ouverte?]
+        self.periods = []
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.wins + self.losses
+        return self.wins / total if total else 0.0
+
+    def record_prediction(self):
+        self.predictions += 1
+
+    def record_outcome(self, suit: int, won: bool, attempt: int):
+        if won:
+            self.wins += 1
+            self.attempts[min(max(attempt, 0), MAX_ATTEMPT)] += 1
+        else:
+            self.losses += 1
+        if 0 <= suit < len(ALL_SUITS):
+            if won:
+                self.suit_wins[suit] += 1
+            else:
+                self.suit_losses[suit] += 1
+
+    def record_expired(self):
+        self.expired += 1
+
+    def _open_period(self, mode: str):
+        for period in reversed(self.periods):
+            if period[0] == mode and period[4]:
+                return period
+        return None
+
+    def set_mode(self, mode: str, active: bool, detail: str = '', until: float = None, now: float = None):
+        """
+        Ouvre, met à jour ou ferme la période du mode (`ec`, `time`).
+        `until` est la fin prévue (blocage /time), None si indéterminée.
+        """
+        now = wall_time() if now is None else now
+        period = self._open_period(mode)
+        if active:
+            if period is not None and period[1] == detail:
+                period[3] = until
+                return
+            if period is not None:
+                period[3], period[4] = now, False
+            if len(self.periods) < MAX_PERIODS:
+                self.periods.append([mode, detail, now, until, True])
+        elif period is not None:
+            period[3] = now if period[3] is None else min(period[3], now)
+            period[4] = False
+
+    def roll(self, now: float = None) -> 'DailyStats':
+        """
+        Termine la journée: retourne une nouvelle instance pour la suivante,
+        où les périodes encore actives sont reprises à partir de `now`.
+        """
+        now = wall_time() if now is None else now
+        following = DailyStats(now)
+        for mode, detail, start, end, is_open in self.periods:
+            if is_open and (end is None or end > now):
+                following.periods.append([mode, detail, now, end, True])
+        return following
+
+    def to_dict(self) -> dict:
+        return {
+            'started_at': self.started_at,
+            'predictions': self.predictions,
+            'wins': self.wins,
+            'losses': self.losses,
+            'expired': self.expired,
+            'attempts': list(self.attempts),
+            'suit_wins': list(self.suit_wins),
+            'suit_losses': list(self.suit_losses),
+            'periods': [list(p) for p in self.periods],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        stats = cls(data.get('started_at'))
+        for key in ('predictions', 'wins', 'losses', 'expired'):
+            setattr(stats, key, data.get(key, 0))
+        for key, size in (('attempts', MAX_ATTEMPT + 1), ('suit_wins', len(ALL_SUITS)), ('suit_losses', len(ALL_SUITS))):
+            setattr(stats, key, (list(data.get(key, [])) + [0] * size)[:size])
+        stats.periods = [list(p) for p in data.get('periods', [])][:MAX_PERIODS]
+        return stats
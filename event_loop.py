@@ -0,0 +1,56 @@
+"""
+Choix de l'implémentation de la boucle asyncio (EVENT_LOOP): boucle standard ou uvloop
+"""
+import sys
+import asyncio
+import logging
+
+try:
+    import uvloop
+except ImportError:  # uvloop est optionnel (pip install uvloop, Linux/macOS)
+    uvloop = None
+
+logger = logging.getLogger(__name__)
+
+LOOP_BACKENDS = ('auto', 'asyncio', 'uvloop')
+
+def available_backends() -> list:
+    """Boucles utilisables dans cet environnement."""
+    return ['asyncio'] + (['uvloop'] if uvloop is not None else [])
+
+def resolve_backend(name: str) -> str:
+    """
+    'auto' choisit uvloop s'il est installé; uvloop demandé mais absent retombe
+    sur la boucle standard (avec un avertissement). Lève ValueError si inconnu.
+    """
+    name = (name or 'auto').strip().lower()
+    if name not in LOOP_BACKENDS:
+        raise ValueError(f"EVENT_LOOP invalide ({', '.join(LOOP_BACKENDS)}): {name!r}")
+    if name == 'auto':
+        return 'uvloop' if uvloop is not None else 'asyncio'
+    if name == 'uvloop' and uvloop is None:
+        logger.warning("⚠️ EVENT_LOOP=uvloop mais uvloop n'est pas installé: boucle asyncio standard")
+        return 'asyncio'
+    return name
+
+def loop_factory(backend: str):
+    """Fonction créant une nouvelle boucle de l'implémentation donnée."""
+    if backend == 'uvloop':
+        return uvloop.new_event_loop
+    return asyncio.new_event_loop
+
+def current_backend() -> str:
+    """Implémentation de la boucle en cours d'exécution ('asyncio', 'uvloop', ...)."""
+    loop_type = type(asyncio.get_running_loop())
+    return loop_type.__module__.split('.')[0]
+
+def run(coro, backend: str = 'auto'):
+    """Équivalent de asyncio.run() sur la boucle choisie."""
+    backend = resolve_backend(backend)
+    if sys.version_info >= (3, 11):
+        with asyncio.Runner(loop_factory=loop_factory(backend)) as runner:
+            return runner.run(coro)
+    # Python < 3.11: pas de loop_factory, la politique de boucle fait le choix
+    if backend == 'uvloop':
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return asyncio.run(coro)
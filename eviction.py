@@ -0,0 +1,69 @@
+"""
+Éviction incrémentale de l'état de dédoublonnage, par âge et par distance au jeu courant
+"""
+from collections import OrderedDict
+from time import monotonic, time as wall_time
+
+class RecentKeys:
+    """
+    Clés déjà traitées, avec le numéro de jeu et l'instant d'ajout, dans
+    l'ordre d'insertion. `evict()` retire les entrées par le début tant
+    qu'elles sont plus vieilles que l'horizon ou trop loin du jeu courant
+    (jeux de la veille après le retour à #1): le coût est proportionnel
+    aux entrées retirées, sans tri ni effacement global.
+    """
+
+    def __init__(self):
+        self._entries = OrderedDict()  # Clé -> (numéro de jeu, monotonic() à l'ajout)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __iter__(self):
+        return iter(self._entries)
+
+    def add(self, key, game: int, now: float = None):
+        if key not in self._entries:
+            self._entries[key] = (game, monotonic() if now is None else now)
+
+    def clear(self):
+        self._entries.clear()
+
+    def evict(self, current_game: int, max_age: float, max_games: int, now: float = None) -> int:
+        """Retire les plus anciennes entrées hors horizon et retourne leur nombre."""
+        cutoff = (monotonic() if now is None else now) - max_age
+        removed = 0
+        while self._entries:
+            game, seen_at = next(iter(self._entries.values()))
+            if seen_at >= cutoff and abs(current_game - game) <= max_games:
+                break # Les suivantes sont plus récentes
+            self._entries.popitem(last=False)
+            removed += 1
+        return removed
+
+    def to_list(self) -> list:
+        """[[clé, jeu, epoch]] du plus ancien au plus récent (passation entre processus)."""
+        offset = wall_time() - monotonic()
+        return [[key, game, seen_at + offset] for key, (game, seen_at) in self._entries.items()]
+
+    def load(self, items: list):
+        """
+        Restaure to_list(). Accepte aussi l'ancien format (liste de clés seules):
+        le jeu est alors déduit de la clé et l'entrée comptée comme neuve.
+        """
+        self._entries.clear()
+        offset = wall_time() - monotonic()
+        now = monotonic()
+        for item in items:
+            if isinstance(item, list) and len(item) == 3:
+                key, game, seen_at = item
+                self.add(key, game, min(seen_at - offset, now))
+            else:
+                try:
+                    game = int(str(item).split('_', 1)[0])
+                except ValueError:
+                    game = 0
+                self.add(item, game, now)
@@ -0,0 +1,330 @@
+"""
+Client Telegram simulé (tests hors ligne): mêmes appels que TelegramClient pour
+ce que le bot utilise, avec latence, FloodWait, MessageNotModified et coupures
+de connexion injectables, et émission d'événements pour le canal source
+"""
+import asyncio
+import logging
+import math
+import random
+
+from telethon import events
+from telethon.errors import FloodWaitError, MessageNotModifiedError, MessageIdInvalidError
+
+logger = logging.getLogger(__name__)
+
+FAKE_CARD_RANKS = ('A', '2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K')
+FAKE_SUITS = ('♠️', '♥️', '♦️', '♣️')
+
+class ApiConditions:
+    """
+    Conditions de l'API simulée, lues depuis `cle=valeur,...` (variable FAKE_TELEGRAM):
+    - latency_ms / latency_sigma: latence médiane et dispersion (loi log-normale, 0 = constante)
+    - tail_rate / tail_ms: proportion d'appels très lents et leur latence
+    - flood_rate / flood_seconds: proportion de FloodWait et délai imposé
+    - not_modified_rate: proportion d'éditions refusées (MessageNotModified)
+    - drop_rate: proportion d'appels perdus (ConnectionError après la latence)
+    - feed_interval / feed_start: flux synthétique sur le canal source (secondes entre jeux, 0 = aucun)
+    - seed: graine du tirage (reproductibilité)
+    """
+
+    FIELDS = {
+        'latency_ms': float, 'latency_sigma': float, 'tail_rate': float, 'tail_ms': float,
+        'flood_rate': float, 'flood_seconds': int, 'not_modified_rate': float, 'drop_rate': float,
+        'feed_interval': float, 'feed_start': int, 'seed': int,
+    }
+
+    def __init__(self, latency_ms: float = 50.0, latency_sigma: float = 0.5, tail_rate: float = 0.0,
+                 tail_ms: float = 2000.0, flood_rate: float = 0.0, flood_seconds: int = 3,
+                 not_modified_rate: float = 0.0, drop_rate: float = 0.0,
+                 feed_interval: float = 0.0, feed_start: int = 1, seed: int = None):
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self.tail_rate = tail_rate
+        self.tail_ms = tail_ms
+        self.flood_rate = flood_rate
+        self.flood_seconds = flood_seconds
+        self.not_modified_rate = not_modified_rate
+        self.drop_rate = drop_rate
+        self.feed_interval = feed_interval
+        self.feed_start = feed_start
+        self.seed = seed
+        self.rng = random.Random(seed)
+
+    @classmethod
+    def parse(cls, spec: str) -> 'ApiConditions':
+        """Lève ValueError si une clé ou une valeur est invalide."""
+        values = {}
+        for item in spec.split(','):
+            item = item.strip()
+            if not item or item.lower() in ('1', 'true', 'on', 'yes'):
+                continue # `FAKE_TELEGRAM=1`: valeurs par défaut
+            key, sep, value = item.partition('=')
+            key = key.strip()
+            if not sep or key not in cls.FIELDS:
+                raise ValueError(f"option inconnue: {item!r}")
+            try:
+                values[key] = cls.FIELDS[key](value.strip())
+            except ValueError:
+                raise ValueError(f"valeur invalide pour {key}: {value!r}")
+            if values[key] < 0:
+                raise ValueError(f"{key} doit être positif")
+        return cls(**values)
+
+    def latency(self) -> float:
+        """Latence d'un appel, en secondes."""
+        if self.tail_rate and self.rng.random() < self.tail_rate:
+            return self.tail_ms / 1000
+        if self.latency_ms <= 0:
+            return 0.0
+        if self.latency_sigma <= 0:
+            return self.latency_ms / 1000
+        return self.rng.lognormvariate(math.log(self.latency_ms), self.latency_sigma) / 1000
+
+class FakeMessage:
+    __slots__ = ('id', 'chat_id', 'message', 'sender_id')
+
+    def __init__(self, id: int, chat_id: int, message: str, sender_id: int = None):
+        self.id = id
+        self.chat_id = chat_id
+        self.message = message
+        self.sender_id = sender_id
+
+    @property
+    def text(self):
+        return self.message
+
+class FakeChat:
+    """Canal (ou utilisateur) tel que retourné par get_entity()/get_chat()."""
+
+    def __init__(self, chat_id: int):
+        self.id = chat_id
+        self.title = f"Canal simulé {chat_id}"
+        self.broadcast = chat_id < 0
+
+class FakeUser:
+    def __init__(self, user_id: int, username: str):
+        self.id = user_id
+        self.username = username
+        self.first_name = username
+        self.bot = True
+
+class FakeEvent:
+    """Événement NewMessage/MessageEdited passé aux gestionnaires du bot."""
+
+    def __init__(self, client, message: FakeMessage, is_private: bool):
+        self.client = client
+        self.message = message
+        self.chat_id = message.chat_id
+        self.sender_id = message.sender_id
+        self.is_private = is_private
+
+    async def get_chat(self):
+        return FakeChat(self.chat_id)
+
+    async def respond(self, text, **kwargs):
+        return await self.client.send_message(self.chat_id, text, **kwargs)
+
+class FakeTelegramClient:
+    """
+    Remplace TelegramClient: les envois et éditions sont conservés en mémoire
+    (par chat) après une latence tirée selon `conditions`, avec les erreurs
+    injectées. `emit_message()`/`emit_edit()` simulent l'arrivée de mises à
+    jour, distribuées aux gestionnaires comme le fait Telethon (une tâche par mise à jour).
+    """
+
+    def __init__(self, session, api_id=None, api_hash=None, conditions: ApiConditions = None):
+        self.session = session
+        self.conditions = conditions or ApiConditions()
+        self.chats = {} # chat_id -> {msg_id: FakeMessage}
+        self.stats = {'calls': 0, 'flood_waits': 0, 'not_modified': 0, 'dropped': 0}
+        self._handlers = [] # (callback, builder)
+        self._next_ids = {}
+        self._connected = False
+        self._disconnected = None
+        self._dispatching = set()
+        self.on_sent = None # Appelé avec chaque message envoyé par send_message (mesures)
+
+    # --- Connexion ---
+
+    async def connect(self):
+        self._connected = True
+        if self._disconnected is None or self._disconnected.done():
+            self._disconnected = asyncio.get_running_loop().create_future()
+
+    async def start(self, bot_token: str = None, **kwargs):
+        await self.connect()
+        return self
+
+    def is_connected(self) -> bool:
+        return self._connected
+
+    async def disconnect(self):
+        self._connected = False
+        if self._disconnected is not None and not self._disconnected.done():
+            self._disconnected.set_result(None)
+
+    async def run_until_disconnected(self):
+        if self._disconnected is None:
+            await self.connect()
+        await self._disconnected
+
+    # --- Gestionnaires d'événements ---
+
+    def on(self, builder):
+        def decorator(callback):
+            self.add_event_handler(callback, builder)
+            return callback
+        return decorator
+
+    def add_event_handler(self, callback, builder=None):
+        self._handlers.append((callback, builder or events.NewMessage()))
+
+    def remove_event_handler(self, callback, builder=None) -> int:
+        before = len(self._handlers)
+        self._handlers = [(c, b) for c, b in self._handlers if c is not callback]
+        return before - len(self._handlers)
+
+    def _dispatch(self, message: FakeMessage, edited: bool, is_private: bool):
+        event = FakeEvent(self, message, is_private)
+        for callback, builder in self._handlers:
+            # MessageEdited hérite de NewMessage: le type exact décide
+            if isinstance(builder, events.MessageEdited) != edited:
+                continue
+            if builder.func is not None and not builder.func(event):
+                continue
+            task = asyncio.create_task(self._run_handler(callback, event))
+            self._dispatching.add(task)
+            task.add_done_callback(self._dispatching.discard)
+
+    async def _run_handler(self, callback, event):
+        try:
+            await callback(event)
+        except events.StopPropagation:
+            pass
+        except Exception:
+            logger.exception("Erreur gestionnaire (client simulé)")
+
+    def emit_message(self, chat_id: int, text: str, sender_id: int = None) -> FakeMessage:
+        """Nouveau message reçu dans `chat_id` (privé si chat_id > 0); retourne le message."""
+        message = self._store(chat_id, text, sender_id)
+        self._dispatch(message, edited=False, is_private=chat_id > 0)
+        return message
+
+    def emit_edit(self, chat_id: int, msg_id: int, text: str) -> FakeMessage:
+        """Édition d'un message reçu précédemment (créé s'il est inconnu)."""
+        message = self.chats.setdefault(chat_id, {}).get(msg_id)
+        if message is None:
+            message = FakeMessage(msg_id, chat_id, text)
+            self.chats[chat_id][msg_id] = message
+            self._next_ids[chat_id] = max(self._next_ids.get(chat_id, 0), msg_id)
+        message.message = text
+        self._dispatch(message, edited=True, is_private=chat_id > 0)
+        return message
+
+    async def wait_dispatched(self):
+        """Attend la fin des gestionnaires en cours (mesures et tests)."""
+        while self._dispatching:
+            await asyncio.gather(*list(self._dispatching), return_exceptions=True)
+
+    # --- API simulée ---
+
+    def _store(self, chat_id: int, text: str, sender_id: int = None) -> FakeMessage:
+        msg_id = self._next_ids.get(chat_id, 0) + 1
+        self._next_ids[chat_id] = msg_id
+        message = FakeMessage(msg_id, chat_id, text, sender_id)
+        self.chats.setdefault(chat_id, {})[msg_id] = message
+        return message
+
+    async def _call(self, method: str):
+        """Latence puis erreurs injectées, comme un aller-retour vers Telegram."""
+        conditions = self.conditions
+        self.stats['calls'] += 1
+        delay = conditions.latency()
+        if delay:
+            await asyncio.sleep(delay)
+        rng = conditions.rng
+        if conditions.drop_rate and rng.random() < conditions.drop_rate:
+            self.stats['dropped'] += 1
+            raise ConnectionError(f"{method}: connexion perdue (simulée)")
+        if conditions.flood_rate and rng.random() < conditions.flood_rate:
+            self.stats['flood_waits'] += 1
+            raise FloodWaitError(request=None, capture=conditions.flood_seconds)
+
+    async def get_me(self):
+        await self._call('get_me')
+        return FakeUser(1, 'fake_bot')
+
+    async def get_entity(self, entity):
+        await self._call('get_entity')
+        return FakeChat(entity)
+
+    async def send_message(self, entity, message: str = '', **kwargs):
+        await self._call('send_message')
+        stored = self._store(entity, message)
+        if self.on_sent is not None:
+            self.on_sent(stored)
+        return stored
+
+    async def edit_message(self, entity, message=None, text: str = None, **kwargs):
+        await self._call('edit_message')
+        msg_id = getattr(message, 'id', message)
+        stored = self.chats.get(entity, {}).get(msg_id)
+        if stored is None:
+            raise MessageIdInvalidError(request=None)
+        rate = self.conditions.not_modified_rate
+        if stored.message == text or (rate and self.conditions.rng.random() < rate):
+            self.stats['not_modified'] += 1
+            raise MessageNotModifiedError(request=None)
+        stored.message = text
+        return stored
+
+    async def send_file(self, entity, file, caption: str = '', **kwargs):
+        await self._call('send_file')
+        return self._store(entity, caption or str(file))
+
+    async def get_messages(self, entity, ids=None, **kwargs):
+        await self._call('get_messages')
+        stored = self.chats.get(entity, {})
+        if isinstance(ids, (list, tuple)):
+            return [stored.get(i) for i in ids]
+        if ids is not None:
+            return stored.get(ids)
+        return list(stored.values())
+
+# --- Flux source synthétique ---
+
+def synthetic_game_texts(number: int, rng: random.Random) -> tuple:
+    """
+    Messages d'un jeu au format du canal source: en cours (`#N12. 5(K♠️9♥️) - 3(8♦️5♣️) ⏰`)
+    puis finalisé (gagnant marqué ✅), avec les mêmes cartes.
+    """
+    def group():
+        cards = [(rng.choice(FAKE_CARD_RANKS), rng.choice(FAKE_SUITS)) for _ in range(rng.choice((2, 2, 3)))]
+        total = sum(int(rank) if rank.isdigit() else (1 if rank == 'A' else 0) for rank, _ in cards) % 10
+        return total, "".join(rank + suit for rank, suit in cards)
+
+    player_total, player = group()
+    banker_total, banker = group()
+    pending = f"#N{number}. {player_total}({player}) - {banker_total}({banker}) ⏰"
+    mark_player, mark_banker = ('✅', '') if player_total >= banker_total else ('', '✅')
+    final = f"#N{number}. {mark_player}{player_total}({player}) - {mark_banker}{banker_total}({banker})"
+    return pending, final
+
+async def play_source_feed(client: FakeTelegramClient, chat_id: int, interval: float,
+                           start_game: int = 1, finalize_after: float = None, count: int = None):
+    """
+    Publie des jeux synthétiques dans `chat_id`: un message en cours (⏰) puis son
+    édition finalisée `finalize_after` secondes plus tard (défaut: la moitié de
+    `interval`). S'arrête après `count` jeux (None = sans fin).
+    """
+    rng = client.conditions.rng
+    finalize_after = interval / 2 if finalize_after is None else finalize_after
+    number = start_game
+    while count is None or number < start_game + count:
+        pending, final = synthetic_game_texts(number, rng)
+        message = client.emit_message(chat_id, pending)
+        await asyncio.sleep(finalize_after)
+        client.emit_edit(chat_id, message.id, final)
+        await asyncio.sleep(max(interval - finalize_after, 0))
+        number += 1
@@ -0,0 +1,122 @@
+"""
+Publication vers plusieurs canaux de destination, chacun avec sa propre file d'envoi
+"""
+import asyncio
+import logging
+from time import monotonic
+
+from telethon.errors import FloodWaitError, MessageNotModifiedError
+
+logger = logging.getLogger(__name__)
+
+PROBE_DELAY = 30 # Premier délai avant de revérifier une destination inaccessible (secondes)
+MAX_PROBE_DELAY = 600 # Délai maximal entre deux vérifications (doublé à chaque échec)
+
+class Destination:
+    """
+    Canal ou groupe de destination. Les opérations (envoi puis éditions) sont
+    exécutées dans l'ordre par un worker dédié: une destination lente ou en
+    erreur ne retarde jamais les autres. Chaque opération est retentée avec
+    un délai exponentiel (ou le délai imposé par un FloodWait).
+
+    Une destination inaccessible (`ok` faux) est ignorée par les envois mais
+    revérifiée par `probe()` dès que `probe_due()`, avec un délai doublé à chaque échec.
+    """
+
+    def __init__(self, chat_id: int, max_retries: int = 3, base_delay: float = 1.0,
+                 probe_delay: float = PROBE_DELAY, max_probe_delay: float = MAX_PROBE_DELAY):
+        self.chat_id = chat_id
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.probe_delay = probe_delay
+        self.max_probe_delay = max_probe_delay
+        self.ok = False # Accès vérifié (au démarrage, puis par probe())
+        self.probe_failures = 0
+        self.next_probe_at = 0.0 # monotonic() de la prochaine vérification
+        self.sent = 0
+        self.failed = 0
+        self._queue = None
+        self._worker = None
+        self._in_flight = 0
+
+    @property
+    def depth(self) -> int:
+        """Opérations en attente ou en cours."""
+        return (self._queue.qsize() if self._queue else 0) + self._in_flight
+
+    def submit(self, call, on_success=None, label: str = ''):
+        """
+        Ajoute une opération à la file (non bloquant). `call()` crée la coroutine
+        Telegram (rappelée à chaque essai), `on_success(résultat)` est appelée en cas de succès.
+        """
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        self._queue.put_nowait((call, on_success, label))
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+
+    def probe_due(self, now: float = None) -> bool:
+        """Vrai si la destination est inaccessible et que le délai avant la prochaine vérification est écoulé."""
+        return not self.ok and (monotonic() if now is None else now) >= self.next_probe_at
+
+    async def probe(self, check):
+        """
+        Vérifie l'accès: `check()` crée la coroutine Telegram (ex: get_entity),
+        dont le résultat est retourné. En cas d'échec, l'exception est propagée et
+        la prochaine vérification est repoussée.
+        """
+        try:
+            result = await check()
+        except Exception:
+            self.ok = False
+            self.next_probe_at = monotonic() + min(self.probe_delay * 2 ** self.probe_failures, self.max_probe_delay)
+            self.probe_failures += 1
+            raise
+        self.ok = True
+        self.probe_failures = 0
+        return result
+
+    async def drain(self, timeout: float):
+        """Attend que la file soit vide (au plus `timeout` secondes)."""
+        deadline = monotonic() + timeout
+        while self.depth > 0 and monotonic() < deadline:
+            await asyncio.sleep(0.05)
+
+    async def _run(self):
+        while not self._queue.empty():
+            call, on_success, label = self._queue.get_nowait()
+            self._in_flight = 1
+            try:
+                await self._execute(call, on_success, label)
+            finally:
+                self._in_flight = 0
+
+    async def _execute(self, call, on_success, label):
+        started = monotonic()
+        for attempt in range(self.max_retries + 1):
+            try:
+                result = await call()
+            except MessageNotModifiedError:
+                return # Contenu identique: rien à faire
+            except FloodWaitError as e:
+                delay = e.seconds
+                error = e
+            except Exception as e:
+                delay = self.base_delay * (2 ** attempt)
+                error = e
+            else:
+                self.sent += 1
+                logger.info(
+                    "📤 %s -> %s", label, self.chat_id,
+                    extra={'stage': 'fanout', 'latency_ms': round((monotonic() - started) * 1000, 1)}
+                )
+                if on_success is not None:
+                    on_success(result)
+                return
+
+            if attempt < self.max_retries:
+                logger.warning("⚠️ %s -> %s échoué (%s), nouvel essai dans %ss", label, self.chat_id, error, delay)
+                await asyncio.sleep(delay)
+
+        self.failed += 1
+        logger.error("❌ %s -> %s abandonné après %s essais: %s", label, self.chat_id, self.max_retries + 1, error)
@@ -0,0 +1,195 @@
+"""
+Prédicteur par fréquences: pour chaque contexte (couleur et valeur de la carte source,
+parité du jeu), nombre de fois où chaque couleur est sortie dans le 1er groupe du jeu
+cible, sur les `window` derniers jeux
+
+Les compteurs sont des tableaux `array` de la bibliothèque standard: NumPy n'est
+pas nécessaire, il ne sert qu'à `to_numpy()` (vues sans copie pour l'analyse).
+"""
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # NumPy est optionnel (to_numpy uniquement)
+    np = None
+
+N_SUITS = 4 # Codes couleur (prediction_records.SUIT_CODES)
+N_PARITIES = 2
+N_VALUES = 14 # Codes valeur (game_archive.card_value_code): 0 = inconnue, A=1 ... K=13
+N_CONTEXTS = N_SUITS * N_PARITIES * N_VALUES
+CONTEXT_MEMORY = 64 # Jeux source dont le contexte est gardé en attendant le résultat du jeu cible
+
+def context_index(suit: int, game_number: int, value: int) -> int:
+    """Index du contexte (couleur, parité du jeu, valeur), -1 si la couleur est inconnue."""
+    if not 0 <= suit < N_SUITS:
+        return -1
+    value = value if 0 <= value < N_VALUES else 0
+    return (suit * N_PARITIES + game_number % 2) * N_VALUES + value
+
+class LagCounters:
+    """
+    Compteurs glissants d'un décalage source -> cible: `hits[contexte, couleur]`
+    et `totals[contexte]`. Un anneau des `window` dernières observations permet de
+    retirer la plus ancienne à chaque ajout; rien n'est jamais recalculé depuis l'historique.
+    """
+
+    def __init__(self, window: int):
+        self.window = window
+        self.hits = array('l', [0]) * (N_CONTEXTS * N_SUITS)
+        self.totals = array('l', [0]) * N_CONTEXTS
+        self._ring_context = array('h', [0]) * window
+        self._ring_mask = array('B', [0]) * window
+        self._next = 0
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def push(self, context: int, mask: int):
+        i = self._next
+        if self._size == self.window:
+            self._count(self._ring_context[i], self._ring_mask[i], -1)
+        else:
+            self._size += 1
+        self._ring_context[i] = context
+        self._ring_mask[i] = mask
+        self._count(context, mask, 1)
+        self._next = (i + 1) % self.window
+
+    def _count(self, context: int, mask: int, delta: int):
+        self.totals[context] += delta
+        base = context * N_SUITS
+        for suit in range(N_SUITS):
+            if mask & (1 << suit):
+                self.hits[base + suit] += delta
+
+    def rates(self, contexts):
+        total = sum(self.totals[c] for c in contexts)
+        if not total:
+            return 0, [0.0] * N_SUITS
+        return total, [sum(self.hits[c * N_SUITS + s] for c in contexts) / total for s in range(N_SUITS)]
+
+    def observations(self) -> list:
+        """[[contexte, masque]] de la plus ancienne à la plus récente."""
+        start = (self._next - self._size) % self.window
+        order = [(start + k) % self.window for k in range(self._size)]
+        return [[self._ring_context[i], self._ring_mask[i]] for i in order]
+
+class FrequencyModel:
+    """
+    Un jeu finalisé est compté, en O(1) par décalage, pour chacun des décalages
+    source -> cible demandés (A actuel, et toutes les valeurs de A que /tune peut
+    choisir): changer A ne remet aucun compteur à zéro. La couleur prédite est
+    celle au meilleur taux dans le contexte, ou, si le contexte a moins de
+    `min_samples` observations, pour la même couleur et parité toutes valeurs confondues.
+    """
+
+    def __init__(self, window: int = 2000, min_samples: int = 20):
+        self.window = window
+        self.min_samples = min_samples
+        self._lags = {} # Décalage -> LagCounters (créés à la première observation)
+        self._contexts = {} # Jeu source -> contexte (CONTEXT_MEMORY derniers)
+        self._counted = {} # Jeux cibles déjà comptés (éditions répétées d'un même jeu)
+
+    def __len__(self):
+        """Observations conservées, tous décalages confondus."""
+        return sum(len(counters) for counters in self._lags.values())
+
+    @property
+    def lags(self) -> list:
+        return sorted(self._lags)
+
+    def samples(self, lag: int) -> int:
+        """Observations conservées pour un décalage."""
+        counters = self._lags.get(lag)
+        return len(counters) if counters is not None else 0
+
+    def reset(self):
+        self._lags.clear()
+        self._counted.clear()
+
+    def observe_context(self, game_number: int, suit: int, value: int):
+        """Contexte d'un jeu source (à la lecture de la carte, avant la finalisation)."""
+        context = context_index(suit, game_number, value)
+        if context < 0:
+            return
+        self._contexts.pop(game_number, None)
+        self._contexts[game_number] = context
+        if len(self._contexts) > CONTEXT_MEMORY:
+            del self._contexts[next(iter(self._contexts))]
+
+    def observe_result(self, game_number: int, first_group_mask: int, lags):
+        """Résultat d'un jeu finalisé: compté pour le contexte du jeu source `game_number - lag` de chaque décalage."""
+        if game_number in self._counted:
+            return
+        self._counted[game_number] = True
+        if len(self._counted) > CONTEXT_MEMORY:
+            del self._counted[next(iter(self._counted))]
+        for lag in lags:
+            context = self._contexts.get(game_number - lag)
+            if context is None:
+                continue
+            counters = self._lags.get(lag)
+            if counters is None:
+                counters = self._lags[lag] = LagCounters(self.window)
+            counters.push(context, first_group_mask)
+
+    def _rates(self, lag: int, contexts):
+        counters = self._lags.get(lag)
+        if counters is None:
+            return 0, [0.0] * N_SUITS
+        return counters.rates(contexts)
+
+    def marginal_rates(self, suit: int, game_number: int, lag: int):
+        """(observations, [taux par couleur]) pour la couleur source et la parité, toutes valeurs confondues."""
+        context = context_index(suit, game_number, 0)
+        if context < 0:
+            return 0, [0.0] * N_SUITS
+        return self._rates(lag, range(context, context + N_VALUES))
+
+    def rates(self, suit: int, game_number: int, value: int, lag: int):
+        """(observations, [taux par couleur]) du contexte, ou de son repli si trop peu observé."""
+        context = context_index(suit, game_number, value)
+        counters = self._lags.get(lag)
+        if context < 0 or counters is None:
+            return 0, [0.0] * N_SUITS
+        if counters.totals[context] < self.min_samples:
+            return self.marginal_rates(suit, game_number, lag)
+        return counters.rates((context,))
+
+    def predict(self, suit: int, game_number: int, value: int, lag: int) -> int:
+        """Code de la couleur au meilleur taux pour le décalage `lag`, -1 si trop peu d'observations."""
+        total, rates = self.rates(suit, game_number, value, lag)
+        if total < self.min_samples:
+            return -1
+        return max(range(N_SUITS), key=rates.__getitem__)
+
+    def to_numpy(self, lag: int) -> dict:
+        """Vues NumPy (sans copie) des compteurs d'un décalage: hits[couleur, parité, valeur, couleur sortie]."""
+        if np is None:
+            raise RuntimeError("NumPy n'est pas installé")
+        counters = self._lags.get(lag) or LagCounters(1)
+        return {
+            'hits': np.frombuffer(counters.hits, dtype=np.dtype(counters.hits.typecode)).reshape(
+                N_SUITS, N_PARITIES, N_VALUES, N_SUITS),
+            'totals': np.frombuffer(counters.totals, dtype=np.dtype(counters.totals.typecode)).reshape(
+                N_SUITS, N_PARITIES, N_VALUES),
+        }
+
+    def to_dict(self) -> dict:
+        """Observations de chaque décalage (de la plus ancienne à la plus récente) et contextes en attente."""
+        return {
+            'lags': {str(lag): counters.observations() for lag, counters in self._lags.items()},
+            'contexts': [[game, context] for game, context in self._contexts.items()],
+            'counted': list(self._counted),
+        }
+
+    def load_dict(self, data: dict):
+        self.reset()
+        for lag, observations in data.get('lags', {}).items():
+            counters = self._lags[int(lag)] = LagCounters(self.window)
+            for context, mask in observations[-self.window:]:
+                if 0 <= context < N_CONTEXTS:
+                    counters.push(context, mask)
+        self._contexts = {game: context for game, context in data.get('contexts', [])}
+        self._counted = {game: True for game in data.get('counted', [])}
@@ -0,0 +1,206 @@
+"""
+Archive colonnaire en ajout seul des jeux source finalisés, lisible par mmap
+
+Chaque colonne est un fichier binaire à largeur fixe dans le répertoire de
+l'archive (une ligne = un jeu finalisé, dans l'ordre d'arrivée). Un fichier
+d'index à adressage direct donne la dernière ligne de chaque numéro de jeu.
+"""
+import os
+import mmap
+import struct
+import threading
+from bisect import bisect_left
+
+try:
+    import numpy as np
+except ImportError:  # NumPy est optionnel (to_numpy uniquement)
+    np = None
+
+# (nom, format struct/memoryview)
+COLUMNS = (
+    ('game', 'i'),
+    ('g1_value', 'b'),  # Valeur de la 1ère carte du 1er groupe (A=1 ... K=13, 0 = inconnue)
+    ('g1_suit', 'b'),  # Code couleur (voir prediction_records.SUIT_CODES, -1 = inconnue)
+    ('g1_mask', 'B'),  # Bit `1 << code` pour chaque couleur présente dans le groupe
+    ('g2_value', 'b'),
+    ('g2_suit', 'b'),
+    ('g2_mask', 'B'),
+    ('finalized_at', 'd'),  # Epoch
+)
+INDEX_FILE = 'index.i4'
+INDEX_SIZE = 1 << 17 # Numéros de jeu indexables: 0 à 131071
+
+CARD_VALUE_CODES = {'A': 1, 'T': 10, '10': 10, 'J': 11, 'Q': 12, 'K': 13}
+CARD_VALUE_CODES.update({str(v): v for v in range(2, 10)})
+
+def card_value_code(value: str) -> int:
+    """Code entier d'une valeur de carte ('' ou inconnue -> 0)."""
+    return CARD_VALUE_CODES.get((value or '').upper(), 0)
+
+def _column_path(directory: str, name: str, fmt: str) -> str:
+    return os.path.join(directory, f"{name}.{fmt}{struct.calcsize(fmt)}")
+
+class GameArchive:
+    """
+    Écriture en ajout seul (un seul processus écrivain). `append()` ne fait
+    que mettre la ligne en mémoire tampon (aucun appel système); `flush()`,
+    exécuté dans un thread, écrit les lignes en attente avec un seul
+    `os.write` par colonne. L'index est à jour dès `append()`: les vues ne
+    voient une ligne qu'une fois écrite (ArchiveView.row_for_game).
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._packers = [(name, struct.Struct(fmt).pack) for name, fmt in COLUMNS]
+        self._buffers = {name: bytearray() for name, _ in COLUMNS}
+        self._buffer_lock = threading.Lock() # Échange des tampons (boucle asyncio / thread d'écriture)
+        self._write_lock = threading.Lock() # Un seul flush() à la fois: lignes écrites dans l'ordre
+        self.pending = 0 # Lignes en attente d'écriture
+        self._fds = {}
+        rows = None
+        for name, fmt in COLUMNS:
+            path = _column_path(directory, name, fmt)
+            fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_APPEND, 0o644)
+            self._fds[name] = fd
+            count = os.fstat(fd).st_size // struct.calcsize(fmt)
+            rows = count if rows is None else min(rows, count)
+        # Après un arrêt brutal au milieu d'un ajout, les colonnes sont ramenées à la même longueur
+        for name, fmt in COLUMNS:
+            os.ftruncate(self._fds[name], rows * struct.calcsize(fmt))
+        self.rows = rows
+
+        index_path = os.path.join(directory, INDEX_FILE)
+        index_fd = os.open(index_path, os.O_RDWR | os.O_CREAT, 0o644)
+        if os.fstat(index_fd).st_size < INDEX_SIZE * 4:
+            os.ftruncate(index_fd, INDEX_SIZE * 4)
+        self._index_map = mmap.mmap(index_fd, INDEX_SIZE * 4)
+        os.close(index_fd)
+        self._index = memoryview(self._index_map).cast('i')  # Ligne + 1 (0 = absent)
+
+    def __len__(self):
+        return self.rows
+
+    def last_row_for_game(self, game: int):
+        if 0 <= game < INDEX_SIZE and self._index[game]:
+            return self._index[game] - 1
+        return None
+
+    def append(self, game: int, g1_value: int, g1_suit: int, g1_mask: int,
+               g2_value: int, g2_suit: int, g2_mask: int, finalized_at: float) -> int:
+        """Ajoute un jeu finalisé (en attente d'écriture, voir flush()) et retourne son numéro de ligne."""
+        values = (game, g1_value, g1_suit, g1_mask, g2_value, g2_suit, g2_mask, finalized_at)
+        with self._buffer_lock:
+            for (name, pack), value in zip(self._packers, values):
+                self._buffers[name] += pack(value)
+            self.pending += 1
+        row = self.rows
+        self.rows += 1
+        if 0 <= game < INDEX_SIZE:
+            self._index[game] = row + 1
+        return row
+
+    def flush(self) -> int:
+        """
+        Écrit les lignes en attente (un appel système par colonne) et retourne leur nombre.
+        Appel bloquant: à exécuter dans un thread (asyncio.to_thread).
+        """
+        with self._write_lock:
+            with self._buffer_lock:
+                if not self.pending:
+                    return 0
+                buffers, count = self._buffers, self.pending
+                self._buffers = {name: bytearray() for name, _ in COLUMNS}
+                self.pending = 0
+            for name, data in buffers.items():
+                os.write(self._fds[name], data)
+            return count
+
+    def open_view(self):
+        """Vue en lecture seule (mmap) des lignes déjà écrites."""
+        return ArchiveView(self.directory)
+
+    def close(self):
+        self.flush()
+        self._index.release()
+        self._index_map.close()
+        for fd in self._fds.values():
+            os.close(fd)
+        self._fds = {}
+
+class ArchiveView:
+    """
+    Accès sans copie aux colonnes: `view.columns['game'][row]`, recherche
+    O(1) par numéro de jeu et O(log n) par date de finalisation.
+    """
+
+    def __init__(self, directory: str):
+        self._maps = []
+        self.columns = {}
+        self.rows = None
+        for name, fmt in COLUMNS:
+            size = 0
+            path = _column_path(directory, name, fmt)
+            if os.path.exists(path):
+                size = os.path.getsize(path) // struct.calcsize(fmt)
+            self.rows = size if self.rows is None else min(self.rows, size)
+
+        for name, fmt in COLUMNS:
+            length = self.rows * struct.calcsize(fmt)
+            if length == 0:
+                self.columns[name] = memoryview(b'').cast(fmt)
+                continue
+            with open(_column_path(directory, name, fmt), 'rb') as f:
+                column_map = mmap.mmap(f.fileno(), length, access=mmap.ACCESS_READ)
+            self._maps.append(column_map)
+            self.columns[name] = memoryview(column_map).cast(fmt)
+
+        index_path = os.path.join(directory, INDEX_FILE)
+        self._index = None
+        if os.path.exists(index_path) and os.path.getsize(index_path) >= INDEX_SIZE * 4:
+            with open(index_path, 'rb') as f:
+                index_map = mmap.mmap(f.fileno(), INDEX_SIZE * 4, access=mmap.ACCESS_READ)
+            self._maps.append(index_map)
+            self._index = memoryview(index_map).cast('i')
+
+    def __len__(self):
+        return self.rows
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def row(self, row: int) -> dict:
+        return {name: self.columns[name][row] for name, _ in COLUMNS}
+
+    def row_for_game(self, game: int):
+        """Dernière ligne du numéro de jeu `game` (None si absent de la vue)."""
+        if self._index is None or not 0 <= game < INDEX_SIZE:
+            return None
+        row = self._index[game] - 1
+        return row if 0 <= row < self.rows else None
+
+    def rows_between(self, start_ts: float, end_ts: float) -> range:
+        """Lignes finalisées dans [start_ts, end_ts[ (colonne triée par construction)."""
+        column = self.columns['finalized_at']
+        return range(bisect_left(column, start_ts), bisect_left(column, end_ts))
+
+    def to_numpy(self, start: int = 0, stop: int = None) -> dict:
+        """Colonnes sous forme de tableaux NumPy partageant la mémoire du mmap (sans copie)."""
+        if np is None:
+            raise RuntimeError("NumPy n'est pas installé")
+        stop = self.rows if stop is None else min(stop, self.rows)
+        return {name: np.frombuffer(self.columns[name], dtype=np.dtype(fmt))[start:stop]
+                for name, fmt in COLUMNS}
+
+    def close(self):
+        for column in self.columns.values():
+            column.release()
+        if self._index is not None:
+            self._index.release()
+        for column_map in self._maps:
+            column_map.close()
+        self.columns = {}
+        self._maps = []
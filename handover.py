@@ -0,0 +1,116 @@
+"""
+Passation d'état entre l'ancien et le nouveau processus du bot (socket Unix local)
+
+Protocole (une ligne JSON par requête/réponse, une connexion par requête):
+1. {"op": "prepare"}: avant sa connexion à Telegram, le nouveau processus
+   demande à l'ancien de libérer le fichier de session (commit SQLite).
+   Sans demande d'état dans le délai prévu (nouveau processus arrêté ou en
+   échec), ou si la passation échoue, l'ancien reprend sa session.
+2. {"op": "handover"}: une fois connecté et prêt, il demande l'état;
+   l'ancien arrête de consommer les événements, vide ses envois en cours,
+   répond {"ok": true, "state": {...}} puis s'arrête.
+"""
+import os
+import json
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Limite de taille d'une ligne du protocole (l'état complet tient largement dedans)
+STREAM_LIMIT = 16 * 1024 * 1024
+
+async def serve_handover(path: str, prepare, surrender, on_complete, abort=None, prepare_timeout: float = 120):
+    """
+    Écoute les demandes de passation sur `path`.
+    `prepare()` est appelée sur "prepare", `surrender()` (coroutine) arrête le
+    traitement et retourne l'état à transmettre, `on_complete()` (coroutine)
+    est appelée une fois l'état envoyé. `abort()` annule `prepare()` si aucune
+    demande d'état n'arrive dans les `prepare_timeout` secondes, ou si la passation échoue.
+    """
+    loop = asyncio.get_running_loop()
+    expiry = None # Annulation programmée après "prepare"
+
+    def cancel_expiry():
+        nonlocal expiry
+        if expiry is not None:
+            expiry.cancel()
+            expiry = None
+
+    def expire():
+        nonlocal expiry
+        expiry = None
+        logger.warning("⚠️ Aucune demande d'état %ss après la préparation: passation abandonnée", prepare_timeout)
+        abort()
+
+    async def handle(reader, writer):
+        nonlocal expiry
+        op = None
+        try:
+            request = json.loads(await reader.readline() or b'{}')
+            op = request.get('op')
+            if op == 'prepare':
+                prepare()
+                if abort is not None:
+                    cancel_expiry()
+                    expiry = loop.call_later(prepare_timeout, expire)
+                writer.write(b'{"ok": true}\n')
+                await writer.drain()
+                return
+            if op != 'handover':
+                writer.write(b'{"ok": false, "error": "unknown op"}\n')
+                await writer.drain()
+                return
+            logger.info("🤝 Demande de passation reçue, arrêt du traitement...")
+            cancel_expiry()
+            state = await surrender()
+            writer.write(json.dumps({'ok': True, 'state': state}, ensure_ascii=False).encode('utf-8') + b'\n')
+            await writer.drain()
+        except Exception as e:
+            logger.error("Erreur passation (serveur): %s", e)
+            if op == 'handover' and abort is not None:
+                abort()
+            return
+        finally:
+            writer.close()
+        logger.info("🤝 État transmis au nouveau processus")
+        await on_complete()
+
+    if os.path.exists(path):
+        os.remove(path)  # Socket de l'ancien processus: il reste joignable tant qu'il est ouvert
+    return await asyncio.start_unix_server(handle, path=path, limit=STREAM_LIMIT)
+
+async def _request(path: str, op: str, timeout: float):
+    """Envoie une requête au processus en cours; retourne sa réponse (dict) ou None."""
+    if not os.path.exists(path):
+        return None
+    try:
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_unix_connection(path=path, limit=STREAM_LIMIT), timeout
+        )
+    except (OSError, asyncio.TimeoutError):
+        return None  # Socket orphelin (ancien processus déjà arrêté)
+
+    try:
+        writer.write(json.dumps({'op': op}).encode('utf-8') + b'\n')
+        await writer.drain()
+        line = await asyncio.wait_for(reader.readline(), timeout)
+        reply = json.loads(line or b'{}')
+        if not reply.get('ok'):
+            logger.error("Passation (%s) refusée: %s", op, reply.get('error'))
+            return None
+        return reply
+    except (OSError, ValueError, asyncio.TimeoutError) as e:
+        logger.error("Erreur passation (%s): %s", op, e)
+        return None
+    finally:
+        writer.close()
+
+async def request_prepare(path: str, timeout: float) -> bool:
+    """Demande à l'ancien processus de libérer la session. False s'il n'y en a pas."""
+    return await _request(path, 'prepare', timeout) is not None
+
+async def request_handover(path: str, timeout: float):
+    """Demande l'état à l'ancien processus. Retourne l'état (dict) ou None."""
+    reply = await _request(path, 'handover', timeout)
+    return reply.get('state') if reply else None
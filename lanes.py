@@ -0,0 +1,157 @@
+"""
+Files de traitement séparées: commandes admin (prioritaires) et événements du canal source
+"""
+import asyncio
+import logging
+from collections import OrderedDict, deque
+from time import monotonic
+
+from loop_monitor import percentile
+
+logger = logging.getLogger(__name__)
+
+class LaneStats:
+    """Profondeur, volumes et temps d'attente récents (ms) d'une file."""
+
+    def __init__(self, window: int = 1000):
+        self.waits = deque(maxlen=window)
+        self.processed = 0
+        self.max_depth = 0
+
+    def record_wait(self, wait: float):
+        self.waits.append(wait * 1000)
+        self.processed += 1
+
+    def snapshot(self, depth: int) -> dict:
+        values = sorted(self.waits)
+        return {
+            'depth': depth,
+            'max_depth': self.max_depth,
+            'processed': self.processed,
+            'wait_p50_ms': round(percentile(values, 0.50), 2),
+            'wait_p99_ms': round(percentile(values, 0.99), 2),
+            'wait_max_ms': round(values[-1], 2) if values else 0.0,
+        }
+
+class ControlLane:
+    """
+    Commandes admin: chacune s'exécute dès sa réception (sans file). La file
+    source s'efface devant elles: avant chaque événement, elle attend les
+    commandes en cours depuis moins de `max_hold` secondes, pour qu'un `/time`
+    ou un `/ec 0` s'applique dès l'événement suivant sans qu'une commande
+    longue (`/deploy`, `/export`) ne bloque les jeux.
+    """
+
+    def __init__(self, max_hold: float = 0.5):
+        self.max_hold = max_hold
+        self.stats = LaneStats()
+        self._running = {} # Jeton -> monotonic() au début
+        self._changed = asyncio.Event()
+        self._next_token = 0
+
+    @property
+    def depth(self) -> int:
+        return len(self._running)
+
+    async def run(self, coro, received_at: float = None):
+        """Exécute une commande en la signalant à la file source."""
+        token = self._next_token
+        self._next_token += 1
+        started = monotonic()
+        self.stats.record_wait(started - received_at if received_at is not None else 0.0)
+        self._running[token] = started
+        self.stats.max_depth = max(self.stats.max_depth, len(self._running))
+        try:
+            return await coro
+        finally:
+            del self._running[token]
+            self._changed.set()
+
+    async def yield_to_commands(self):
+        """Attend les commandes récentes (au plus `max_hold` secondes chacune)."""
+        while True:
+            now = monotonic()
+            recent = [started for started in self._running.values() if now - started < self.max_hold]
+            if not recent:
+                return # Les commandes plus longues continuent en parallèle
+            self._changed.clear()
+            try:
+                await asyncio.wait_for(self._changed.wait(), self.max_hold - (now - min(recent)))
+            except asyncio.TimeoutError:
+                pass
+
+    def snapshot(self) -> dict:
+        return self.stats.snapshot(self.depth)
+
+class SourceLane:
+    """
+    Événements du canal source traités un par un, dans l'ordre d'arrivée, par
+    un worker dédié. Une édition encore en file est remplacée par la suivante
+    du même message (seul le dernier contenu compte); au-delà de `capacity`
+    événements en attente, les plus anciens sont abandonnés.
+    """
+
+    def __init__(self, handle, control: ControlLane = None, capacity: int = 1000):
+        self.handle = handle # async handle(item)
+        self.control = control
+        self.capacity = capacity
+        self.stats = LaneStats()
+        self.coalesced = 0
+        self.shed = 0
+        self._pending = OrderedDict() # Clé -> (monotonic() à la mise en file, élément)
+        self._wakeup = None
+        self._worker = None
+        self._next_seq = 0
+
+    @property
+    def depth(self) -> int:
+        return len(self._pending)
+
+    def submit(self, item, coalesce_key=None):
+        """
+        Met un événement en file (non bloquant). Les événements de même
+        `coalesce_key` (édition d'un même message) sont fusionnés.
+        """
+        if coalesce_key is not None and coalesce_key in self._pending:
+            enqueued_at, _ = self._pending[coalesce_key]
+            self._pending[coalesce_key] = (enqueued_at, item)
+            self.coalesced += 1
+            return
+        if coalesce_key is None:
+            coalesce_key = ('seq', self._next_seq)
+            self._next_seq += 1
+        while len(self._pending) >= self.capacity:
+            self._pending.popitem(last=False)
+            self.shed += 1
+            logger.warning("⚠️ File source pleine: événement le plus ancien abandonné", extra={'category': 'lane_shed'})
+        self._pending[coalesce_key] = (monotonic(), item)
+        self.stats.max_depth = max(self.stats.max_depth, len(self._pending))
+
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        self._wakeup.set()
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            if not self._pending:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            # Laisse passer les commandes reçues entre-temps avant l'événement suivant
+            await asyncio.sleep(0)
+            if self.control is not None:
+                await self.control.yield_to_commands()
+            _, (enqueued_at, item) = self._pending.popitem(last=False)
+            self.stats.record_wait(monotonic() - enqueued_at)
+            try:
+                await self.handle(item)
+            except Exception:
+                logger.exception("Erreur traitement événement source")
+
+    def snapshot(self) -> dict:
+        snap = self.stats.snapshot(self.depth)
+        snap['coalesced'] = self.coalesced
+        snap['shed'] = self.shed
+        return snap
@@ -0,0 +1,45 @@
+"""
+Mesure continue du retard d'ordonnancement de la boucle asyncio
+"""
+import asyncio
+from collections import deque
+from time import monotonic
+
+def percentile(sorted_values, fraction: float) -> float:
+    """Percentile (méthode du rang le plus proche) d'une liste déjà triée."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+class LoopLagMonitor:
+    """
+    Se réveille toutes les `interval` secondes et mesure l'écart entre le
+    réveil prévu et le réveil réel: c'est le temps pendant lequel la boucle
+    était occupée par autre chose (écriture disque, compression, etc.).
+    """
+
+    def __init__(self, interval: float = 0.5, window: int = 600):
+        self.interval = interval
+        self.samples = deque(maxlen=window)  # Retards en millisecondes
+        self.last_tick = None
+
+    async def run(self):
+        while True:
+            expected = monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = monotonic()
+            self.samples.append(max(0.0, (now - expected) * 1000))
+            self.last_tick = now
+
+    def snapshot(self) -> dict:
+        values = sorted(self.samples)
+        return {
+            'samples': len(values),
+            'p50_ms': round(percentile(values, 0.50), 2),
+            'p95_ms': round(percentile(values, 0.95), 2),
+            'p99_ms': round(percentile(values, 0.99), 2),
+            'max_ms': round(values[-1], 2) if values else 0.0,
+            # Âge du dernier réveil: si la boucle est bloquée, il dépasse largement l'intervalle
+            'tick_age_s': round(monotonic() - self.last_tick, 2) if self.last_tick else None,
+        }
@@ -1,29 +1,68 @@
 import os
 import asyncio
 import re
+import signal
 import logging
 import sys
 import zipfile
 import shutil
 import json
+from collections import deque
 from datetime import datetime, timedelta, timezone, time
+from time import monotonic
 from telethon import TelegramClient, events
-from telethon.sessions import StringSession
+from telethon.sessions import StringSession, SQLiteSession
 from aiohttp import web
 from config import (
     API_ID, API_HASH, BOT_TOKEN, ADMIN_ID,
-    SOURCE_CHANNEL_ID, PREDICTION_CHANNEL_ID, PORT,
+    SOURCE_CHANNEL_ID, PREDICTION_CHANNEL_ID, PREDICTION_CHANNEL_IDS, PORT,
     SUIT_DISPLAY, SUIT_NORMALIZE,
-    A_OFFSET_DEFAULT, R_OFFSET_DEFAULT, VERIFICATION_EMOJIS
+    A_OFFSET_DEFAULT, R_OFFSET_DEFAULT, VERIFICATION_EMOJIS,
+    LOG_FORMAT, LOG_SAMPLE_SECONDS, SESSION_FILE, TELEGRAM_SESSION, TENANTS_FILE, FAKE_TELEGRAM,
+    HEALTH_MAX_LOOP_LAG_MS, HEALTH_MAX_SOURCE_AGE, HEALTH_MAX_OUTBOUND,
+    HISTORY_FILE, HISTORY_FLUSH_INTERVAL, EXPORT_TOKEN, CONFIG_WATCH_INTERVAL,
+    HANDOVER_SOCKET, HANDOVER_TIMEOUT, HANDOVER_DRAIN_TIMEOUT, HANDOVER_PREPARE_TIMEOUT,
+    STATE_HORIZON_SECONDS, STATE_HORIZON_GAMES, SCHEDULED_RESETS, DAILY_REPORT_TO_CHANNEL,
+    SLO_TARGET, SLO_WINDOW_SECONDS, SOURCE_LANE_CAPACITY, CONTROL_LANE_MAX_HOLD,
+    BACKFILL_MAX_GAP, BACKFILL_CONCURRENCY,
+    DESTINATION_MAX_RETRIES, DESTINATION_RETRY_DELAY, ARCHIVE_DIR, ARCHIVE_FLUSH_INTERVAL,
+    SIMULATION_WORKERS, SIMULATION_MAX_JOBS, SIMULATION_TIMEOUT, SIMULATION_MAX_GAMES, TUNING_INTERVAL,
+    EVENT_LOOP
 )
+from bot_logging import setup_logging, queued_records
+from loop_monitor import LoopLagMonitor
+from prediction_records import Prediction, suit_code, suit_from_code, monotonic_to_wall
+from handover import serve_handover, request_prepare, request_handover
+from backfill import GapBackfiller
+from game_archive import GameArchive
+from cards import (
+    CARD_SUIT, CARD_VALUE, VALUE_NAMES, decode_hand, hand_mask, hand_total, is_natural
+)
+from tenants import Tenant, PRIMARY_TENANT, PREDICTORS, load_tenant_specs
+from eviction import RecentKeys
+from daily_report import DailyStats
+from fake_telegram import ApiConditions, FakeTelegramClient, play_source_feed
+from slo import STAGE_LABELS
+from lanes import ControlLane, SourceLane
+from mem_profile import MemoryProfiler, format_bytes
+from backtest import SimulationRunner
+from tuning import TUNING_MODES, validate_settings
+from event_loop import current_backend, run as run_event_loop
 
 # --- Configuration et Initialisation ---
-logging.basicConfig(
+# Processus des simulations /simulate (si SIMULATION_WORKERS > 0): créés par fork
+# avant le premier thread du processus (thread de journalisation ci-dessous), voir
+# backtest.py. Importer ce module crée donc ces processus.
+simulations = SimulationRunner(SIMULATION_WORKERS, SIMULATION_MAX_JOBS, SIMULATION_TIMEOUT)
+if ARCHIVE_DIR and SIMULATION_WORKERS > 0:
+    simulations.start_pool()
+
+# Les logs passent par une file d'attente: l'écriture sur stdout se fait dans
+# un thread dédié et ne bloque jamais la boucle d'événements.
+setup_logging(
     level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(sys.stdout)
-    ]
+    json_format=(LOG_FORMAT == 'json'),
+    sample_interval=LOG_SAMPLE_SECONDS
 )
 logger = logging.getLogger(__name__)
 
@@ -38,83 +77,352 @@ if not BOT_TOKEN:
     logger.error("BOT_TOKEN manquant")
     exit(1)
 
-logger.info(f"Configuration: SOURCE_CHANNEL={SOURCE_CHANNEL_ID}, PREDICTION_CHANNEL={PREDICTION_CHANNEL_ID}")
+logger.info("Configuration: SOURCE_CHANNEL=%s, PREDICTION_CHANNELS=%s", SOURCE_CHANNEL_ID, PREDICTION_CHANNEL_IDS)
 
-# Initialisation du client Telegram
-session_string = os.getenv('TELEGRAM_SESSION', '')
-client = TelegramClient(StringSession(session_string), API_ID, API_HASH)
+# Initialisation des clients Telegram
 
-# --- Variables Globales d'État ---
-pending_predictions = {}
-processed_predictions = set()
-processed_verifications = set()
-current_game_number = 0
+def build_session(session_file: str, string_session: str = ''):
+    """
+    Ouvre la session SQLite persistante. Si elle est vide et qu'une
+    StringSession est fournie (TELEGRAM_SESSION), la clé d'auth et le DC en sont importés.
+    """
+    session = SQLiteSession(session_file)
+    if session.auth_key is None and string_session:
+        try:
+            imported = StringSession(string_session)
+            session.set_dc(imported.dc_id, imported.server_address, imported.port)
+            session.auth_key = imported.auth_key
+            session.save()
+            logger.info("🔑 Session importée depuis TELEGRAM_SESSION")
+        except Exception as e:
+            logger.error("Erreur import TELEGRAM_SESSION: %s", e)
+    elif session.auth_key is not None:
+        logger.info("🔑 Session persistante chargée: %s", session.filename)
+    return session
+
+# API simulée (FAKE_TELEGRAM): mêmes conditions pour tous les bots, sessions en mémoire
+fake_conditions = None
+if FAKE_TELEGRAM:
+    try:
+        fake_conditions = ApiConditions.parse(FAKE_TELEGRAM)
+    except ValueError as e:
+        logger.error("FAKE_TELEGRAM invalide: %s", e)
+        exit(1)
+    logger.warning("⚠️ Client Telegram simulé (FAKE_TELEGRAM): aucun appel à l'API réelle")
+
+def create_client(session_file: str, string_session: str = ''):
+    """Client Telegram du bot: réel, ou simulé si FAKE_TELEGRAM est défini."""
+    if fake_conditions is not None:
+        return FakeTelegramClient(StringSession(), API_ID, API_HASH, fake_conditions)
+    return TelegramClient(build_session(session_file, string_session), API_ID, API_HASH)
+
+CONFIG_FILE = 'bot_config.json' # Configuration du bot principal
+
+def build_tenants() -> list:
+    """Bot principal (variables d'environnement) puis bots supplémentaires de TENANTS_FILE."""
+    primary = Tenant(
+        PRIMARY_TENANT, BOT_TOKEN, ADMIN_ID, PREDICTION_CHANNEL_IDS,
+        CONFIG_FILE, HISTORY_FILE, SESSION_FILE, DESTINATION_MAX_RETRIES, DESTINATION_RETRY_DELAY
+    )
+    primary.client = create_client(SESSION_FILE, TELEGRAM_SESSION)
+    result = [primary]
+
+    try:
+        specs = load_tenant_specs(TENANTS_FILE)
+    except (OSError, ValueError) as e:
+        # json.JSONDecodeError hérite de ValueError
+        logger.error("%s invalide: %s", TENANTS_FILE, e)
+        exit(1)
+
+    history_root, history_ext = os.path.splitext(HISTORY_FILE)
+    for spec in specs:
+        name = spec['name']
+        tenant = Tenant(
+            name, spec['bot_token'], spec['admin_id'], spec['prediction_channel_ids'],
+            f"bot_config_{name}.json", f"{history_root}_{name}{history_ext}", f"{SESSION_FILE}_{name}",
+            DESTINATION_MAX_RETRIES, DESTINATION_RETRY_DELAY
+        )
+        tenant.client = create_client(tenant.session_file)
+        result.append(tenant)
+        logger.info("Bot supplémentaire %s: PREDICTION_CHANNELS=%s", name, spec['prediction_channel_ids'])
+    return result
+
+# Tous les bots du processus: le premier (principal) lit le canal source pour tous
+tenants = build_tenants()
+primary = tenants[0]
+client = primary.client
+
+def find_tenant(name: str):
+    """Bot par nom (None si inconnu)."""
+    return next((t for t in tenants if t.name == name), None)
+
+# --- Variables Globales d'État (partagées par tous les bots) ---
+archived_games = RecentKeys() # Jeux déjà écrits dans l'archive (même logique que processed_predictions)
 source_channel_ok = False
-prediction_channel_ok = False
-transfer_enabled = True
-A_OFFSET = A_OFFSET_DEFAULT
-R_OFFSET = R_OFFSET_DEFAULT
-CONFIG_FILE = 'bot_config.json'
-prediction_block_until = None 
-
-# Variables pour la commande /ec (Écart Personnalisé)
-ec_active = False
-ec_gaps = []  # Liste des écarts [3, 4, 5, ...]
-ec_gap_index = 0
-ec_last_source_game = 0 # Le numéro de jeu source (N) qui a déclenché la dernière prédiction
-ec_first_trigger_done = False # Vrai après la première prédiction P1
+
+# Santé du processus (/health)
+loop_monitor = LoopLagMonitor()
+started_at = monotonic()
+last_source_event_at = None # monotonic() du dernier message/édition du canal source
+
+def outbound_depth() -> int:
+    """Envois/éditions Telegram en attente ou en cours, tous bots et destinations confondus."""
+    return sum(tenant.outbound_depth() for tenant in tenants)
+
+# Cycle de vie du traitement des événements source:
+# 'starting' (mis en tampon jusqu'à ce que l'état soit prêt), 'running', 'stopped' (état cédé)
+processing_state = 'starting'
+buffered_events = deque(maxlen=500) # (édité?, texte, id, réception) reçus pendant le démarrage
+# Profilage mémoire (/mem): inactif tant qu'il n'est pas démarré
+memory_profiler = MemoryProfiler()
+# Commandes admin prioritaires: la file source (plus bas) s'efface devant elles
+control_lane = ControlLane(CONTROL_LANE_MAX_HOLD)
+web_runner = None
+
+# Détection des trous dans le flux source (dernier jeu / message reçus en direct)
+last_source_game = 0
+last_source_msg_id = 0
 
 # --- Fonctions de Persistance ---
 
-def load_config():
-    """Charge la configuration depuis le fichier JSON."""
-    global A_OFFSET, R_OFFSET, ec_active, ec_gaps, ec_gap_index, ec_last_source_game, ec_first_trigger_done
-    if os.path.exists(CONFIG_FILE):
+def load_config(tenant: Tenant):
+    """Charge la configuration d'un bot depuis son fichier JSON."""
+    if os.path.exists(tenant.config_file):
         try:
-            with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
+            with open(tenant.config_file, 'r', encoding='utf-8') as f:
                 config = json.load(f)
-                A_OFFSET = config.get('a_offset', A_OFFSET_DEFAULT)
-                R_OFFSET = config.get('r_offset', R_OFFSET_DEFAULT)
+                tenant.a_offset = config.get('a_offset', A_OFFSET_DEFAULT)
+                tenant.r_offset = config.get('r_offset', R_OFFSET_DEFAULT)
                 # Chargement EC
-                ec_active = config.get('ec_active', False)
-                ec_gaps = config.get('ec_gaps', [])
-                ec_gap_index = config.get('ec_gap_index', 0)
-                ec_last_source_game = config.get('ec_last_source_game', 0)
-                ec_first_trigger_done = config.get('ec_first_trigger_done', False)
+                tenant.ec_active = config.get('ec_active', False)
+                tenant.ec_gaps = config.get('ec_gaps', [])
+                tenant.ec_gap_index = config.get('ec_gap_index', 0)
+                tenant.ec_last_source_game = config.get('ec_last_source_game', 0)
+                tenant.ec_first_trigger_done = config.get('ec_first_trigger_done', False)
+                tenant.predictor = config.get('predictor', PREDICTORS[0])
+                tenant.tuner.apply_settings(validate_settings(config.get('tuning', {})))
                 
-            logger.info(f"⚙️ Configuration chargée: A_OFFSET={A_OFFSET}, R_OFFSET={R_OFFSET}, EC_ACTIVE={ec_active}")
+            remember_config_mtime(tenant)
+            logger.info(
+                "⚙️ Configuration chargée: A_OFFSET=%s, R_OFFSET=%s, EC_ACTIVE=%s",
+                tenant.a_offset, tenant.r_offset, tenant.ec_active, extra={'tenant': tenant.name}
+            )
         except Exception as e:
-            logger.error(f"Erreur chargement config: {e}")
-            A_OFFSET = A_OFFSET_DEFAULT
-            R_OFFSET = R_OFFSET_DEFAULT
+            logger.error("Erreur chargement config %s: %s", tenant.config_file, e)
+            tenant.a_offset = A_OFFSET_DEFAULT
+            tenant.r_offset = R_OFFSET_DEFAULT
             # En cas d'erreur de chargement, on s'assure que EC est désactivé
-            ec_active = False
-            ec_gaps = []
-            ec_gap_index = 0
-            ec_last_source_game = 0
-            ec_first_trigger_done = False
+            tenant.ec_active = False
+            tenant.ec_gaps = []
+            tenant.ec_gap_index = 0
+            tenant.ec_last_source_game = 0
+            tenant.ec_first_trigger_done = False
+            tenant.predictor = PREDICTORS[0]
+            tenant.tuner.apply_settings(validate_settings({}))
     else:
-        logger.info("⚙️ Fichier config.json non trouvé. Utilisation des valeurs par défaut.")
-        save_config() # Sauvegarde les valeurs par défaut si le fichier n'existe pas
+        logger.info("⚙️ Fichier %s non trouvé. Utilisation des valeurs par défaut.", tenant.config_file)
+        save_config(tenant) # Sauvegarde les valeurs par défaut si le fichier n'existe pas
 
-def save_config():
-    """Sauvegarde la configuration dans le fichier JSON."""
+def save_config(tenant: Tenant):
+    """Sauvegarde la configuration d'un bot dans son fichier JSON."""
     try:
         config = {
-            'a_offset': A_OFFSET,
-            'r_offset': R_OFFSET,
+            'a_offset': tenant.a_offset,
+            'r_offset': tenant.r_offset,
             # Sauvegarde EC
-            'ec_active': ec_active,
-            'ec_gaps': ec_gaps,
-            'ec_gap_index': ec_gap_index,
-            'ec_last_source_game': ec_last_source_game,
-            'ec_first_trigger_done': ec_first_trigger_done
+            'ec_active': tenant.ec_active,
+            'ec_gaps': tenant.ec_gaps,
+            'ec_gap_index': tenant.ec_gap_index,
+            'ec_last_source_game': tenant.ec_last_source_game,
+            'ec_first_trigger_done': tenant.ec_first_trigger_done,
+            'predictor': tenant.predictor,
+            'tuning': tenant.tuner.settings()
         }
-        with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
+        # Écriture atomique: un lecteur (ou le rechargement à chaud) ne voit jamais un fichier partiel
+        tmp_file = tenant.config_file + '.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as f:
             json.dump(config, f, indent=4)
-        logger.info("⚙️ Configuration sauvegardée.")
+        os.replace(tmp_file, tenant.config_file)
+        remember_config_mtime(tenant)
+        logger.info("⚙️ Configuration sauvegardée.", extra={'tenant': tenant.name})
     except Exception as e:
-        logger.error(f"Erreur sauvegarde config: {e}")
+        logger.error("Erreur sauvegarde config %s: %s", tenant.config_file, e)
+
+def remember_config_mtime(tenant: Tenant):
+    """Mémorise la version du fichier connue du bot pour ignorer ses propres écritures."""
+    try:
+        tenant.config_mtime = os.stat(tenant.config_file).st_mtime_ns
+    except OSError:
+        tenant.config_mtime = None
+
+def validate_config(config: dict) -> dict:
+    """Vérifie les valeurs modifiables à chaud. Lève ValueError si une valeur est invalide."""
+    def is_int(value):
+        return isinstance(value, int) and not isinstance(value, bool)
+
+    a_offset = config.get('a_offset', A_OFFSET_DEFAULT)
+    r_offset = config.get('r_offset', R_OFFSET_DEFAULT)
+    active = config.get('ec_active', False)
+    gaps = config.get('ec_gaps', [])
+    predictor = config.get('predictor', PREDICTORS[0])
+    tuning = validate_settings(config.get('tuning', {}))
+
+    if not is_int(a_offset) or a_offset < 0:
+        raise ValueError(f"a_offset invalide: {a_offset!r}")
+    if not is_int(r_offset) or not 0 <= r_offset <= 10:
+        raise ValueError(f"r_offset invalide (0 à 10): {r_offset!r}")
+    if not isinstance(active, bool):
+        raise ValueError(f"ec_active invalide: {active!r}")
+    if not isinstance(gaps, list) or not all(is_int(g) and g > 0 for g in gaps):
+        raise ValueError(f"ec_gaps invalide (entiers positifs): {gaps!r}")
+    if active and not gaps:
+        raise ValueError("ec_active sans ec_gaps")
+    if predictor not in PREDICTORS:
+        raise ValueError(f"predictor invalide ({', '.join(PREDICTORS)}): {predictor!r}")
+
+    return {'a_offset': a_offset, 'r_offset': r_offset, 'ec_active': active, 'ec_gaps': gaps, 'predictor': predictor,
+            'tuning': tuning}
+
+async def reload_config(tenant: Tenant, source: str) -> bool:
+    """
+    Relit le fichier de configuration du bot et remplace A_OFFSET, R_OFFSET, les paramètres EC, le prédicteur
+    et le réglage automatique.
+    La validation et l'échange se font sans `await`: aucun événement ne peut
+    observer un état à moitié appliqué. Les prédictions en cours gardent leur R.
+    """
+    try:
+        with open(tenant.config_file, 'r', encoding='utf-8') as f:
+            new_config = validate_config(json.load(f))
+    except (OSError, ValueError) as e:
+        # json.JSONDecodeError hérite de ValueError
+        remember_config_mtime(tenant)
+        logger.error("❌ Rechargement config (%s) refusé: %s", source, e, extra={'tenant': tenant.name})
+        await notify_admin(tenant, f"❌ **Rechargement de la configuration refusé** ({source})\n\n{e}")
+        return False
+
+    remember_config_mtime(tenant)
+    changes = []
+    if new_config['a_offset'] != tenant.a_offset:
+        changes.append(f"A_OFFSET {tenant.a_offset} → {new_config['a_offset']}")
+        tenant.a_offset = new_config['a_offset']
+    if new_config['r_offset'] != tenant.r_offset:
+        changes.append(f"R_OFFSET {tenant.r_offset} → {new_config['r_offset']}")
+        tenant.r_offset = new_config['r_offset']
+    if new_config['ec_active'] != tenant.ec_active or new_config['ec_gaps'] != tenant.ec_gaps:
+        changes.append(f"EC {tenant.ec_active}/{tenant.ec_gaps} → {new_config['ec_active']}/{new_config['ec_gaps']}")
+        tenant.ec_active = new_config['ec_active']
+        tenant.ec_gaps = new_config['ec_gaps']
+        # Nouvelle séquence d'écarts: on repart de P1, comme avec /ec
+        tenant.ec_gap_index = 0
+        tenant.ec_last_source_game = 0
+        tenant.ec_first_trigger_done = False
+        sync_mode_periods(tenant)
+    if new_config['predictor'] != tenant.predictor:
+        changes.append(f"Prédicteur {tenant.predictor} → {new_config['predictor']}")
+        tenant.predictor = new_config['predictor']
+    if new_config['tuning'] != tenant.tuner.settings():
+        changes.append(f"Réglage automatique {format_tuning_settings(tenant.tuner.settings())} → {format_tuning_settings(new_config['tuning'])}")
+        tenant.tuner.apply_settings(new_config['tuning'])
+
+    if changes:
+        logger.info("⚙️ Configuration rechargée (%s): %s", source, "; ".join(changes), extra={'tenant': tenant.name})
+        await notify_admin(tenant, f"⚙️ **Configuration rechargée** ({source})\n\n" + "\n".join(f"• {c}" for c in changes))
+    return True
+
+def build_state_snapshot(tenant: Tenant) -> dict:
+    """État en mémoire d'un bot, sérialisable (passation vers un nouveau processus)."""
+    return {
+        'pending_predictions': [
+            {
+                'target_game': p.target_game, 'message_ids': {str(k): v for k, v in p.message_ids.items()},
+                'suit': p.suit,
+                'base_game': p.base_game, 'base_suit': p.base_suit, 'status': p.status,
+                'r_offset': p.r_offset, 'verification_attempt': p.verification_attempt,
+                'created_at': monotonic_to_wall(p.created_at),  # Epoch: monotonic() est propre au processus
+            }
+            for p in tenant.pending_predictions.values()
+        ],
+        'processed_predictions': tenant.processed_predictions.to_list(),
+        'processed_verifications': tenant.processed_verifications.to_list(),
+        'current_game_number': tenant.current_game_number,
+        'a_offset': tenant.a_offset,
+        'r_offset': tenant.r_offset,
+        'prediction_block_until': tenant.prediction_block_until.isoformat() if tenant.prediction_block_until else None,
+        'transfer_enabled': tenant.transfer_enabled,
+        'ec_active': tenant.ec_active,
+        'ec_gaps': tenant.ec_gaps,
+        'ec_gap_index': tenant.ec_gap_index,
+        'ec_last_source_game': tenant.ec_last_source_game,
+        'ec_first_trigger_done': tenant.ec_first_trigger_done,
+        'streaks': tenant.streak_tracker.to_dict(),
+        'daily_stats': tenant.daily_stats.to_dict(),
+        'predictor': tenant.predictor,
+        'frequency_model': tenant.frequency_model.to_dict(),
+        'tuning': tenant.tuner.settings(),
+        'tuner': tenant.tuner.to_dict(),
+    }
+
+def apply_state_snapshot(tenant: Tenant, state: dict):
+    """Remplace l'état en mémoire d'un bot par un instantané de build_state_snapshot()."""
+    now_wall, now_mono = datetime.now().timestamp(), monotonic()
+    tenant.pending_predictions.clear()
+    for item in state.get('pending_predictions', []):
+        created_at = now_mono - (now_wall - item['created_at'])
+        tenant.pending_predictions[item['target_game']] = Prediction(
+            item['target_game'], {int(k): v for k, v in item['message_ids'].items()},
+            item['suit'], item['base_game'], item['base_suit'],
+            item['r_offset'], item['status'], item['verification_attempt'], created_at
+        )
+    tenant.processed_predictions.load(state.get('processed_predictions', []))
+    tenant.processed_verifications.load(state.get('processed_verifications', []))
+    tenant.current_game_number = state.get('current_game_number', 0)
+
+    tenant.a_offset = state.get('a_offset', tenant.a_offset)
+    tenant.r_offset = state.get('r_offset', tenant.r_offset)
+    block_until = state.get('prediction_block_until')
+    tenant.prediction_block_until = datetime.fromisoformat(block_until) if block_until else None
+    tenant.transfer_enabled = state.get('transfer_enabled', tenant.transfer_enabled)
+    tenant.ec_active = state.get('ec_active', tenant.ec_active)
+    tenant.ec_gaps = state.get('ec_gaps', tenant.ec_gaps)
+    tenant.ec_gap_index = state.get('ec_gap_index', tenant.ec_gap_index)
+    tenant.ec_last_source_game = state.get('ec_last_source_game', tenant.ec_last_source_game)
+    tenant.ec_first_trigger_done = state.get('ec_first_trigger_done', tenant.ec_first_trigger_done)
+    if 'streaks' in state:
+        tenant.streak_tracker.load_dict(state['streaks'])
+    if 'daily_stats' in state:
+        tenant.daily_stats = DailyStats.from_dict(state['daily_stats'])
+    if state.get('predictor') in PREDICTORS:
+        tenant.predictor = state['predictor']
+    if 'frequency_model' in state:
+        tenant.frequency_model.load_dict(state['frequency_model'])
+    if 'tuning' in state:
+        tenant.tuner.apply_settings(validate_settings(state['tuning']))
+    if 'tuner' in state:
+        tenant.tuner.load_dict(state['tuner'])
+    sync_mode_periods(tenant)
+
+def build_process_snapshot() -> dict:
+    """État de tous les bots du processus, par nom de bot."""
+    return {'tenants': {tenant.name: build_state_snapshot(tenant) for tenant in tenants}}
+
+def apply_process_snapshot(state: dict):
+    """Applique build_process_snapshot() (ou l'état d'un processus mono-bot, attribué au bot principal)."""
+    states = state['tenants'] if 'tenants' in state else {PRIMARY_TENANT: state}
+    for tenant in tenants:
+        if tenant.name in states:
+            apply_state_snapshot(tenant, states[tenant.name])
+
+async def watch_config_file():
+    """Surveille les fichiers de configuration et recharge ceux modifiés par un tiers."""
+    while True:
+        await asyncio.sleep(CONFIG_WATCH_INTERVAL)
+        for tenant in tenants:
+            try:
+                mtime = os.stat(tenant.config_file).st_mtime_ns
+            except OSError:
+                continue
+            if mtime != tenant.config_mtime:
+                await reload_config(tenant, "fichier modifié")
 
 # --- Fonctions d'Analyse ---
 
@@ -143,38 +451,7 @@ def is_message_finalized(message: str) -> bool:
         return False
     return '✅' in message or '🔰' in message
 
-def suit_in_group(group_str: str, target_suit: str) -> bool:
-    """Vérifie si une couleur est présente dans un groupe."""
-    normalized_target = normalize_suit(target_suit)
-    suit_pattern = r'[♠♥♦♣]|♠️|♥️|♦️|♣️|❤️|❤'
-    matches = re.findall(suit_pattern, group_str)
-    for match in matches:
-        if normalize_suit(match) == normalized_target:
-            return True
-    return False
-
-# --- Fonctions d'Extraction Avancée et de Logique de Carte (RÈGLES COMPLEXES) ---
-
-CARD_VALUES_ODD = {'A', '3', '5', '7', '9', 'J', 'K'}
-CARD_VALUES_EVEN = {'2', '4', '6', '8', 'T', '10', 'Q'} 
-
-def is_card_value_odd(card_value: str) -> bool:
-    """Détermine si la valeur de la carte est impaire (A, 3, 5, 7, 9, J, K)."""
-    normalized_value = card_value.upper().replace('10', 'T') 
-    return normalized_value in CARD_VALUES_ODD
-
-def extract_first_card_details(group_str: str):
-    """Extrait la valeur et la couleur de la première carte d'un groupe."""
-    value_pattern = r'([A2-9JQKT]|10)?'
-    suit_pattern = r'([♠♥♦♣]|♠️|♥️|♦️|♣️|❤️|❤)'
-    
-    match = re.search(value_pattern + suit_pattern, group_str, re.IGNORECASE)
-    
-    if match:
-        value = match.group(1) if match.group(1) else ''
-        suit = normalize_suit(match.group(2))
-        return value, suit
-    return None, None
+# --- Logique de Carte (RÈGLES COMPLEXES) ---
 
 def get_predicted_suit(base_suit: str, card_value: str, game_number: int) -> str:
     """
@@ -205,54 +482,200 @@ def get_predicted_suit(base_suit: str, card_value: str, game_number: int) -> str
     else: # Jeux IMPAIRS
         return MAPPING_ODD.get(normalized_suit, normalized_suit)
 
+class SourceGame:
+    """
+    Message du canal source analysé une seule fois puis passé à chaque bot:
+    numéro de jeu, groupes, finalisation et cartes des deux premiers groupes
+    (codes entiers, voir cards.py), d'où sont tirés la première carte du 2ème
+    groupe, le masque des couleurs du 1er groupe, les totaux et les abattages.
+    """
+
+    __slots__ = ('text', 'game_number', 'groups', 'finalized', 'hands', 'received_at')
+
+    def __init__(self, text: str, received_at: float = None):
+        self.text = text
+        self.received_at = received_at # monotonic() à la réception (None: message récupéré après coup)
+        self.game_number = extract_game_number(text)
+        self.groups = extract_parentheses_groups(text) if self.game_number is not None else []
+        self.finalized = is_message_finalized(text)
+        groups = self.groups
+        self.hands = (
+            decode_hand(groups[0]) if groups else b'',
+            decode_hand(groups[1]) if len(groups) >= 2 else b'',
+        )
+
+    # Les attributs dérivés des cartes ne sont calculés que s'ils sont lus (tables de cards.py)
+
+    @property
+    def card_value(self):
+        """Valeur de la première carte du 2ème groupe ('' si sans valeur, None si absente)."""
+        return VALUE_NAMES[CARD_VALUE[self.hands[1][0]]] if self.hands[1] else None
+
+    @property
+    def base_suit(self):
+        """Couleur de la première carte du 2ème groupe (None si absente)."""
+        return suit_from_code(CARD_SUIT[self.hands[1][0]]) if self.hands[1] else None
+
+    @property
+    def first_group_mask(self) -> int:
+        return hand_mask(self.hands[0])
+
+    def first_group_has(self, suit: int) -> bool:
+        """Vrai si la couleur (code entier) est présente dans le 1er groupe."""
+        return suit >= 0 and bool(self.first_group_mask & (1 << suit))
+
+    @property
+    def first_card(self) -> int:
+        """Code de la première carte du 2ème groupe (-1 si absente)."""
+        return self.hands[1][0] if self.hands[1] else -1
+
+    @property
+    def card_counts(self) -> tuple:
+        return len(self.hands[0]), len(self.hands[1])
+
+    @property
+    def totals(self) -> tuple:
+        """Totaux au baccara des deux groupes."""
+        return hand_total(self.hands[0]), hand_total(self.hands[1])
+
+    @property
+    def naturals(self) -> tuple:
+        """Abattage (8 ou 9 en deux cartes) de chaque groupe."""
+        return is_natural(self.hands[0]), is_natural(self.hands[1])
+
+# --- Archive des Jeux Finalisés ---
+
+game_archive = GameArchive(ARCHIVE_DIR) if ARCHIVE_DIR else None
+
+def archive_finalized_game(game: SourceGame):
+    """Ajoute un jeu finalisé à l'archive colonnaire (une fois par numéro de jeu, tous bots confondus)."""
+    if game_archive is None or game.game_number in archived_games:
+        return
+    archived_games.add(game.game_number, game.game_number)
+
+    columns = []
+    for hand in game.hands:
+        first = hand[0] if hand else -1
+        columns += [CARD_VALUE[first] if hand else 0, CARD_SUIT[first] if hand else -1, hand_mask(hand)]
+    game_archive.append(game.game_number, *columns, datetime.now().timestamp())
+
+async def flush_game_archive():
+    """Écrit dans un thread les jeux en attente de l'archive."""
+    if game_archive is not None and game_archive.pending:
+        try:
+            await asyncio.to_thread(game_archive.flush)
+        except OSError as e:
+            logger.error("Erreur écriture archive: %s", e)
+
+async def watch_game_archive():
+    while True:
+        await asyncio.sleep(ARCHIVE_FLUSH_INTERVAL)
+        await flush_game_archive()
+
+# --- Récupération des Messages Manqués ---
+
+async def fetch_source_messages(ids):
+    """Récupère un lot de messages du canal source (un seul appel get_messages)."""
+    return await client.get_messages(SOURCE_CHANNEL_ID, ids=ids)
+
+async def handle_backfilled_message(message):
+    """
+    Un message manqué passe par la file source comme une édition (sans instant de
+    réception): il ne sert qu'à la vérification, ses prédictions seraient déjà
+    dépassées, et il est traité dans l'ordre, fusionné avec une édition en file du même message.
+    """
+    if message.message:
+        source_lane.submit((True, message.message, None, None), coalesce_key=('edit', message.id))
+
+backfiller = GapBackfiller(fetch_source_messages, handle_backfilled_message, BACKFILL_CONCURRENCY)
+
+def detect_source_gap(game_number: int, message_id: int):
+    """Programme la récupération des messages situés entre le dernier jeu reçu et celui-ci."""
+    global last_source_game, last_source_msg_id
+    backfiller.mark_seen(message_id)
+    if message_id <= last_source_msg_id:
+        return # Message plus ancien (ou rejoué): rien à détecter
+
+    if last_source_msg_id and game_number > last_source_game + 1 and message_id > last_source_msg_id + 1:
+        first_id = max(last_source_msg_id + 1, message_id - BACKFILL_MAX_GAP)
+        logger.warning(
+            "🕳️ Trou détecté: jeux #%s à #%s manquants, récupération des messages %s-%s",
+            last_source_game + 1, game_number - 1, first_id, message_id - 1,
+            extra={'stage': 'backfill', 'game': game_number}
+        )
+        backfiller.request(first_id, message_id - 1)
+
+    # Les numéros de jeu repartent de 1 chaque jour: on suit simplement le dernier message
+    last_source_game = game_number
+    last_source_msg_id = message_id
+
 # --- Logique de Prédiction (Immédiate) ---
 
-async def send_prediction_to_channel(target_game: int, predicted_suit: str, base_game: int, base_suit: str):
-    """Envoie la prédiction au canal de prédiction."""
-    global R_OFFSET
+def publish_prediction(tenant: Tenant, pred: Prediction, text: str, received_at: float = None):
+    """Met en file l'envoi du message de prédiction vers chaque destination accessible du bot (en parallèle)."""
+    published = False
+    for dest in tenant.destinations.values():
+        if not dest.ok:
+            continue
+        call, on_success = tenant.slo.timed(
+            'prediction', received_at,
+            lambda dest=dest: tenant.client.send_message(dest.chat_id, text),
+            lambda msg, chat_id=dest.chat_id: pred.message_ids.__setitem__(chat_id, msg.id)
+        )
+        dest.submit(call, on_success=on_success, label=f"Prédiction #{pred.target_game}")
+        published = True
+    return published
+
+def publish_status(tenant: Tenant, pred: Prediction, text: str, received_at: float = None):
+    """Met en file l'édition du message de prédiction sur chaque destination où il a été publié."""
+    async def edit(chat_id):
+        # L'id est lu au moment de l'édition: l'envoi, plus tôt dans la même file, l'a renseigné
+        msg_id = pred.message_ids.get(chat_id)
+        if msg_id:
+            await tenant.client.edit_message(chat_id, msg_id, text)
+
+    for dest in tenant.destinations.values():
+        if dest.ok:
+            call, on_success = tenant.slo.timed('status', received_at, lambda chat_id=dest.chat_id: edit(chat_id))
+            dest.submit(call, on_success=on_success, label=f"Statut #{pred.target_game}")
+
+async def send_prediction_to_channel(tenant: Tenant, target_game: int, predicted_suit: str, base_game: int, base_suit: str,
+                                     received_at: float = None):
+    """Enregistre la prédiction et la publie sur les canaux de prédiction du bot."""
     try:
         display_suit = SUIT_DISPLAY.get(predicted_suit, predicted_suit)
         
         prediction_msg = f"📲Game:{target_game}:{display_suit} statut :⏳"
 
-        msg_id = 0
+        pred = Prediction(
+            target_game, {}, suit_code(predicted_suit), base_game, suit_code(base_suit), tenant.r_offset
+        )
+        tenant.pending_predictions[target_game] = pred
+        tenant.daily_stats.record_prediction()
 
-        if PREDICTION_CHANNEL_ID and PREDICTION_CHANNEL_ID != 0 and prediction_channel_ok:
-            try:
-                pred_msg = await client.send_message(PREDICTION_CHANNEL_ID, prediction_msg)
-                msg_id = pred_msg.id
-                logger.info(f"✅ Prédiction envoyée au canal: Jeu #{target_game} -> {display_suit}")
-            except Exception as e:
-                logger.error(f"❌ Erreur envoi prédiction au canal: {e}")
-        else:
-            logger.warning(f"⚠️ Canal de prédiction non accessible")
-
-        pending_predictions[target_game] = {
-            'message_id': msg_id,
-            'suit': predicted_suit,
-            'base_game': base_game,
-            'base_suit': base_suit,
-            'status': '⏳',
-            'r_offset': R_OFFSET, 
-            'verification_attempt': 0, 
-            'created_at': datetime.now().isoformat()
-        }
+        if not publish_prediction(tenant, pred, prediction_msg, received_at):
+            logger.warning("⚠️ Canal de prédiction non accessible",
+                           extra={'tenant': tenant.name, 'category': 'prediction_channel_down'})
 
-        logger.info(f"Prédiction active: Jeu #{target_game} - {display_suit} (basé sur #{base_game})")
-        return msg_id
+        logger.info(
+            "Prédiction active: Jeu #%s - %s (basé sur #%s)", target_game, display_suit, base_game,
+            extra={'tenant': tenant.name, 'stage': 'send', 'game': base_game, 'target': target_game}
+        )
+        return pred
 
     except Exception as e:
-        logger.error(f"Erreur envoi prédiction: {e}")
+        logger.error("Erreur envoi prédiction: %s", e, extra={'tenant': tenant.name})
         return None
 
-async def update_prediction_status(game_number: int, new_status: str, verification_game_number: int = None):
-    """Met à jour le message de prédiction dans le canal."""
+async def update_prediction_status(tenant: Tenant, game_number: int, new_status: str, verification_game_number: int = None,
+                                   received_at: float = None):
+    """Met à jour le message de prédiction dans les canaux du bot."""
     try:
-        if game_number not in pending_predictions:
+        if game_number not in tenant.pending_predictions:
             return False
 
-        pred = pending_predictions[game_number]
-        suit = pred['suit']
+        pred = tenant.pending_predictions[game_number]
+        suit = pred.suit_symbol
         display_suit = SUIT_DISPLAY.get(suit, suit)
         
         # Calcul de l'index de vérification (N+0, N+1, N+2, ...)
@@ -274,95 +697,125 @@ async def update_prediction_status(game_number: int, new_status: str, verificati
             updated_msg = f"📲Game:{game_number}:{display_suit} statut :{new_status}"
 
 
-        if PREDICTION_CHANNEL_ID and pred['message_id'] > 0 and prediction_channel_ok:
-            try:
-                await client.edit_message(PREDICTION_CHANNEL_ID, pred['message_id'], updated_msg)
-                logger.info(f"✅ Prédiction #{game_number} mise à jour: {new_status} (Essai N+{verification_index})")
-            except Exception as e:
-                logger.error(f"❌ Erreur mise à jour dans le canal: {e}")
+        publish_status(tenant, pred, updated_msg, received_at)
+        logger.info(
+            "✅ Prédiction #%s mise à jour: %s (Essai N+%s)", game_number, new_status, verification_index,
+            extra={'tenant': tenant.name, 'stage': 'edit', 'target': game_number, 'attempt': verification_index}
+        )
 
-        pred['status'] = new_status
+        pred.status = new_status
 
         if new_status in ['✅', '❌']:
-            # La prédiction est terminée
-            del pending_predictions[game_number]
-            logger.info(f"Prédiction #{game_number} terminée: {new_status}")
+            # La prédiction est terminée: on l'archive avant de la retirer
+            won = new_status == '✅'
+            attempt = verification_index if won else pred.r_offset
+            tenant.outcome_history.append(pred, won, attempt)
+            tenant.streak_tracker.record(pred.suit, pred.base_game, won, attempt)
+            tenant.daily_stats.record_outcome(pred.suit, won, attempt)
+            try:
+                tenant.prediction_history.record(
+                    pred.base_game, pred.base_suit_symbol, game_number, suit, new_status, attempt,
+                    datetime.fromtimestamp(monotonic_to_wall(pred.created_at)).isoformat(),
+                    datetime.now().isoformat()
+                )
+            except Exception as e:
+                logger.error("Erreur enregistrement historique: %s", e, extra={'tenant': tenant.name})
+            del tenant.pending_predictions[game_number]
+            logger.info("Prédiction #%s terminée: %s", game_number, new_status, extra={'tenant': tenant.name})
 
         return True
 
     except Exception as e:
-        logger.error(f"Erreur mise à jour prédiction: {e}")
+        logger.error("Erreur mise à jour prédiction: %s", e, extra={'tenant': tenant.name})
         return False
 
 # --- Traitement des Messages ---
 
-async def process_prediction(message_text: str):
+def frequency_lags(tenant: Tenant) -> set:
+    """
+    Décalages alimentés dans le modèle de fréquences: A actuel et, si /tune est
+    actif, chaque valeur de A de ses bornes (un changement de A trouve ses compteurs prêts).
+    """
+    lags = {tenant.a_offset}
+    if tenant.tuner.mode != 'off':
+        lags.update(range(tenant.tuner.a_min, tenant.tuner.a_max + 1))
+    return lags
+
+async def process_prediction(tenant: Tenant, game: SourceGame):
     """
     PRÉDICTION: Se fait immédiatement dès qu'un numéro est détecté.
-    Gère la logique de blocage /time et la logique de séquence /ec.
+    Gère la logique de blocage /time et la logique de séquence /ec du bot.
     """
-    global current_game_number, A_OFFSET, prediction_block_until, ec_active, ec_gaps, ec_gap_index, ec_last_source_game, ec_first_trigger_done
     try:
         current_time = datetime.now()
         should_trigger = False
         log_mode = ""
         
-        game_number = extract_game_number(message_text)
+        game_number = game.game_number
         if game_number is None:
             return
 
-        current_game_number = game_number
+        tenant.current_game_number = game_number
 
         # Éviter les doublons de prédiction
-        if game_number in processed_predictions:
+        if game_number in tenant.processed_predictions:
             return
-        processed_predictions.add(game_number)
+        tenant.processed_predictions.add(game_number, game_number)
 
-        # Nettoyer l'historique
-        if len(processed_predictions) > 500:
-            old_predictions = sorted(processed_predictions)[:250]
-            for p in old_predictions:
-                processed_predictions.discard(p)
-
-        groups = extract_parentheses_groups(message_text)
-        if len(groups) < 2:
-            logger.info(f"Jeu #{game_number}: Pas assez de groupes pour prédiction")
+        if len(game.groups) < 2:
+            logger.info("Jeu #%s: Pas assez de groupes pour prédiction", game_number,
+                        extra={'tenant': tenant.name, 'stage': 'prediction', 'game': game_number, 'category': 'no_groups'})
             return
 
-        second_group = groups[1]
-        
-        # Extraction de la valeur ET de la couleur
-        card_value, base_suit = extract_first_card_details(second_group)
+        # Valeur ET couleur de la première carte du 2nd groupe (extraites une seule fois)
+        card_value, base_suit = game.card_value, game.base_suit
 
         if not base_suit:
-            logger.info(f"Jeu #{game_number}: Pas de couleur trouvée dans le 2nd groupe.")
+            logger.info("Jeu #%s: Pas de couleur trouvée dans le 2nd groupe.", game_number,
+                        extra={'tenant': tenant.name, 'stage': 'prediction', 'game': game_number, 'category': 'no_suit'})
             return
             
+        # Le modèle de fréquences apprend le contexte de chaque jeu, quel que soit le prédicteur choisi
+        suit, value = CARD_SUIT[game.first_card], CARD_VALUE[game.first_card]
+        tenant.frequency_model.observe_context(game_number, suit, value)
         predicted_suit = get_predicted_suit(base_suit, card_value, game_number)
+        tuned_suit = suit_code(predicted_suit)
+        if tenant.predictor == 'frequency':
+            model, parity_code = tenant.frequency_model, tuned_suit
+            code = model.predict(suit, game_number, value, tenant.a_offset)
+            if code >= 0:
+                predicted_suit = suit_from_code(code)
+            # Sinon (pas encore assez d'observations): règle de parité. La couleur
+            # dépend de A: /tune évalue chaque A avec celle que ce A aurait prédite
+            tuned_suit = {}
+            for lag in range(tenant.tuner.a_min, tenant.tuner.a_max + 1):
+                code = model.predict(suit, game_number, value, lag)
+                tuned_suit[lag] = code if code >= 0 else parity_code
+        tenant.tuner.observe_prediction(game_number, tuned_suit)
         
         # --- LOGIQUE DE DÉCLENCHEMENT DE LA PRÉDICTION ---
 
-        if ec_active and ec_gaps:
+        if tenant.ec_active and tenant.ec_gaps:
             # Mode EC activé: Priorité, ignore le blocage /time
             
-            if not ec_first_trigger_done:
+            if not tenant.ec_first_trigger_done:
                 # P1: Première prédiction après /ec activation. Déclenchement immédiat.
                 should_trigger = True 
                 log_mode = "EC (P1 Initial) N + A_OFFSET"
 
                 # Mise à jour de l'état pour P2 après succès
-                ec_last_source_game = game_number # N=100 est l'ancre
+                tenant.ec_last_source_game = game_number # N=100 est l'ancre
                 # ec_gap_index reste 0 (P2 utilisera G1=3)
-                ec_first_trigger_done = True
+                tenant.ec_first_trigger_done = True
                 
             else:
                 # Subsequent predictions (P2, P3, P4, ...)
                 
                 # Le gap à utiliser (G1, G2, G3, ...)
-                current_gap = ec_gaps[ec_gap_index]
+                current_gap = tenant.ec_gaps[tenant.ec_gap_index]
                 
                 # Le numéro de jeu source requis pour déclencher (e.g., 100 + 3 = 103)
-                required_source_game = ec_last_source_game + current_gap
+                required_source_game = tenant.ec_last_source_game + current_gap
                 
                 if game_number >= required_source_game:
                     # Déclenchement! N_current a atteint ou dépassé le requis.
@@ -371,136 +824,236 @@ async def process_prediction(message_text: str):
                     # --- Mise à jour de l'état pour la *prochaine* prédiction ---
                     
                     # Avance l'index pour la prochaine rotation (P3 utilisera G2=4)
-                    ec_gap_index = (ec_gap_index + 1) % len(ec_gaps)
+                    tenant.ec_gap_index = (tenant.ec_gap_index + 1) % len(tenant.ec_gaps)
                     
                     # L'actuel game_number (e.g., 103, 107, 112) devient la nouvelle ancre
-                    ec_last_source_game = game_number 
+                    tenant.ec_last_source_game = game_number 
                     
                     log_mode = f"EC (Next P) N + A_OFFSET, Gap {current_gap} satisfied by N={game_number}"
                     
                 else:
                     # Sauter: N_current est trop bas, attendre.
-                    logger.info(f"EC: Skip prediction for #{game_number}. Waiting for source game #{required_source_game} (Gap {current_gap}). Last anchor: #{ec_last_source_game}")
+                    logger.info(
+                        "EC: Skip prediction for #%s. Waiting for source game #%s (Gap %s). Last anchor: #%s",
+                        game_number, required_source_game, current_gap, tenant.ec_last_source_game,
+                        extra={'tenant': tenant.name, 'stage': 'prediction', 'game': game_number, 'category': 'ec_skip'}
+                    )
                     return # Sauter la prédiction
                     
             if should_trigger:
                 # Sauvegarde l'état EC avant l'envoi, juste au cas où l'envoi échoue
-                save_config()
+                save_config(tenant)
 
         else:
             # Mode A_OFFSET standard (et vérification du blocage /time)
             
-            if prediction_block_until and prediction_block_until > current_time:
-                remaining_seconds = (prediction_block_until - current_time).total_seconds()
-                logger.info(f"⏳ PRÉDICTION BLOQUÉE par /time: Reste {remaining_seconds:.1f} secondes. Ignoré pour Jeu #{game_number}")
+            if tenant.prediction_block_until and tenant.prediction_block_until > current_time:
+                remaining_seconds = (tenant.prediction_block_until - current_time).total_seconds()
+                logger.info(
+                    "⏳ PRÉDICTION BLOQUÉE par /time: Reste %.1f secondes. Ignoré pour Jeu #%s", remaining_seconds, game_number,
+                    extra={'tenant': tenant.name, 'stage': 'prediction', 'game': game_number, 'category': 'time_block'}
+                )
                 return
             
             # Si le temps de blocage est passé, on réinitialise la variable
-            if prediction_block_until and prediction_block_until <= current_time:
-                prediction_block_until = None
-                logger.warning("Blocage des prédictions /time levé automatiquement.")
+            if tenant.prediction_block_until and tenant.prediction_block_until <= current_time:
+                tenant.prediction_block_until = None
+                sync_mode_periods(tenant)
+                logger.warning("Blocage des prédictions /time levé automatiquement.", extra={'tenant': tenant.name})
 
             should_trigger = True
-            log_mode = f"A_OFFSET (N+{A_OFFSET})"
+            log_mode = f"A_OFFSET (N+{tenant.a_offset})"
 
 
         # --- Déclenchement de la Prédiction ---
         if should_trigger:
-            target_game = game_number + A_OFFSET
+            target_game = game_number + tenant.a_offset
             
-            if target_game not in pending_predictions and target_game > current_game_number:
+            if target_game not in tenant.pending_predictions and target_game > tenant.current_game_number:
                 
                 parity = "impair" if is_odd(game_number) else "pair"
                 card_info = f"{card_value or ''}{SUIT_DISPLAY.get(base_suit, base_suit)}"
                 
-                logger.info(f"🎯 Jeu #{game_number} ({parity}): Carte {card_info} -> Prédiction #{target_game}: {predicted_suit} ({log_mode})")
+                logger.info(
+                    "🎯 Jeu #%s (%s): Carte %s -> Prédiction #%s: %s (%s)",
+                    game_number, parity, card_info, target_game, predicted_suit, log_mode,
+                    extra={'tenant': tenant.name, 'stage': 'prediction', 'game': game_number,
+                           'target': target_game, 'suit': predicted_suit}
+                )
                 
-                await send_prediction_to_channel(target_game, predicted_suit, game_number, base_suit)
+                await send_prediction_to_channel(tenant, target_game, predicted_suit, game_number, base_suit, game.received_at)
                 
             else:
-                logger.info(f"Prédiction #{target_game} déjà active ou cible trop proche de l'actuel ({current_game_number})")
+                logger.info(
+                    "Prédiction #%s déjà active ou cible trop proche de l'actuel (%s)", target_game, tenant.current_game_number,
+                    extra={'tenant': tenant.name, 'stage': 'prediction', 'game': game_number, 'category': 'already_active'}
+                )
 
-    except Exception as e:
-        logger.error(f"Erreur traitement prédiction: {e}")
-        import traceback
-        logger.error(traceback.format_exc())
+    except Exception:
+        logger.exception("Erreur traitement prédiction", extra={'tenant': tenant.name})
 
-async def process_verification(message_text: str):
+async def process_verification(tenant: Tenant, game: SourceGame):
     """
     VÉRIFICATION: Attend que le message soit finalisé.
     Vérifie si le costume prédit est dans le PREMIER groupe.
     Gère la vérification sur N+0 à N+R_OFFSET.
     """
     try:
-        if not is_message_finalized(message_text):
+        if not game.finalized:
             return
 
-        current_game_number = extract_game_number(message_text)
+        current_game_number = game.game_number
         if current_game_number is None:
             return
 
         # Éviter les doublons de vérification
-        message_hash = f"{current_game_number}_{message_text[:80]}"
-        if message_hash in processed_verifications:
+        message_hash = f"{current_game_number}_{game.text[:80]}"
+        if message_hash in tenant.processed_verifications:
             return
-        processed_verifications.add(message_hash)
+        tenant.processed_verifications.add(message_hash, current_game_number)
 
-        # Nettoyer l'historique
-        if len(processed_verifications) > 500:
-            processed_verifications.clear()
-        
-        groups = extract_parentheses_groups(message_text)
-        if len(groups) < 1:
+        if len(game.groups) < 1:
             return
+        tenant.frequency_model.observe_result(current_game_number, game.first_group_mask, frequency_lags(tenant))
+        tenant.tuner.observe_result(current_game_number, game.first_group_mask)
+        check_tuning(tenant)
 
-        first_group = groups[0]
-        
         # --- LOGIQUE DE VÉRIFICATION SUR R_OFFSET ESSAIS ---
         
         # Parcourir les prédictions en attente (pending_predictions)
-        for pred_game_number, pred in list(pending_predictions.items()):
-            target_suit = pred['suit']
-            r_offset = pred['r_offset']
+        for pred_game_number, pred in list(tenant.pending_predictions.items()):
+            target_suit = pred.suit_symbol
+            r_offset = pred.r_offset
             
             # Si le jeu actuel est dans la fenêtre de vérification (de N+0 à N+r_offset)
             # La fenêtre va de pred_game_number (N+0) à pred_game_number + r_offset
             if pred_game_number <= current_game_number <= pred_game_number + r_offset:
                 
                 # Vérifier si la couleur prédite est dans le PREMIER groupe
-                if suit_in_group(first_group, target_suit):
+                if game.first_group_has(pred.suit):
                     # SUCCÈS
-                    logger.info(f"✅ Jeu #{current_game_number}: {SUIT_DISPLAY.get(target_suit, target_suit)} trouvé dans le 1er groupe! (Prédiction #{pred_game_number})")
-                    await update_prediction_status(pred_game_number, '✅', current_game_number)
+                    logger.info(
+                        "✅ Jeu #%s: %s trouvé dans le 1er groupe! (Prédiction #%s)",
+                        current_game_number, SUIT_DISPLAY.get(target_suit, target_suit), pred_game_number,
+                        extra={'tenant': tenant.name, 'stage': 'verification', 'game': current_game_number,
+                               'target': pred_game_number}
+                    )
+                    await update_prediction_status(tenant, pred_game_number, '✅', current_game_number, game.received_at)
                 
                 elif current_game_number == pred_game_number + r_offset:
                     # ÉCHEC (Dernier essai atteint)
-                    logger.info(f"❌ Jeu #{current_game_number}: {SUIT_DISPLAY.get(target_suit, target_suit)} NON trouvé après {r_offset} essais. (Prédiction #{pred_game_number})")
-                    await update_prediction_status(pred_game_number, '❌')
+                    logger.info(
+                        "❌ Jeu #%s: %s NON trouvé après %s essais. (Prédiction #%s)",
+                        current_game_number, SUIT_DISPLAY.get(target_suit, target_suit), r_offset, pred_game_number,
+                        extra={'tenant': tenant.name, 'stage': 'verification', 'game': current_game_number,
+                               'target': pred_game_number}
+                    )
+                    await update_prediction_status(tenant, pred_game_number, '❌', received_at=game.received_at)
                 
                 else:
                     # ÉCHEC (Essai non final), on incrémente le compteur pour le prochain jeu
-                    pred['verification_attempt'] += 1
+                    pred.verification_attempt += 1
                     # Note: On ne met pas à jour le statut du message ici, on attend soit le succès, soit l'échec final.
-                    logger.info(f"⏳ Jeu #{current_game_number}: {SUIT_DISPLAY.get(target_suit, target_suit)} non trouvé. Continue vérification pour #{pred_game_number} (Essai: {pred['verification_attempt']})")
-
-    except Exception as e:
-        logger.error(f"Erreur traitement vérification: {e}")
-        import traceback
-        logger.error(traceback.format_exc())
+                    logger.info(
+                        "⏳ Jeu #%s: %s non trouvé. Continue vérification pour #%s (Essai: %s)",
+                        current_game_number, SUIT_DISPLAY.get(target_suit, target_suit), pred_game_number, pred.verification_attempt,
+                        extra={'tenant': tenant.name, 'stage': 'verification', 'game': current_game_number,
+                               'target': pred_game_number, 'attempt': pred.verification_attempt, 'category': 'not_found'}
+                    )
+
+    except Exception:
+        logger.exception("Erreur traitement vérification", extra={'tenant': tenant.name})
+
+# Tâches lancées sans être attendues (notifications hors du chemin des jeux): une
+# référence est gardée jusqu'à leur fin, sinon elles pourraient être collectées en cours
+background_tasks = set()
+
+def on_background_done(task: asyncio.Task):
+    background_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("Erreur tâche de fond: %s", task.exception())
+
+def run_in_background(coro) -> asyncio.Task:
+    task = asyncio.create_task(coro)
+    background_tasks.add(task)
+    task.add_done_callback(on_background_done)
+    return task
+
+async def notify_admin(tenant: Tenant, text: str):
+    """Envoie une notification à l'admin du bot (erreurs ignorées)."""
+    if tenant.admin_id:
+        try:
+            await tenant.client.send_message(tenant.admin_id, text)
+        except Exception as e:
+            logger.error("❌ Erreur notification admin: %s", e, extra={'tenant': tenant.name})
 
-async def transfer_to_admin(message_text: str):
-    """Transfère le message à l'admin si activé."""
-    if transfer_enabled and ADMIN_ID and ADMIN_ID != 0:
+async def transfer_to_admin(tenant: Tenant, message_text: str):
+    """Transfère le message à l'admin du bot si activé."""
+    if tenant.transfer_enabled and tenant.admin_id:
         try:
-            await client.send_message(ADMIN_ID, f"📨 Message:\n\n{message_text}")
+            await tenant.client.send_message(tenant.admin_id, f"📨 Message:\n\n{message_text}")
         except Exception as e:
-            logger.error(f"❌ Erreur transfert admin: {e}")
+            logger.error("❌ Erreur transfert admin: %s", e, extra={'tenant': tenant.name})
 
 # --- Gestion des Messages Telegram ---
 
-@client.on(events.NewMessage())
+# Les messages privés sont traités par le routeur de commandes (handle_command)
+async def process_source_message(message_text: str, edited: bool, message_id: int = None, received_at: float = None):
+    """
+    Traite un message du canal source selon l'état du cycle de vie: il est
+    analysé une seule fois puis passé à la prédiction et à la vérification de chaque bot.
+    `received_at` (monotonic() à la réception) sert aux mesures de latence (SLO).
+    """
+    if processing_state == 'starting':
+        buffered_events.append((edited, message_text, message_id, received_at))
+        return
+    if processing_state == 'stopped':
+        return # État cédé à un nouveau processus
+
+    game = SourceGame(message_text, received_at)
+    if game.game_number is None:
+        return
+
+    if not edited:
+        if message_id:
+            detect_source_gap(game.game_number, message_id)
+        # Éviction continue: chaque nouveau jeu retire ce qui est sorti de l'horizon
+        evict_stale_state(game.game_number)
+    if game.finalized and game.groups:
+        archive_finalized_game(game)
+
+    for tenant in tenants:
+        if not edited:
+            # Prédiction immédiate (n'attend pas la finalisation)
+            await process_prediction(tenant, game)
+
+        # Vérification (attend la finalisation)
+        await process_verification(tenant, game)
+
+async def start_processing():
+    """Passe en 'running' et rejoue les événements reçus pendant le démarrage."""
+    global processing_state
+    processing_state = 'running'
+    if buffered_events:
+        logger.info("▶️ Rejeu de %s événements reçus pendant le démarrage", len(buffered_events))
+    while buffered_events:
+        edited, message_text, message_id, received_at = buffered_events.popleft()
+        await process_source_message(message_text, edited, message_id, received_at)
+
+async def handle_source_event(item):
+    edited, message_text, message_id, received_at = item
+    await process_source_message(message_text, edited, message_id, received_at)
+
+# Les gestionnaires Telegram ne font que mettre en file: un seul worker traite les
+# événements source dans l'ordre, en laissant passer les commandes admin entre deux
+source_lane = SourceLane(handle_source_event, control_lane, SOURCE_LANE_CAPACITY)
+
+# Seul le bot principal écoute le canal source, pour tous les bots du processus
+@client.on(events.NewMessage(func=lambda e: not e.is_private))
 async def handle_message(event):
     """Gère les nouveaux messages dans le canal source."""
+    global last_source_event_at
+    received_at = monotonic()
     try:
         chat = await event.get_chat()
         chat_id = chat.id if hasattr(chat, 'id') else event.chat_id
@@ -509,20 +1062,17 @@ async def handle_message(event):
             chat_id = -1000000000000 - chat_id
 
         if chat_id == SOURCE_CHANNEL_ID:
-            message_text = event.message.message
-            
-            # Prédiction immédiate (n'attend pas la finalisation)
-            await process_prediction(message_text)
-            
-            # Vérification (attend la finalisation)
-            await process_verification(message_text)
+            last_source_event_at = received_at
+            source_lane.submit((False, event.message.message, event.message.id, received_at))
 
     except Exception as e:
-        logger.error(f"Erreur handle_message: {e}")
+        logger.error("Erreur handle_message: %s", e)
 
-@client.on(events.MessageEdited())
+@client.on(events.MessageEdited(func=lambda e: not e.is_private))
 async def handle_edited_message(event):
     """Gère les messages édités dans le canal source."""
+    global last_source_event_at
+    received_at = monotonic()
     try:
         chat = await event.get_chat()
         chat_id = chat.id if hasattr(chat, 'id') else event.chat_id
@@ -531,43 +1081,302 @@ async def handle_edited_message(event):
             chat_id = -1000000000000 - chat_id
 
         if chat_id == SOURCE_CHANNEL_ID:
-            message_text = event.message.message
-            
-            # Vérification sur messages édités (attend la finalisation)
-            await process_verification(message_text)
+            last_source_event_at = received_at
+            # Vérification sur messages édités (attend la finalisation); seule la
+            # dernière édition d'un message encore en file est traitée
+            source_lane.submit((True, event.message.message, None, received_at), coalesce_key=('edit', event.message.id))
 
     except Exception as e:
-        logger.error(f"Erreur handle_edited_message: {e}")
+        logger.error("Erreur handle_edited_message: %s", e)
+
+# --- Éviction Continue et Points de Maintenance ---
+
+def evict_tenant_state(tenant: Tenant, current_game: int, max_games: float, now: float) -> int:
+    """
+    Retire d'un bot les entrées hors horizon (âge ou distance au jeu courant):
+    dédoublonnage et prédictions dont la vérification n'arrivera plus.
+    """
+    removed = tenant.processed_predictions.evict(current_game, STATE_HORIZON_SECONDS, max_games, now)
+    removed += tenant.processed_verifications.evict(current_game, STATE_HORIZON_SECONDS, max_games, now)
+    for target_game, pred in list(tenant.pending_predictions.items()):
+        if now - pred.created_at > STATE_HORIZON_SECONDS or abs(current_game - target_game) > max_games:
+            del tenant.pending_predictions[target_game]
+            tenant.daily_stats.record_expired()
+            removed += 1
+            logger.info(
+                "🧹 Prédiction #%s expirée sans vérification", target_game,
+                extra={'tenant': tenant.name, 'target': target_game, 'category': 'expired'}
+            )
+    return removed
+
+def evict_stale_state(current_game: int) -> int:
+    """
+    Éviction incrémentale pour tous les bots et l'archive, appelée à chaque nouveau
+    jeu: le coût suit le nombre d'entrées retirées. Sans jeu courant connu (0),
+    seul l'âge est pris en compte.
+    """
+    now = monotonic()
+    max_games = STATE_HORIZON_GAMES if current_game else float('inf')
+    removed = archived_games.evict(current_game, STATE_HORIZON_SECONDS, max_games, now)
+    for tenant in tenants:
+        removed += evict_tenant_state(tenant, current_game, max_games, now)
+    return removed
+
+# --- Réglage Automatique de A/R (/tune) ---
+
+TUNING_MODE_LABELS = {'off': "désactivé", 'propose': "propositions", 'auto': "automatique"}
+
+def format_tuning_settings(settings: dict) -> str:
+    return (f"{settings['mode']} (A {settings['a_min']}-{settings['a_max']}, "
+            f"R {settings['r_min']}-{settings['r_max']})")
+
+def apply_tuned_offsets(tenant: Tenant, a_offset: int, r_offset: int, rate: float, source: str):
+    """Applique (A, R), l'enregistre dans bot_config.json et le journal, et prévient l'admin."""
+    before = (tenant.a_offset, tenant.r_offset)
+    tenant.a_offset, tenant.r_offset = a_offset, r_offset
+    tenant.tuner.proposal = None
+    tenant.tuner.record_change(before, (a_offset, r_offset), rate)
+    save_config(tenant)
+    logger.info(
+        "🎛️ Réglage %s: A_OFFSET %s → %s, R_OFFSET %s → %s (%.1f%% sur les %s derniers jeux)",
+        source, before[0], a_offset, before[1], r_offset, rate * 100, tenant.tuner.samples(),
+        extra={'tenant': tenant.name, 'stage': 'tuning', 'category': 'tuning_applied'}
+    )
+    run_in_background(notify_admin(
+        tenant,
+        f"🎛️ **Réglage {source}**: `/a {a_offset}` (était {before[0]}), `/r {r_offset}` (était {before[1]})\n"
+        f"Taux de réussite évalué: {rate:.1%} sur les {tenant.tuner.samples()} derniers jeux.\n\n"
+        f"`/tune off` pour désactiver le réglage automatique."
+    ))
+
+def check_tuning(tenant: Tenant):
+    """Après chaque jeu finalisé: propose ou applique un meilleur réglage (au plus un par TUNING_INTERVAL)."""
+    tuner = tenant.tuner
+    if tuner.mode == 'off' or tuner.cooling_down(TUNING_INTERVAL):
+        return
+    recommendation = tuner.recommend(tenant.a_offset, tenant.r_offset)
+    if recommendation is None:
+        return
+    a_offset, r_offset, rate = recommendation
+    if tuner.mode == 'auto':
+        apply_tuned_offsets(tenant, a_offset, r_offset, rate, "automatique")
+        return
+    if tuner.proposal == (a_offset, r_offset):
+        return
+    tuner.proposal = (a_offset, r_offset)
+    tuner.last_change_at = monotonic()
+    current = tuner.rate(tenant.a_offset, tenant.r_offset)
+    logger.info(
+        "🎛️ Réglage proposé: A_OFFSET %s → %s, R_OFFSET %s → %s (%.1f%%)",
+        tenant.a_offset, a_offset, tenant.r_offset, r_offset, rate * 100,
+        extra={'tenant': tenant.name, 'stage': 'tuning', 'category': 'tuning_proposed'}
+    )
+    run_in_background(notify_admin(
+        tenant,
+        f"🎛️ **Réglage proposé**: `/a {a_offset}` `/r {r_offset}` - {rate:.1%} de réussite sur les "
+        f"{tuner.samples()} derniers jeux" + (f" (actuel `/a {tenant.a_offset}` `/r {tenant.r_offset}`: {current:.1%})" if current is not None else "")
+        + "\n\n`/tune apply` pour l'appliquer, `/tune off` pour ne plus recevoir de propositions."
+    ))
+
+# --- Destinations Inaccessibles ---
+
+PROBE_CHECK_INTERVAL = 5 # Secondes entre deux passages (chaque destination a son propre délai)
+
+async def watch_destinations():
+    """Revérifie les destinations inaccessibles (au démarrage ou depuis): l'envoi reprend dès que l'accès revient."""
+    while True:
+        await asyncio.sleep(PROBE_CHECK_INTERVAL)
+        for tenant in tenants:
+            for dest in tenant.destinations.values():
+                if not dest.probe_due():
+                    continue
+                try:
+                    entity = await dest.probe(lambda: tenant.client.get_entity(dest.chat_id))
+                except Exception as e:
+                    logger.warning(
+                        "⚠️ Canal de prédiction %s toujours inaccessible (%s), nouvel essai dans %.0fs",
+                        dest.chat_id, e, dest.next_probe_at - monotonic(), extra={'tenant': tenant.name}
+                    )
+                    continue
+                logger.info("✅ Accès rétabli au canal de prédiction: %s", getattr(entity, 'title', dest.chat_id),
+                            extra={'tenant': tenant.name})
+            tenant.prediction_channel_ok = any(dest.ok for dest in tenant.destinations.values())
+
+# --- Objectifs de Latence (SLO) ---
+
+SLO_CHECK_INTERVAL = 15 # Secondes entre deux évaluations
+
+def format_slo_alert(tenant: Tenant, objective) -> str:
+    snap = objective.snapshot()
+    stage, stage_ms = objective.worst_stage()
+    msg = "🐢 **Objectif de latence non tenu**"
+    if len(tenants) > 1:
+        msg += f" ({tenant.name})"
+    msg += f"\n\n**{objective.label}**\n"
+    msg += (f"Sur les {SLO_WINDOW_SECONDS / 60:g} dernières minutes: {snap['compliance']:.1%} dans l'objectif "
+            f"(cible {SLO_TARGET:.0%}), {snap['samples']} mesures, p95 {snap['p95_ms']:.0f} ms, max {snap['max_ms']:.0f} ms\n")
+    if stage:
+        msg += f"\n⚠️ Étape la plus lente: **{STAGE_LABELS[stage]}** ({stage_ms:.0f} ms en moyenne hors objectif)\n"
+        msg += "\n".join(f"• {STAGE_LABELS[name]}: {value:.0f} ms" for name, value in snap['stage_mean_ms'].items())
+    return msg
+
+async def watch_slos():
+    """Évalue les objectifs de latence de chaque bot et alerte son admin (au plus une fois par SLO_ALERT_INTERVAL)."""
+    while True:
+        await asyncio.sleep(SLO_CHECK_INTERVAL)
+        for tenant in tenants:
+            for objective in tenant.slo.due_alerts():
+                stage, _ = objective.worst_stage()
+                logger.warning(
+                    "🐢 SLO non tenu: %s (%.1f%% dans l'objectif, étape la plus lente: %s)",
+                    objective.label, objective.compliance * 100, stage,
+                    extra={'tenant': tenant.name, 'stage': stage, 'category': 'slo'}
+                )
+                await notify_admin(tenant, format_slo_alert(tenant, objective))
+
+async def flush_prediction_histories():
+    """Écrit dans un thread les résultats en attente de l'historique de chaque bot."""
+    for tenant in tenants:
+        if tenant.prediction_history.pending:
+            try:
+                await asyncio.to_thread(tenant.prediction_history.flush)
+            except Exception as e:
+                logger.error("Erreur écriture historique: %s", e, extra={'tenant': tenant.name})
+
+async def watch_prediction_histories():
+    while True:
+        await asyncio.sleep(HISTORY_FLUSH_INTERVAL)
+        await flush_prediction_histories()
+
+# --- Rapport Quotidien ---
+
+def sync_mode_periods(tenant: Tenant):
+    """Reporte l'état actuel des modes /ec et /time dans les périodes du rapport quotidien."""
+    stats = tenant.daily_stats
+    ec_on = tenant.ec_active and bool(tenant.ec_gaps)
+    stats.set_mode('ec', ec_on, ",".join(map(str, tenant.ec_gaps)) if ec_on else '')
+    block = tenant.prediction_block_until
+    blocked = block is not None and block > datetime.now()
+    stats.set_mode('time', blocked, until=block.timestamp() if blocked else None)
+
+def format_daily_report(tenant: Tenant, stats: DailyStats, ended_at: float, title: str = "Rapport quotidien") -> str:
+    """Texte du rapport, lu directement dans les compteurs de la journée."""
+    wat_tz = timezone(timedelta(hours=1))
+    def wat(ts):
+        return datetime.fromtimestamp(ts, wat_tz).strftime("%d/%m %H:%M")
+
+    msg = f"📊 **{title}**"
+    if len(tenants) > 1:
+        msg += f" ({tenant.name})"
+    msg += f"\n🕐 Du {wat(stats.started_at)} au {wat(ended_at)} WAT\n\n"
+    msg += f"🔮 Prédictions: {stats.predictions}\n"
+    msg += f"Résultats: {stats.wins} ✅ / {stats.losses} ❌"
+    if stats.wins + stats.losses:
+        msg += f" ({stats.hit_rate:.1%})"
+    msg += "\n"
+    if stats.expired:
+        msg += f"🧹 Expirées sans vérification: {stats.expired}\n"
+
+    if stats.wins:
+        msg += "\n**Victoires par essai:**\n"
+        msg += "\n".join(
+            f"{VERIFICATION_EMOJIS[i]}: {count}" for i, count in enumerate(stats.attempts) if count
+        ) + "\n"
+
+    suit_lines = []
+    for code, (wins, losses) in enumerate(zip(stats.suit_wins, stats.suit_losses)):
+        if wins + losses:
+            suit = suit_from_code(code)
+            suit_lines.append(f"{SUIT_DISPLAY.get(suit, suit)}: {wins} ✅ / {losses} ❌ ({wins / (wins + losses):.1%})")
+    if suit_lines:
+        msg += "\n**Par couleur prédite:**\n" + "\n".join(suit_lines) + "\n"
+
+    if stats.periods:
+        msg += "\n**Modes spéciaux:**\n"
+        for mode, detail, start, end, is_open in stats.periods:
+            label = f"/ec {detail}" if mode == 'ec' else "/time"
+            if end is None:
+                msg += f"• {label}: depuis {wat(start)} (en cours)\n"
+            elif is_open and end > ended_at:
+                msg += f"• {label}: depuis {wat(start)}, jusqu'à {wat(end)} (en cours)\n"
+            else:
+                msg += f"• {label}: {wat(start)} → {wat(end)}\n"
+    return msg
+
+async def post_daily_reports():
+    """
+    Clôt la journée de chaque bot: le rapport est envoyé à l'admin (et aux canaux
+    de prédiction si DAILY_REPORT_TO_CHANNEL), puis les compteurs repartent de zéro.
+    """
+    now = datetime.now().timestamp()
+    for tenant in tenants:
+        sync_mode_periods(tenant)
+        stats = tenant.daily_stats
+        tenant.daily_stats = stats.roll(now)
+        report = format_daily_report(tenant, stats, now)
+        logger.info(
+            "📊 Rapport quotidien: %s prédictions, %s ✅ / %s ❌", stats.predictions, stats.wins, stats.losses,
+            extra={'tenant': tenant.name, 'stage': 'report'}
+        )
+        await notify_admin(tenant, report)
+        if DAILY_REPORT_TO_CHANNEL:
+            for dest in tenant.destinations.values():
+                if dest.ok:
+                    dest.submit(
+                        lambda chat_id=dest.chat_id, client=tenant.client, text=report: client.send_message(chat_id, text),
+                        label="Rapport quotidien"
+                    )
 
 # --- Reset Automatique ---
 
-async def reset_all_data():
-    """Efface toutes les données stockées."""
-    global pending_predictions, processed_predictions, processed_verifications, current_game_number
+async def reset_all_data(tenant: Tenant):
+    """Efface toutes les données stockées d'un bot."""
+    count = len(tenant.pending_predictions)
+    tenant.pending_predictions.clear()
+    tenant.processed_predictions.clear()
+    tenant.processed_verifications.clear()
+    tenant.current_game_number = 0
     
-    count = len(pending_predictions)
-    pending_predictions.clear()
-    processed_predictions.clear()
-    processed_verifications.clear()
-    current_game_number = 0
+    logger.info("🔄 Reset effectué - %s prédictions effacées", count, extra={'tenant': tenant.name})
     
-    logger.info(f"🔄 Reset effectué - {count} prédictions effacées")
-    
-    if ADMIN_ID and ADMIN_ID != 0:
+    if tenant.admin_id:
         try:
-            await client.send_message(ADMIN_ID, f"🔄 **Reset automatique effectué**\n\n{count} prédictions effacées.")
+            await tenant.client.send_message(tenant.admin_id, f"🔄 **Reset automatique effectué**\n\n{count} prédictions effacées.")
         except:
             pass
 
+async def reset_all_tenants():
+    """Reset de tous les bots et du dédoublonnage de l'archive (partagé)."""
+    archived_games.clear()
+    for tenant in tenants:
+        await reset_all_data(tenant)
+
+async def maintenance_checkpoint(label: str):
+    """
+    Échéance programmée: reset complet si SCHEDULED_RESETS est activé, sinon
+    passe d'éviction (même sans nouveau message) et état des tailles dans le journal.
+    """
+    if SCHEDULED_RESETS:
+        await reset_all_tenants()
+        return
+    removed = evict_stale_state(last_source_game)
+    logger.info(
+        "🧹 Point de maintenance (%s): %s entrées évincées, %s prédictions actives, %s clés de dédoublonnage",
+        label, removed,
+        sum(len(t.pending_predictions) for t in tenants),
+        sum(len(t.processed_predictions) + len(t.processed_verifications) for t in tenants) + len(archived_games),
+        extra={'stage': 'maintenance'}
+    )
+
 async def schedule_periodic_reset():
-    """Reset automatique toutes les 2 heures."""
+    """Point de maintenance toutes les 2 heures (reset complet si SCHEDULED_RESETS)."""
     while True:
         await asyncio.sleep(2 * 60 * 60)  # 2 heures
-        logger.info("⏰ Reset périodique (2h)...")
-        await reset_all_data()
+        logger.info("⏰ Maintenance périodique (2h)...")
+        await maintenance_checkpoint("2h")
 
 async def schedule_daily_reset():
-    """Reset quotidien à 00h59 WAT (UTC+1)."""
+    """Rapport et point de maintenance quotidiens à 00h59 WAT (UTC+1), reset complet si SCHEDULED_RESETS."""
     wat_tz = timezone(timedelta(hours=1))
     
     while True:
@@ -578,125 +1387,180 @@ async def schedule_daily_reset():
             reset_time += timedelta(days=1)
         
         wait_seconds = (reset_time - now).total_seconds()
-        logger.info(f"⏰ Prochain reset quotidien dans {wait_seconds/3600:.1f} heures")
+        logger.info("⏰ Prochaine maintenance quotidienne dans %.1f heures", wait_seconds / 3600)
         
         await asyncio.sleep(wait_seconds)
         
-        logger.info("🌙 Reset quotidien à 00h59 WAT...")
-        await reset_all_data()
+        logger.info("🌙 Maintenance quotidienne à 00h59 WAT...")
+        try:
+            await post_daily_reports()
+        except Exception:
+            logger.exception("Erreur rapport quotidien")
+        await maintenance_checkpoint("00h59 WAT")
         
         # Petite pause pour éviter les doubles déclenchements
         await asyncio.sleep(60)
 
 # --- Commandes Administrateur ---
 
-def is_admin(sender_id):
-    return ADMIN_ID and ADMIN_ID != 0 and sender_id == ADMIN_ID
+# Routeur des commandes privées: nom de commande -> (handler, admin requis, conversion de l'argument)
+COMMANDS = {}
 
-@client.on(events.NewMessage(pattern='/start'))
-async def cmd_start(event):
-    if event.is_group or event.is_channel:
+def command(*names, admin=True, arg_type=None):
+    """
+    Enregistre un handler `async def cmd(tenant, event, arg)` dans le routeur.
+    `tenant` est le bot qui a reçu la commande, `arg` le texte après la commande
+    converti par `arg_type` (None si absent).
+    """
+    def decorator(func):
+        for name in names:
+            COMMANDS[name] = (func, admin, arg_type)
+        return func
+    return decorator
+
+def parse_uint(value: str) -> int:
+    """Entier positif ou nul (lève ValueError sinon)."""
+    number = int(value)
+    if number < 0:
+        raise ValueError(value)
+    return number
+
+async def handle_command(event):
+    """Point d'entrée unique des commandes: découpe le message une fois puis recherche dans COMMANDS."""
+    received_at = monotonic()
+    tenant = next((t for t in tenants if t.client is event.client), None)
+    text = event.message.message or ''
+    if tenant is None:
+        return
+    if not text.startswith('/'):
         return
-    await event.respond("🤖 **Bot de Prédiction Baccarat**\n\nCommandes: `/status`, `/help`, `/debug`, `/deploy`, `/reset`, `/a`, `/r`, `/time`, `/ec`")
 
-@client.on(events.NewMessage(pattern='/status'))
-async def cmd_status(event):
-    if event.is_group or event.is_channel:
+    parts = text.split(maxsplit=1)
+    name = parts[0].split('@', 1)[0].lower()  # /status@MonBot -> /status
+    entry = COMMANDS.get(name)
+    if entry is None:
         return
-    if not is_admin(event.sender_id):
+    handler, admin_only, arg_type = entry
+
+    if admin_only and not tenant.is_admin(event.sender_id):
         await event.respond("Commande réservée à l'administrateur")
         return
 
-    status_msg = f"📊 **État des prédictions:**\n\n🎮 Jeu actuel: #{current_game_number}\n\n"
+    arg = parts[1].strip() if len(parts) > 1 else None
+    if arg is not None and arg_type is not None:
+        try:
+            arg = arg_type(arg)
+        except ValueError:
+            await event.respond(f"❌ Argument invalide pour `{name}`: `{arg}`")
+            return
+
+    try:
+        await control_lane.run(handler(tenant, event, arg), received_at)
+    except Exception:
+        logger.exception("Erreur commande %s", name, extra={'tenant': tenant.name})
+
+def register_command_handlers():
+    """Chaque bot reçoit ses propres commandes privées (et les applique à son propre état)."""
+    for tenant in tenants:
+        tenant.client.add_event_handler(handle_command, events.NewMessage(func=lambda e: e.is_private))
+
+@command('/start', admin=False)
+async def cmd_start(tenant, event, arg):
+    await event.respond("🤖 **Bot de Prédiction Baccarat**\n\nCommandes: `/status`, `/help`, `/debug`, `/deploy`, `/reset`, `/a`, `/r`, `/time`, `/ec`, `/session`, `/export`, `/streaks`, `/report`, `/model`, `/mem`, `/simulate`, `/tune`")
+
+@command('/status')
+async def cmd_status(tenant, event, arg):
+    status_msg = f"📊 **État des prédictions:**\n\n🎮 Jeu actuel: #{tenant.current_game_number}\n\n"
     
-    if pending_predictions:
-        status_msg += f"**🔮 Actives ({len(pending_predictions)}):**\n"
-        for game_num, pred in sorted(pending_predictions.items()):
-            display_suit = SUIT_DISPLAY.get(pred['suit'], pred['suit'])
-            status_msg += f"• Jeu #{game_num}: {display_suit} - Statut: {pred['status']} (Base #{pred['base_game']}, R={pred['r_offset']}, Essai {pred['verification_attempt']})\n"
+    if tenant.pending_predictions:
+        status_msg += f"**🔮 Actives ({len(tenant.pending_predictions)}):**\n"
+        for game_num, pred in sorted(tenant.pending_predictions.items()):
+            display_suit = SUIT_DISPLAY.get(pred.suit_symbol, pred.suit_symbol)
+            status_msg += f"• Jeu #{game_num}: {display_suit} - Statut: {pred.status} (Base #{pred.base_game}, R={pred.r_offset}, Essai {pred.verification_attempt})\n"
     else:
         status_msg += "**🔮 Aucune prédiction active**\n"
 
+    if len(tenant.outcome_history):
+        recent = list(tenant.outcome_history.recent(20))
+        wins, losses = tenant.outcome_history.summary(100)
+        trail = "".join('✅' if r['won'] else '❌' for r in reversed(recent))
+        status_msg += f"\n**📈 Derniers résultats ({len(recent)}):** {trail}\n"
+        status_msg += f"Sur les {wins + losses} derniers: {wins} ✅ / {losses} ❌\n"
+
     await event.respond(status_msg)
 
-@client.on(events.NewMessage(pattern='/reset'))
-async def cmd_reset(event):
-    if event.is_group or event.is_channel:
-        return
-    if not is_admin(event.sender_id):
-        await event.respond("Commande réservée à l'administrateur")
-        return
-    
-    await reset_all_data()
+@command('/reset')
+async def cmd_reset(tenant, event, arg):
+    await reset_all_data(tenant)
     await event.respond("🔄 **Reset manuel effectué!**\n\nToutes les prédictions ont été effacées.")
 
-@client.on(events.NewMessage(pattern='/debug'))
-async def cmd_debug(event):
-    if event.is_group or event.is_channel:
-        return
-    if not is_admin(event.sender_id):
-        await event.respond("Commande réservée à l'administrateur")
-        return
-    
-    emojis = ", ".join([f"{VERIFICATION_EMOJIS[i]}" for i in range(R_OFFSET + 1)])
+@command('/debug')
+async def cmd_debug(tenant, event, arg):
+    emojis = ", ".join([f"{VERIFICATION_EMOJIS[i]}" for i in range(tenant.r_offset + 1)])
 
     # Statut /time
     time_status = "Inactif"
-    if prediction_block_until and prediction_block_until > datetime.now():
-        remaining_seconds = (prediction_block_until - datetime.now()).total_seconds()
+    if tenant.prediction_block_until and tenant.prediction_block_until > datetime.now():
+        remaining_seconds = (tenant.prediction_block_until - datetime.now()).total_seconds()
         time_status = f"Bloqué ({remaining_seconds:.1f}s restantes)"
     
     # Statut /ec
     ec_status = "Inactif"
     ec_info = ""
-    if ec_active and ec_gaps:
-        gaps_str_display = ", ".join(map(str, ec_gaps))
-        current_gap = ec_gaps[ec_gap_index] if ec_gaps else 'N/A'
+    if tenant.ec_active and tenant.ec_gaps:
+        gaps_str_display = ", ".join(map(str, tenant.ec_gaps))
+        current_gap = tenant.ec_gaps[tenant.ec_gap_index] if tenant.ec_gaps else 'N/A'
         
         ec_status = f"ACTIF (Écarts: {gaps_str_display})"
         
-        if ec_last_source_game == 0:
+        if tenant.ec_last_source_game == 0:
              ec_next_anchor = "En attente de P1..."
-        elif not ec_first_trigger_done:
-            ec_next_anchor = f"Prochaine ancre pour P2: #{ec_last_source_game} + Gap {current_gap} = #{ec_last_source_game + current_gap}"
+        elif not tenant.ec_first_trigger_done:
+            ec_next_anchor = f"Prochaine ancre pour P2: #{tenant.ec_last_source_game} + Gap {current_gap} = #{tenant.ec_last_source_game + current_gap}"
         else:
-             ec_next_anchor = f"Prochaine ancre: #{ec_last_source_game} + Gap {current_gap} = #{ec_last_source_game + current_gap}"
+             ec_next_anchor = f"Prochaine ancre: #{tenant.ec_last_source_game} + Gap {current_gap} = #{tenant.ec_last_source_game + current_gap}"
 
 
-        ec_info = f"• Ancre Source Précédente: #{ec_last_source_game}\n• Écart/Index Actuel: {current_gap}/{ec_gap_index}\n• {ec_next_anchor}"
+        ec_info = f"• Ancre Source Précédente: #{tenant.ec_last_source_game}\n• Écart/Index Actuel: {current_gap}/{tenant.ec_gap_index}\n• {ec_next_anchor}"
 
 
+    control_snap, source_snap = control_lane.snapshot(), source_lane.snapshot()
     debug_msg = f"""🔍 **Informations de débogage:**
 
 **Configuration:**
+• Bot: {tenant.name} ({len(tenants)} bot(s) dans ce processus)
 • Source Channel: {SOURCE_CHANNEL_ID}
-• Prediction Channel: {PREDICTION_CHANNEL_ID}
-• Admin ID: {ADMIN_ID}
+• Prediction Channels: {', '.join(map(str, tenant.destinations)) or 'Aucun'}
+• Admin ID: {tenant.admin_id}
 
 **Accès aux canaux:**
 • Canal source: {'✅ OK' if source_channel_ok else '❌ Non accessible'}
-• Canal prédiction: {'✅ OK' if prediction_channel_ok else '❌ Non accessible'}
+• Canaux prédiction: {' '.join(f"{d.chat_id} {'✅' if d.ok else '❌'} (envoyés {d.sent}, échecs {d.failed}, file {d.depth})" for d in tenant.destinations.values()) or '❌ Aucun'}
 
 **Offsets (Persistants):**
-• A_OFFSET (/a): N + {A_OFFSET} (Utilisé par défaut ou si /ec actif)
-• R_OFFSET (/r): {R_OFFSET}
+• A_OFFSET (/a): N + {tenant.a_offset} (Utilisé par défaut ou si /ec actif)
+• R_OFFSET (/r): {tenant.r_offset}
 
 **Modes Spéciaux:**
 • Blocage /time: {time_status} (Ignoré si /ec actif)
 • Mode /ec: {ec_status}
 {ec_info}
+• Prédicteur (/model): {tenant.predictor} ({tenant.frequency_model.samples(tenant.a_offset)} jeux observés à N+{tenant.a_offset})
+• Réglage auto (/tune): {TUNING_MODE_LABELS[tenant.tuner.mode]} ({tenant.tuner.samples()} jeux évalués)
+
+**Files de traitement:**
+• Commandes: {control_lane.depth} en cours, attente p99 {control_snap['wait_p99_ms']} ms
+• Source: {source_snap['depth']} en attente (max {source_snap['max_depth']}), attente p99 {source_snap['wait_p99_ms']} ms, fusionnés {source_snap['coalesced']}, abandonnés {source_snap['shed']}
+• Boucle: {current_backend()} (EVENT_LOOP={EVENT_LOOP}), retard p99 {loop_monitor.snapshot()['p99_ms']} ms
 
 **État:**
-• Jeu actuel: #{current_game_number}
-• Prédictions actives: {len(pending_predictions)}
+• Jeu actuel: #{tenant.current_game_number}
+• Prédictions actives: {len(tenant.pending_predictions)}
 """
     await event.respond(debug_msg)
 
-@client.on(events.NewMessage(pattern='/help'))
-async def cmd_help(event):
-    if event.is_group or event.is_channel:
-        return
-
+@command('/help', admin=False)
+async def cmd_help(tenant, event, arg):
     await event.respond("""📖 **Aide - Bot de Prédiction Baccarat**
 
 **Règles de prédiction (Mise à jour):**
@@ -714,83 +1578,107 @@ Vérifie si le costume prédit est dans le PREMIER groupe pour les jeux **N+0 à
 • `/debug` - Informations système
 • `/reset` - Reset manuel des prédictions
 • `/deploy` - Télécharger le bot pour Render.com
+• `/session` - Exporter la session Telegram (TELEGRAM_SESSION)
+• `/export [début] [fin] [csv|xlsx]` - Historique des prédictions (dates AAAA-MM-JJ)
+• `/streaks` - Séries de victoires/défaites et essais gagnants
+• `/report` - Rapport de la journée en cours (envoyé automatiquement à 00h59 WAT)
+• `/model [parite|frequence]` - Prédicteur de ce bot: règle de parité ou modèle de fréquences
+• `/mem [start|reset|stop]` - Mémoire du processus: tailles des structures, RSS, allocations (tracemalloc)
+• `/simulate [jeux] [a=N] [r=N] [ec=3,4]` - Rejoue les règles sur les jeux archivés (`/simulate stop` pour annuler)
+• `/tune [off|propose|auto] [a=1-3] [r=0-2]` - Réglage automatique de A/R sur les derniers jeux (`/tune off` pour désactiver)
 """)
 
-@client.on(events.NewMessage(pattern='/a(?: (\d+))?'))
-async def cmd_a_offset(event):
-    if event.is_group or event.is_channel:
-        return
-    if not is_admin(event.sender_id):
-        await event.respond("Commande réservée à l'administrateur")
-        return
-    
-    global A_OFFSET
-    match = re.match(r'/a (\d+)', event.message.message)
+@command('/a', arg_type=parse_uint)
+async def cmd_a_offset(tenant, event, arg):
     
-    if match:
-        new_a = int(match.group(1))
-        A_OFFSET = new_a
-        save_config()
-        await event.respond(f"✅ **Offset de prédiction (/a)** mis à jour.\n\nLa prédiction sera lancée pour le jeu **N + {A_OFFSET}**.")
+    if arg is not None:
+        tenant.a_offset = arg
+        save_config(tenant)
+        await event.respond(f"✅ **Offset de prédiction (/a)** mis à jour.\n\nLa prédiction sera lancée pour le jeu **N + {tenant.a_offset}**.")
     else:
-        await event.respond(f"ℹ️ **Offset de prédiction actuel (/a): N + {A_OFFSET}**\n\nUtilisation: `/a [valeur]` (ex: `/a 3`)")
+        await event.respond(f"ℹ️ **Offset de prédiction actuel (/a): N + {tenant.a_offset}**\n\nUtilisation: `/a [valeur]` (ex: `/a 3`)")
 
 
-@client.on(events.NewMessage(pattern='/r(?: (\d+))?'))
-async def cmd_r_offset(event):
-    if event.is_group or event.is_channel:
-        return
-    if not is_admin(event.sender_id):
-        await event.respond("Commande réservée à l'administrateur")
-        return
+@command('/r', arg_type=parse_uint)
+async def cmd_r_offset(tenant, event, arg):
     
-    global R_OFFSET
-    match = re.match(r'/r (\d+)', event.message.message)
-    
-    if match:
-        new_r = int(match.group(1))
+    if arg is not None:
+        new_r = arg
         if 0 <= new_r <= 10:
-            R_OFFSET = new_r
-            save_config()
+            tenant.r_offset = new_r
+            save_config(tenant)
             emojis = ", ".join([f"{VERIFICATION_EMOJIS[i]}" for i in range(new_r + 1)])
-            await event.respond(f"""✅ **Offset de vérification (/r)** mis à jour: **{R_OFFSET}** essais supplémentaires.
-La vérification se fera de N+0 à N+{R_OFFSET}.
+            await event.respond(f"""✅ **Offset de vérification (/r)** mis à jour: **{tenant.r_offset}** essais supplémentaires.
+La vérification se fera de N+0 à N+{tenant.r_offset}.
 \n**Émojis de succès:** {emojis}""")
         else:
             await event.respond("❌ La valeur de /r doit être comprise entre **0** et **10**.")
     else:
-        emojis = ", ".join([f"{VERIFICATION_EMOJIS[i]}" for i in range(R_OFFSET + 1)])
-        await event.respond(f"""ℹ️ **Offset de vérification actuel (/r): {R_OFFSET}**
-La vérification se fait sur **{R_OFFSET + 1}** jeux (N+0 à N+{R_OFFSET}).
+        emojis = ", ".join([f"{VERIFICATION_EMOJIS[i]}" for i in range(tenant.r_offset + 1)])
+        await event.respond(f"""ℹ️ **Offset de vérification actuel (/r): {tenant.r_offset}**
+La vérification se fait sur **{tenant.r_offset + 1}** jeux (N+0 à N+{tenant.r_offset}).
 \n**Émojis de succès:** {emojis}
 \nUtilisation: `/r [valeur]` (ex: `/r 2`)""")
         
-@client.on(events.NewMessage(pattern='/time(?: (\d+))?'))
-async def cmd_time(event):
+PREDICTOR_NAMES = {'parite': 'parity', 'parité': 'parity', 'parity': 'parity',
+                   'frequence': 'frequency', 'fréquence': 'frequency', 'frequency': 'frequency'}
+
+@command('/model')
+async def cmd_model(tenant, event, arg):
+    """Choix du prédicteur du bot (règle de parité ou modèle de fréquences)."""
+    model = tenant.frequency_model
+    if arg is not None:
+        predictor = PREDICTOR_NAMES.get(arg.lower())
+        if predictor is None:
+            await event.respond("❌ Utilisation: `/model parite` ou `/model frequence`")
+            return
+        tenant.predictor = predictor
+        save_config(tenant)
+        logger.info("Prédicteur: %s", predictor, extra={'tenant': tenant.name})
+
+    msg = f"🧠 **Prédicteur actuel (/model): {tenant.predictor}**\n\n"
+    samples = model.samples(tenant.a_offset)
+    msg += f"Modèle de fréquences: {samples}/{model.window} jeux observés (décalage N+{tenant.a_offset})\n"
+    others = [f"N+{lag} ({model.samples(lag)})" for lag in model.lags if lag != tenant.a_offset]
+    if others:
+        msg += f"Autres décalages suivis (/tune): {', '.join(others)}\n"
+    if tenant.predictor == 'frequency' and samples < model.min_samples:
+        msg += f"⚠️ Moins de {model.min_samples} observations: la règle de parité est utilisée en attendant.\n"
+
+    # Taux de sortie par couleur de la carte source et parité (toutes valeurs confondues)
+    if samples:
+        msg += "\n**Couleur la plus fréquente au jeu cible:**\n"
+        for code in range(len(SUIT_DISPLAY)):
+            source = SUIT_DISPLAY.get(suit_from_code(code), '')
+            for parity, sample_game in (("pair", 0), ("impair", 1)):
+                total, rates = model.marginal_rates(code, sample_game, tenant.a_offset)
+                if total:
+                    best = max(range(len(rates)), key=rates.__getitem__)
+                    best_suit = SUIT_DISPLAY.get(suit_from_code(best), '')
+                    msg += f"• {source} ({parity}): {best_suit} {rates[best]:.0%} sur {total} jeux\n"
+    msg += "\nUtilisation: `/model parite` ou `/model frequence`"
+    await event.respond(msg)
+
+@command('/time', arg_type=parse_uint)
+async def cmd_time(tenant, event, arg):
     """
     Bloque la génération de nouvelles prédictions pendant une durée spécifiée.
     """
-    if event.is_group or event.is_channel:
-        return
-    if not is_admin(event.sender_id):
-        await event.respond("Commande réservée à l'administrateur")
-        return
     
-    global prediction_block_until, ec_active
     
-    match = re.match(r'/time (\d+)', event.message.message)
     current_time = datetime.now()
     wat_tz = timezone(timedelta(hours=1)) # Pour l'affichage à l'utilisateur
 
-    if ec_active:
+    if tenant.ec_active:
         await event.respond("❌ **Le mode `/ec` est actif et a la priorité.** Le blocage `/time` est ignoré.")
         return
 
-    if match:
-        duration_seconds = int(match.group(1))
+    if arg is not None:
+        duration_seconds = arg
         
         if duration_seconds == 0:
-            prediction_block_until = None
+            tenant.prediction_block_until = None
+            sync_mode_periods(tenant)
             await event.respond("✅ **Blocage des prédictions levé.**\n\nLe bot reprendra les prédictions au prochain jeu.")
             logger.warning("Blocage des prédictions levé manuellement.")
             return
@@ -800,50 +1688,45 @@ async def cmd_time(event):
             return
 
         block_end_time = current_time + timedelta(seconds=duration_seconds)
-        prediction_block_until = block_end_time
+        tenant.prediction_block_until = block_end_time
+        sync_mode_periods(tenant)
         
         end_time_wat = block_end_time.astimezone(wat_tz).strftime("%H:%M:%S WAT")
         
         await event.respond(f"⛔ **Blocage des prédictions activé.**\n\nDurée: **{duration_seconds} secondes** ({duration_seconds/60:.2f} minutes).\nReprise des prédictions à **{end_time_wat}**.")
-        logger.warning(f"Prédictions bloquées pendant {duration_seconds} secondes. Reprise à {prediction_block_until.isoformat()}")
+        logger.warning("Prédictions bloquées pendant %s secondes. Reprise à %s", duration_seconds, tenant.prediction_block_until.isoformat())
         
     else:
         # Vérifier le statut actuel si aucun argument n'est fourni
-        if prediction_block_until and prediction_block_until > current_time:
-            remaining_seconds = (prediction_block_until - current_time).total_seconds()
-            end_time_wat = prediction_block_until.astimezone(wat_tz).strftime("%H:%M:%S WAT")
+        if tenant.prediction_block_until and tenant.prediction_block_until > current_time:
+            remaining_seconds = (tenant.prediction_block_until - current_time).total_seconds()
+            end_time_wat = tenant.prediction_block_until.astimezone(wat_tz).strftime("%H:%M:%S WAT")
             
             await event.respond(f"ℹ️ **Statut actuel: BLOQUÉ**\n\nFin du blocage à **{end_time_wat}** (Reste {remaining_seconds:.1f} secondes).\n\nPour débloquer: `/time 0`. Pour bloquer: `/time [secondes]`.")
         else:
-            prediction_block_until = None
+            tenant.prediction_block_until = None
+            sync_mode_periods(tenant)
             await event.respond("ℹ️ **Statut actuel: ACTIF**\n\nUtilisation: `/time [secondes]` (ex: `/time 120` pour bloquer 2 minutes). Utilisez `/time 0` pour débloquer immédiatement.")
 
-@client.on(events.NewMessage(pattern='/ec(?: (.+))?'))
-async def cmd_ec(event):
+@command('/ec')
+async def cmd_ec(tenant, event, arg):
     """
     Active le mode Écart Personnalisé (ec) et désactive le blocage /time.
     """
-    if event.is_group or event.is_channel:
-        return
-    if not is_admin(event.sender_id):
-        await event.respond("Commande réservée à l'administrateur")
-        return
-    
-    global ec_active, ec_gaps, ec_gap_index, ec_last_source_game, ec_first_trigger_done, prediction_block_until, current_game_number
     
-    match = re.match(r'/ec (.+)', event.message.message)
     
-    if match:
-        gap_str = match.group(1).strip()
+    if arg:
+        gap_str = arg
         
         # Commande /ec 0 ou /ec OFF pour désactiver
         if gap_str.upper() in ['0', 'OFF', 'STOP']:
-            ec_active = False
-            ec_gaps = []
-            ec_gap_index = 0
-            ec_last_source_game = 0
-            ec_first_trigger_done = False
-            save_config()
+            tenant.ec_active = False
+            tenant.ec_gaps = []
+            tenant.ec_gap_index = 0
+            tenant.ec_last_source_game = 0
+            tenant.ec_first_trigger_done = False
+            save_config(tenant)
+            sync_mode_periods(tenant)
             await event.respond("✅ **Mode Écart Personnalisé (/ec) désactivé.**\n\nLe bot revient à l'offset de prédiction standard (`/a`).")
             return
 
@@ -856,41 +1739,42 @@ async def cmd_ec(event):
             await event.respond(f"❌ Erreur de format: {e}. Format attendu: `/ec 3,4,5` (entiers positifs).")
             return
 
-        ec_active = True
-        ec_gaps = gaps
-        ec_gap_index = 0
-        ec_last_source_game = 0 # Reset l'ancre pour forcer le P1 initial
-        ec_first_trigger_done = False # Doit lancer P1 d'abord
+        tenant.ec_active = True
+        tenant.ec_gaps = gaps
+        tenant.ec_gap_index = 0
+        tenant.ec_last_source_game = 0 # Reset l'ancre pour forcer le P1 initial
+        tenant.ec_first_trigger_done = False # Doit lancer P1 d'abord
         
         # Le blocage /time n'est pas nécessaire, car la logique /ec l'ignore, mais on le clear pour la clarté.
-        if prediction_block_until:
-            prediction_block_until = None
+        if tenant.prediction_block_until:
+            tenant.prediction_block_until = None
             await event.respond("⚠️ Le blocage `/time` a été levé automatiquement (priorité à `/ec`).")
 
-        save_config()
+        save_config(tenant)
+        sync_mode_periods(tenant)
         
-        gaps_str_display = ", ".join(map(str, ec_gaps))
+        gaps_str_display = ", ".join(map(str, tenant.ec_gaps))
         await event.respond(f"""✅ **Mode Écart Personnalisé (/ec) activé!**
-\n**Écarts définis ({len(ec_gaps)}):** {gaps_str_display}
-\n**Prochaine prédiction (P1):** Se déclenchera sur le prochain jeu source reçu (N) et prédira pour **N + A_OFFSET** (`/a {A_OFFSET}`).
+\n**Écarts définis ({len(tenant.ec_gaps)}):** {gaps_str_display}
+\n**Prochaine prédiction (P1):** Se déclenchera sur le prochain jeu source reçu (N) et prédira pour **N + A_OFFSET** (`/a {tenant.a_offset}`).
 \n**P2 et suivants:** Se déclencheront lorsque le numéro source sera le **dernier N + le prochain écart** (Ex: 100 + {gaps[0]}).
 \nPour désactiver: `/ec 0` ou `/ec off`""")
 
     else:
         # Afficher le statut actuel
-        if ec_active and ec_gaps:
-            gaps_str_display = ", ".join(map(str, ec_gaps))
-            current_gap = ec_gaps[ec_gap_index] if ec_gaps else 'N/A'
+        if tenant.ec_active and tenant.ec_gaps:
+            gaps_str_display = ", ".join(map(str, tenant.ec_gaps))
+            current_gap = tenant.ec_gaps[tenant.ec_gap_index] if tenant.ec_gaps else 'N/A'
             
             status_msg = f"ℹ️ **Mode Écart Personnalisé (/ec) ACTIF**\n"
             status_msg += f"**Écarts définis:** {gaps_str_display}\n"
 
-            if not ec_first_trigger_done:
+            if not tenant.ec_first_trigger_done:
                 status_msg += "**Statut:** En attente de la première prédiction (P1) sur le prochain jeu source (N)."
             else:
-                next_required = ec_last_source_game + current_gap
-                status_msg += f"**Prochain écart utilisé:** {current_gap} (Index {ec_gap_index} / {len(ec_gaps)})\n"
-                status_msg += f"**Ancre du dernier N prédit:** #{ec_last_source_game}\n"
+                next_required = tenant.ec_last_source_game + current_gap
+                status_msg += f"**Prochain écart utilisé:** {current_gap} (Index {tenant.ec_gap_index} / {len(tenant.ec_gaps)})\n"
+                status_msg += f"**Ancre du dernier N prédit:** #{tenant.ec_last_source_game}\n"
                 status_msg += f"**Jeu source minimum requis pour la prochaine prédiction:** **#{next_required}**"
             
             status_msg += "\n\nUtilisation: `/ec 3,4,5` ou `/ec 0` pour désactiver."
@@ -899,37 +1783,433 @@ async def cmd_ec(event):
             
         await event.respond(status_msg)
 
-@client.on(events.NewMessage(pattern='/transfert|/activetransfert'))
-async def cmd_active_transfert(event):
-    if event.is_group or event.is_channel:
+@command('/session')
+async def cmd_session(tenant, event, arg):
+    """Exporte la session courante sous forme de StringSession (TELEGRAM_SESSION)."""
+    if tenant.client.session.auth_key is None:
+        await event.respond("❌ Aucune session authentifiée à exporter.")
         return
-    if not is_admin(event.sender_id):
-        await event.respond("Commande réservée à l'administrateur")
+
+    session_string = StringSession.save(tenant.client.session)
+    await event.respond(f"""🔑 **Session exportée**
+
+`{session_string}`
+
+Définissez-la dans la variable d'environnement `TELEGRAM_SESSION` pour éviter une nouvelle authentification au démarrage.
+⚠️ Ne partagez jamais cette chaîne: elle donne accès au bot.""")
+
+def parse_export_args(args):
+    """Analyse `[début] [fin] [csv|xlsx]` (dates AAAA-MM-JJ). Lève ValueError si invalide."""
+    dates = []
+    fmt = 'xlsx'
+    for arg in args:
+        if arg.lower() in ('csv', 'xlsx'):
+            fmt = arg.lower()
+        else:
+            datetime.strptime(arg, '%Y-%m-%d')
+            dates.append(arg)
+    if len(dates) > 2:
+        raise ValueError("trop de dates")
+    date_from = dates[0] if dates else None
+    date_to = dates[1] if len(dates) > 1 else None
+    return date_from, date_to, fmt
+
+def check_export_params(date_from: str = None, date_to: str = None, fmt: str = None):
+    """Paramètres nommés de /export (HTTP): dates AAAA-MM-JJ facultatives, csv|xlsx. Lève ValueError si invalide."""
+    for date in (date_from, date_to):
+        if date:
+            datetime.strptime(date, '%Y-%m-%d')
+    fmt = (fmt or 'xlsx').lower()
+    if fmt not in ('csv', 'xlsx'):
+        raise ValueError(f"format inconnu: {fmt}")
+    return date_from or None, date_to or None, fmt
+
+@command('/export', arg_type=str.split)
+async def cmd_export(tenant, event, arg):
+    """Exporte l'historique des prédictions (XLSX ou CSV) sans bloquer la boucle."""
+    try:
+        date_from, date_to, fmt = parse_export_args(arg or [])
+    except ValueError:
+        await event.respond("❌ Format attendu: `/export [AAAA-MM-JJ] [AAAA-MM-JJ] [csv|xlsx]`")
         return
-    global transfer_enabled
-    transfer_enabled = True
-    await event.respond("✅ Transfert des messages activé!")
 
-@client.on(events.NewMessage(pattern='/stoptransfert'))
-async def cmd_stop_transfert(event):
-    if event.is_group or event.is_channel:
+    await event.respond("📊 Préparation de l'export...")
+    try:
+        out_path, count = await asyncio.to_thread(tenant.prediction_history.export, fmt, date_from, date_to)
+        try:
+            period = f"{date_from or 'début'} → {date_to or 'aujourd’hui'}"
+            await tenant.client.send_file(
+                event.chat_id,
+                out_path,
+                caption=f"📊 **Historique des prédictions** ({fmt.upper()})\n\nPériode: {period}\nLignes: {count}"
+            )
+        finally:
+            os.remove(out_path)
+    except Exception as e:
+        logger.error("Erreur export: %s", e)
+        await event.respond(f"❌ Erreur: {e}")
+
+def format_streak_line(label: str, stats) -> str:
+    """Ligne de résumé d'un segment pour /streaks."""
+    total = stats.wins + stats.losses
+    if not total:
+        return f"• {label}: aucune donnée"
+    if stats.current > 0:
+        current = f"{stats.current} ✅ de suite"
+    else:
+        current = f"{-stats.current} ❌ de suite"
+    return (f"• {label}: {stats.wins}✅/{stats.losses}❌ ({stats.hit_rate * 100:.1f}%) - "
+            f"Actuelle: {current} - Max: {stats.longest_win}✅ / {stats.longest_loss}❌")
+
+@command('/streaks')
+async def cmd_streaks(tenant, event, arg):
+    """Séries de victoires/défaites et distribution des essais gagnants."""
+    overall = tenant.streak_tracker.overall
+    if not overall.wins + overall.losses:
+        await event.respond("ℹ️ **Aucun résultat enregistré pour le moment.**")
         return
-    if not is_admin(event.sender_id):
-        await event.respond("Commande réservée à l'administrateur")
+
+    msg = "📈 **Séries de prédictions**\n\n"
+    msg += format_streak_line("Global", overall) + "\n"
+
+    msg += "\n**Par parité (jeu source):**\n"
+    for parity, stats in tenant.streak_tracker.by_parity.items():
+        msg += format_streak_line(parity.capitalize(), stats) + "\n"
+
+    msg += "\n**Par couleur prédite:**\n"
+    for code, stats in sorted(tenant.streak_tracker.by_suit.items()):
+        suit = suit_from_code(code)
+        msg += format_streak_line(SUIT_DISPLAY.get(suit, suit), stats) + "\n"
+
+    msg += "\n**Victoires par essai:**\n"
+    msg += "\n".join(
+        f"{VERIFICATION_EMOJIS[i]}: {count}" for i, count in enumerate(overall.attempts) if count
+    )
+    await event.respond(msg)
+
+@command('/report')
+async def cmd_report(tenant, event, arg):
+    """Rapport de la journée en cours (celui envoyé à 00h59 WAT)."""
+    sync_mode_periods(tenant)
+    await event.respond(format_daily_report(tenant, tenant.daily_stats, datetime.now().timestamp(), "Journée en cours"))
+
+def memory_structures() -> dict:
+    """Nombre d'entrées des structures du bot qui grandissent avec le trafic."""
+    result = {
+        'archived_games': len(archived_games),
+        'buffered_events': len(buffered_events),
+        'source_lane': source_lane.depth,
+        'log_queue': queued_records(),
+        'backfill': backfiller.pending,
+        'tenants': {},
+    }
+    for tenant in tenants:
+        entity_cache = getattr(getattr(tenant.client, '_mb_entity_cache', None), 'hash_map', None)
+        result['tenants'][tenant.name] = {
+            'pending_predictions': len(tenant.pending_predictions),
+            'processed_predictions': len(tenant.processed_predictions),
+            'processed_verifications': len(tenant.processed_verifications),
+            'outcome_history': len(tenant.outcome_history),
+            'frequency_model': len(tenant.frequency_model),
+            'outbound_queue': tenant.outbound_depth(),
+            'telethon_entities': len(entity_cache) if entity_cache is not None else None,
+        }
+    return result
+
+async def memory_report(limit: int = 10) -> dict:
+    """Relevé RSS, tailles des structures et, si le traçage est actif, plus fortes croissances."""
+    rss = memory_profiler.sample_rss()
+    return {
+        'rss': rss,
+        'structures': memory_structures(),
+        'top': await memory_profiler.top(limit),
+        **memory_profiler.status(),
+    }
+
+@command('/mem')
+async def cmd_mem(tenant, event, arg):
+    """Mémoire du processus; `start`/`reset`/`stop` pilotent tracemalloc (arrêté par défaut)."""
+    action = (arg or '').lower()
+    if action == 'start':
+        await memory_profiler.start()
+        await event.respond("🧪 **Traçage mémoire démarré** (instantané de référence pris).\n\n`/mem` affiche les croissances depuis la référence, `/mem reset` prend une nouvelle référence, `/mem stop` arrête le traçage.")
+        return
+    if action == 'stop':
+        memory_profiler.stop()
+        await event.respond("⏹️ **Traçage mémoire arrêté** (plus aucun coût).")
+        return
+    if action == 'reset':
+        if not memory_profiler.active:
+            await event.respond("ℹ️ Traçage inactif: `/mem start` pour le démarrer.")
+            return
+        await memory_profiler.rebase()
+        await event.respond("🔄 **Nouvel instantané de référence pris.**")
+        return
+    if action:
+        await event.respond("❌ Utilisation: `/mem`, `/mem start`, `/mem reset` ou `/mem stop`")
         return
-    global transfer_enabled
-    transfer_enabled = False
-    await event.respond("⛔ Transfert des messages désactivé.")
 
-@client.on(events.NewMessage(pattern='/deploy'))
-async def cmd_deploy(event):
-    """Génère un fichier ZIP deployable sur Render.com"""
-    if event.is_group or event.is_channel:
+    report = await memory_report()
+    structures = report['structures']
+    msg = f"🧠 **Mémoire du processus**\n\nRSS: {format_bytes(report['rss'])}\n"
+    history = [rss for _, rss in report['rss_history']]
+    if len(history) > 1:
+        msg += f"Sur {len(history)} relevés: min {format_bytes(min(history))}, max {format_bytes(max(history))}, écart {format_bytes(history[-1] - history[0])}\n"
+
+    msg += "\n**Structures partagées:**\n"
+    msg += f"• Jeux archivés (dédoublonnage): {structures['archived_games']}\n"
+    msg += f"• Événements en tampon: {structures['buffered_events']} - File source: {structures['source_lane']}\n"
+    msg += f"• File de journalisation: {structures['log_queue']} - Rattrapage en attente: {structures['backfill']}\n"
+    for name, sizes in structures['tenants'].items():
+        msg += f"\n**Bot {name}:**\n" if len(tenants) > 1 else "\n**Bot:**\n"
+        msg += (f"• Prédictions actives: {sizes['pending_predictions']} - Dédoublonnage: "
+                f"{sizes['processed_predictions']} + {sizes['processed_verifications']}\n")
+        msg += f"• Historique des résultats: {sizes['outcome_history']} - Modèle de fréquences: {sizes['frequency_model']}\n"
+        msg += f"• File d'envoi: {sizes['outbound_queue']} - Entités Telethon: {sizes['telethon_entities'] if sizes['telethon_entities'] is not None else 'n/d'}\n"
+
+    if report['active']:
+        msg += f"\n**Traçage (tracemalloc):** {format_bytes(report['traced_current'])} (pic {format_bytes(report['traced_peak'])})\n"
+        msg += "**Plus fortes croissances depuis la référence:**\n"
+        msg += "\n".join(
+            f"• `{os.path.basename(item['location'])}`: {format_bytes(item['size_diff'])} ({item['count_diff']:+d} blocs)"
+            for item in report['top']
+        ) or "Aucune"
+    else:
+        msg += "\nℹ️ Traçage inactif: `/mem start` pour suivre les allocations par ligne."
+    await event.respond(msg)
+
+PREDICTOR_LABELS = {'parity': "parité", 'frequency': "fréquences"}
+
+def parse_simulation_args(tenant: Tenant, words: list) -> dict:
+    """
+    `[jeux] [a=N] [r=N] [ec=3,4|0] [model=parite|frequence]`; ce qui n'est pas
+    précisé reprend la configuration actuelle du bot. Lève ValueError si invalide.
+    """
+    params = {
+        'games': 2000, 'a_offset': tenant.a_offset, 'r_offset': tenant.r_offset,
+        'gaps': list(tenant.ec_gaps) if tenant.ec_active else [], 'predictor': tenant.predictor,
+    }
+    for word in words:
+        key, _, value = word.lower().partition('=')
+        if not value and key.isdigit():
+            params['games'] = int(key)
+        elif key in ('a', '/a'):
+            params['a_offset'] = parse_uint(value)
+        elif key in ('r', '/r'):
+            params['r_offset'] = parse_uint(value)
+        elif key in ('ec', '/ec'):
+            if value in ('0', 'off'):
+                params['gaps'] = []
+            else:
+                params['gaps'] = [int(g) for g in value.split(',') if g.strip()]
+                if not params['gaps'] or any(g <= 0 for g in params['gaps']):
+                    raise ValueError(word)
+        elif key in ('model', 'modele', 'modèle') and value in PREDICTOR_NAMES:
+            params['predictor'] = PREDICTOR_NAMES[value]
+        else:
+            raise ValueError(word)
+    if not 1 <= params['games'] <= SIMULATION_MAX_GAMES or params['r_offset'] > 10:
+        raise ValueError(words)
+    return params
+
+def describe_simulation(params: dict) -> str:
+    ec = ",".join(map(str, params['gaps'])) if params['gaps'] else "0"
+    return (f"{params['games']} derniers jeux - `/a {params['a_offset']}`, `/r {params['r_offset']}`, "
+            f"`/ec {ec}`, prédicteur {PREDICTOR_LABELS[params['predictor']]}")
+
+def format_simulation_result(job, result: dict) -> str:
+    titles = {
+        'done': "🧪 **Simulation #{}**",
+        'cancelled': "⏹️ **Simulation #{} annulée** (résultats partiels)",
+        'timeout': "⌛ **Simulation #{} interrompue** après {:.0f} s (résultats partiels)",
+    }
+    msg = titles[result['status']].format(job.id, SIMULATION_TIMEOUT) + "\n"
+    msg += describe_simulation(job.params) + "\n\n"
+    if not result['games']:
+        return msg + ("Aucun jeu archivé à rejouer." if result['status'] == 'done' else "Aucun jeu rejoué.")
+    msg += f"Jeux rejoués: {result['games']} (#{result['first_game']} à #{result['last_game']})\n"
+    msg += f"Prédictions: {result['predictions']} - ✅ {result['wins']} - ❌ {result['losses']}"
+    if result['unresolved']:
+        msg += f" - non vérifiées: {result['unresolved']}"
+    msg += f"\n**Taux de réussite: {result['hit_rate']:.1%}**\n"
+    if result['wins']:
+        msg += "Succès par essai: " + ", ".join(
+            f"{VERIFICATION_EMOJIS[i]} {count}" for i, count in enumerate(result['wins_by_attempt']) if count
+        ) + "\n"
+    msg += f"Pire série de pertes: {result['max_loss_streak']}\n"
+    msg += f"Durée: {result['elapsed']:.1f} s"
+    return msg
+
+async def run_simulation(tenant: Tenant, event, job):
+    """Attend la simulation (exécutée dans le pool) puis envoie les résultats à l'admin."""
+    try:
+        await flush_game_archive() # La simulation lit les fichiers de l'archive
+        result = await simulations.run(job)
+    except Exception as e:
+        logger.exception("Erreur simulation #%s", job.id, extra={'tenant': tenant.name})
+        await event.respond(f"❌ Simulation #{job.id} en erreur: {e}")
         return
-    if not is_admin(event.sender_id):
-        await event.respond("Commande réservée à l'administrateur")
+    if result is None:
+        await event.respond(f"⏹️ **Simulation #{job.id} annulée** avant son démarrage.")
+        return
+    logger.info(
+        "🧪 Simulation #%s (%s): %s prédictions, %.1f%% de réussite en %.1f s", job.id, result['status'],
+        result['predictions'], result['hit_rate'] * 100, result['elapsed'], extra={'tenant': tenant.name}
+    )
+    await event.respond(format_simulation_result(job, result))
+
+@command('/simulate', arg_type=str.split)
+async def cmd_simulate(tenant, event, arg):
+    """Rejoue les règles sur les jeux archivés, dans un processus séparé."""
+    own_jobs = [job for job in simulations.jobs.values() if job.owner == tenant.name]
+    if arg and arg[0].lower() in ('stop', 'annuler'):
+        targets = own_jobs
+        if len(arg) > 1:
+            targets = [job for job in own_jobs if str(job.id) == arg[1].lstrip('#')]
+            if not targets:
+                await event.respond(f"❌ Aucune simulation #{arg[1].lstrip('#')} en cours.")
+                return
+        for job in targets:
+            simulations.cancel(job)
+        await event.respond(f"⏹️ {len(targets)} simulation(s) annulée(s)." if targets else "ℹ️ Aucune simulation en cours.")
+        return
+
+    if not arg:
+        msg = "🧪 **Simulations**\n\n"
+        if own_jobs:
+            msg += "\n".join(
+                f"• #{job.id} ({'en cours' if job.running else 'en file'}): {describe_simulation(job.params)}"
+                for job in own_jobs
+            )
+        else:
+            msg += "Aucune simulation en cours."
+        msg += ("\n\nUtilisation: `/simulate [jeux] [a=N] [r=N] [ec=3,4] [model=parite|frequence]`"
+                "\nEx: `/simulate 2000 ec=2,3 r=2` - `/simulate stop [n°]` pour annuler")
+        await event.respond(msg)
+        return
+
+    if game_archive is None:
+        await event.respond("❌ Archive des jeux désactivée (`ARCHIVE_DIR`): rien à rejouer.")
+        return
+    if SIMULATION_WORKERS <= 0:
+        await event.respond("❌ Simulations désactivées (`SIMULATION_WORKERS=0`).")
+        return
+    if not simulations.available:
+        await event.respond("❌ Processus de simulation arrêtés: redémarrer le bot pour les recréer.")
+        return
+    try:
+        params = parse_simulation_args(tenant, arg)
+    except ValueError:
+        await event.respond(
+            f"❌ Paramètres invalides. Format: `/simulate [jeux] [a=N] [r=0-10] [ec=3,4] [model=parite|frequence]` "
+            f"(au plus {SIMULATION_MAX_GAMES} jeux)"
+        )
+        return
+
+    job = simulations.create(
+        tenant.name, archive_dir=ARCHIVE_DIR, **params,
+        frequency_window=tenant.frequency_model.window, frequency_min_samples=tenant.frequency_model.min_samples
+    )
+    if job is None:
+        await event.respond(f"⏳ Déjà {SIMULATION_MAX_JOBS} simulations en file: réessayez plus tard ou `/simulate stop`.")
         return
+    asyncio.create_task(run_simulation(tenant, event, job))
+    await event.respond(f"🧪 **Simulation #{job.id} lancée**\n{describe_simulation(params)}\n\nLes résultats arriveront ici (`/simulate stop {job.id}` pour annuler).")
+
+@command('/tune', arg_type=str.split)
+async def cmd_tune(tenant, event, arg):
+    """Réglage automatique de A/R: `off`, `propose`, `auto`, bornes `a=1-3 r=0-2`, `apply`."""
+    tuner = tenant.tuner
+    if arg and arg[0].lower() in ('apply', 'appliquer'):
+        if tuner.proposal is None:
+            await event.respond("ℹ️ Aucune proposition en attente.")
+            return
+        a_offset, r_offset = tuner.proposal
+        rate = tuner.rate(a_offset, r_offset) or 0.0
+        apply_tuned_offsets(tenant, a_offset, r_offset, rate, "appliqué par l'admin")
+        await event.respond(f"✅ Réglage appliqué: `/a {a_offset}` `/r {r_offset}`")
+        return
+
+    if arg:
+        settings = tuner.settings()
+        try:
+            for word in arg:
+                key, _, value = word.lower().partition('=')
+                if not value and key in ('off', 'stop', '0'):
+                    settings['mode'] = 'off'
+                elif not value and key in ('propose', 'proposer', 'on'):
+                    settings['mode'] = 'propose'
+                elif not value and key == 'auto':
+                    settings['mode'] = 'auto'
+                elif key in ('a', 'r') and value:
+                    low, _, high = value.partition('-')
+                    settings[f'{key}_min'], settings[f'{key}_max'] = int(low), int(high or low)
+                else:
+                    raise ValueError(word)
+            settings = validate_settings(settings)
+        except ValueError:
+            await event.respond("❌ Utilisation: `/tune [off|propose|auto] [a=1-3] [r=0-2]` ou `/tune apply`")
+            return
+        before = tuner.settings()
+        tuner.apply_settings(settings)
+        save_config(tenant)
+        logger.info(
+            "🎛️ Réglage automatique: %s → %s", format_tuning_settings(before), format_tuning_settings(settings),
+            extra={'tenant': tenant.name, 'stage': 'tuning', 'category': 'tuning_settings'}
+        )
+
+    msg = f"🎛️ **Réglage automatique de A/R: {TUNING_MODE_LABELS[tuner.mode]}**\n\n"
+    msg += f"Bornes: A de {tuner.a_min} à {tuner.a_max}, R de {tuner.r_min} à {tuner.r_max}\n"
+    current = tuner.rate(tenant.a_offset, tenant.r_offset)
+    msg += f"Réglage actuel: `/a {tenant.a_offset}` `/r {tenant.r_offset}`"
+    if current is not None:
+        msg += f" - {current:.1%}\n"
+    elif tuner.a_min <= tenant.a_offset <= tuner.a_max and tuner.r_min <= tenant.r_offset <= tuner.r_max:
+        msg += " (pas encore évalué)\n"
+    else:
+        msg += " (hors bornes)\n"
+    msg += f"Jeux évalués: {tuner.samples()}/{tuner.window} (minimum {tuner.min_samples} avant de proposer)\n"
+    msg += f"Score = taux de réussite - {tuner.r_penalty:.0%} par essai supplémentaire\n"
+
+    scores = tuner.scores()
+    if scores:
+        msg += "\n**Meilleurs réglages:**\n"
+        msg += "\n".join(
+            f"• `/a {a_offset}` `/r {r_offset}`: {rate:.1%} (score {score:.3f})"
+            for a_offset, r_offset, rate, score in scores[:5]
+        ) + "\n"
+    if tuner.proposal is not None:
+        msg += f"\n💡 Proposition en attente: `/a {tuner.proposal[0]}` `/r {tuner.proposal[1]}` (`/tune apply`)\n"
+    if tuner.changes:
+        msg += "\n**Derniers changements:**\n"
+        msg += "\n".join(
+            f"• {datetime.fromtimestamp(ts).strftime('%d/%m %H:%M')}: A {before[0]}→{after[0]}, R {before[1]}→{after[1]} ({rate:.1%})"
+            for ts, before, after, rate, _ in tuner.changes[-3:]
+        ) + "\n"
+    msg += "\nUtilisation: `/tune propose`, `/tune auto`, `/tune off`, `/tune a=1-3 r=0-2`"
+    await event.respond(msg)
+
+@command('/transfert', '/activetransfert')
+async def cmd_active_transfert(tenant, event, arg):
+    tenant.transfer_enabled = True
+    await event.respond("✅ Transfert des messages activé!")
+
+@command('/stoptransfert')
+async def cmd_stop_transfert(tenant, event, arg):
+    tenant.transfer_enabled = False
+    await event.respond("⛔ Transfert des messages désactivé.")
 
+# Modules Python copiés tels quels dans le paquet de déploiement
+DEPLOY_MODULES = [
+    'config.py', 'main.py', 'bot_logging.py', 'loop_monitor.py',
+    'prediction_history.py', 'prediction_records.py', 'handover.py', 'streaks.py',
+    'backfill.py', 'fanout.py', 'game_archive.py', 'tenants.py', 'eviction.py', 'daily_report.py', 'fake_telegram.py', 'slo.py', 'lanes.py', 'frequency_model.py', 'mem_profile.py', 'cards.py', 'backtest.py', 'tuning.py',
+    'event_loop.py', 'benchmark.py'
+]
+
+@command('/deploy')
+async def cmd_deploy(tenant, event, arg):
+    """Génère un fichier ZIP deployable sur Render.com"""
     await event.respond("📦 Préparation du fichier de déploiement...")
 
     try:
@@ -938,68 +2218,9 @@ async def cmd_deploy(event):
             shutil.rmtree(deploy_dir)
         os.makedirs(deploy_dir)
 
-        # Création de config.py
-        config_content = '''"""
-Configuration du bot Telegram de prédiction Baccarat
-"""
-import os
-import json
-
-def parse_channel_id(env_var: str, default: str) -> int:
-    value = os.getenv(env_var) or default
-    if value.startswith('-100'):
-        return int(value)
-    try:
-        channel_id = int(value)
-        if channel_id > 0 and len(str(channel_id)) >= 10:
-            return int(f"-100{channel_id}") 
-        return channel_id
-    except ValueError:
-        return 0
-
-SOURCE_CHANNEL_ID = parse_channel_id('SOURCE_CHANNEL_ID', '-1002682552255')
-PREDICTION_CHANNEL_ID = parse_channel_id('PREDICTION_CHANNEL_ID', '-1003343276131')
-ADMIN_ID = int(os.getenv('ADMIN_ID') or '0')
-API_ID = int(os.getenv('API_ID') or '0')
-API_HASH = os.getenv('API_HASH') or ''
-BOT_TOKEN = os.getenv('BOT_TOKEN') or ''
-PORT = int(os.getenv('PORT') or '10000')
-
-# Mappings simplifiés pour le code qui utilise la logique complexe
-# Ces mappings ne sont plus utilisés dans get_predicted_suit, mais peuvent l'être ailleurs ou pour la compatibilité
-SUIT_MAPPING_EVEN = {'♠': '♣', '♣': '♠', '♦': '♥', '♥': '♦'}
-SUIT_MAPPING_ODD = {'♠': '♥', '♣': '♦', '♦': '♣', '♥': '♠'}
-ALL_SUITS = ['♥', '♠', '♦', '♣']
-SUIT_DISPLAY = {'♠': '♠️', '♥': '❤️', '♦': '♦️', '♣': '♣️'}
-SUIT_NORMALIZE = {'❤️': '♥', '❤': '♥', '♥️': '♥', '♠️': '♠', '♦️': '♦', '♣️': '♣'}
-
-# --- NOUVELLES CONFIGURATIONS ---
-
-A_OFFSET_DEFAULT = 1
-R_OFFSET_DEFAULT = 0
-
-VERIFICATION_EMOJIS = {
-    0: "✅0️⃣",
-    1: "✅1️⃣",
-    2: "✅2️⃣",
-    3: "✅3️⃣",
-    4: "✅4️⃣",
-    5: "✅5️⃣",
-    6: "✅6️⃣",
-    7: "✅7️⃣",
-    8: "✅8️⃣",
-    9: "✅9️⃣",
-    10: "✅🔟"
-}
-'''
-        with open(os.path.join(deploy_dir, 'config.py'), 'w', encoding='utf-8') as f:
-            f.write(config_content)
-
-        # Copie de main.py
-        with open('main.py', 'r', encoding='utf-8') as f:
-            main_content = f.read()
-        with open(os.path.join(deploy_dir, 'main.py'), 'w', encoding='utf-8') as f:
-            f.write(main_content)
+        # Copie des modules Python du bot (config.py, main.py et modules annexes)
+        for module_file in DEPLOY_MODULES:
+            shutil.copy(module_file, os.path.join(deploy_dir, module_file))
 
         # Création de requirements.txt
         requirements_content = '''telethon==1.35.0
@@ -1020,6 +2241,7 @@ openpyxl==3.1.2
     plan: free
     buildCommand: pip install -r requirements.txt
     startCommand: python main.py
+    healthCheckPath: /health
     envVars:
       - key: PORT
         value: 10000
@@ -1066,9 +2288,48 @@ openpyxl==3.1.2
 - Les prédictions suivantes (P2, P3...) se font seulement lorsque le numéro source atteint **[Ancre N précédente + Écart actuel]**.
 - La prédiction cible reste toujours **N_source + A_OFFSET**.
 
-**Reset automatique:**
-- Toutes les 2 heures
-- Quotidien à 00h59 WAT
+**Éviction continue de l'état:**
+- À chaque nouveau jeu, les entrées plus vieilles que `STATE_HORIZON_SECONDS` (défaut: 7200) ou à plus de `STATE_HORIZON_GAMES` jeux (défaut: 200) du jeu courant sont retirées; les prédictions en cours ne sont jamais effacées en bloc
+- Toutes les 2 heures et à 00h59 WAT: point de maintenance (éviction et journal des tailles); `SCHEDULED_RESETS=1` rétablit les resets complets
+
+**Rapport quotidien:**
+- Compteurs tenus à jour à chaque prédiction et vérification: résultats, taux de réussite, essais gagnants, résultats par couleur et périodes `/ec`/`/time`
+- Envoyé à l'admin à 00h59 WAT (et aux canaux de prédiction si `DAILY_REPORT_TO_CHANNEL=1`); `/report` affiche la journée en cours
+
+## Variables d'environnement optionnelles
+
+**Canaux et sessions:**
+- `SOURCE_CHANNEL_ID`, `PREDICTION_CHANNEL_ID`: canal source et canal de prédiction principal
+- `EXTRA_PREDICTION_CHANNEL_IDS`: canaux/groupes supplémentaires (séparés par des virgules); `DESTINATION_MAX_RETRIES` (défaut: 3) essais par envoi, délai doublé à partir de `DESTINATION_RETRY_DELAY` (défaut: 1 s)
+- `SESSION_FILE` (défaut: `bot_session`), `TELEGRAM_SESSION` (session exportée par `/session`)
+
+**Plusieurs bots dans un processus:**
+- `TENANTS_FILE` (défaut: `tenants.json`): `[{{"name": "vip", "bot_token": "...", "admin_id": 123, "prediction_channel_ids": [-1001234567890]}}]`
+
+**Redéploiement sans interruption:**
+- `HANDOVER_SOCKET` (défaut: `/tmp/baccarat_bot_handover.sock`, vide = désactivé): socket de passation d'état entre l'ancien et le nouveau processus
+- `HANDOVER_TIMEOUT` (défaut: 15 s), `HANDOVER_DRAIN_TIMEOUT` (défaut: 10 s), `HANDOVER_PREPARE_TIMEOUT` (défaut: 120 s)
+
+**Rechargement, historique et santé:**
+- `CONFIG_WATCH_INTERVAL` (défaut: 2 s, 0 = désactivé; `kill -HUP` recharge aussi `bot_config.json`)
+- `HISTORY_FILE` (défaut: `predictions_history.csv`), `HISTORY_FLUSH_INTERVAL` (défaut: 5 s); `EXPORT_TOKEN` active `GET /export` et `GET /mem`
+- `HEALTH_MAX_LOOP_LAG_MS` (défaut: 1000), `HEALTH_MAX_SOURCE_AGE` (défaut: 3600 s), `HEALTH_MAX_OUTBOUND` (défaut: 50): seuils de `/health`
+- `SLO_PREDICTION_MS` / `SLO_STATUS_MS` (défaut: 500 / 2000, 0 = désactivé), `SLO_TARGET` (0.95), `SLO_WINDOW_SECONDS` (600), `SLO_ALERT_INTERVAL` (1800), `SLO_MIN_SAMPLES` (5)
+- `LOG_FORMAT` (`json` par défaut, ou `text`), `LOG_SAMPLE_SECONDS` (défaut: 30)
+
+**Traitement du canal source:**
+- `SOURCE_LANE_CAPACITY` (défaut: 1000), `CONTROL_LANE_MAX_HOLD` (défaut: 0.5 s)
+- `BACKFILL_MAX_GAP` (défaut: 200 messages récupérés par trou), `BACKFILL_CONCURRENCY` (défaut: 2 lots simultanés)
+- `EVENT_LOOP` (défaut: `auto`, uvloop s'il est installé; ou `asyncio`, `uvloop`)
+
+**Archive, modèle, réglage et simulations:**
+- `ARCHIVE_DIR` (défaut: `game_archive`, vide = désactivée), `ARCHIVE_FLUSH_INTERVAL` (défaut: 5 s)
+- `FREQUENCY_WINDOW` (défaut: 2000), `FREQUENCY_MIN_SAMPLES` (défaut: 20): prédicteur `/model frequence`
+- `TUNING_WINDOW` (500), `TUNING_MIN_SAMPLES` (200), `TUNING_R_PENALTY` (0.05), `TUNING_MARGIN` (0.02), `TUNING_INTERVAL` (1800 s): `/tune`
+- `SIMULATION_WORKERS` (défaut: 0 = `/simulate` désactivé; sinon processus créés au chargement de `main.py`), `SIMULATION_MAX_JOBS` (4), `SIMULATION_TIMEOUT` (120 s), `SIMULATION_MAX_GAMES` (100000)
+
+**Tests hors ligne:**
+- `FAKE_TELEGRAM=1` (ou `latency_ms=80,flood_rate=0.01,feed_interval=5,...`): client Telegram simulé, aucun appel à l'API réelle
 '''
         with open(os.path.join(deploy_dir, 'README.md'), 'w', encoding='utf-8') as f:
             f.write(readme_content)
@@ -1097,7 +2358,7 @@ openpyxl==3.1.2
                     arcname = os.path.relpath(file_path, deploy_dir)
                     zipf.write(file_path, arcname)
 
-        await client.send_file(
+        await tenant.client.send_file(
             event.chat_id,
             zip_path,
             caption=f"📦 **ren.zip**\n\nFichier prêt pour déploiement sur Render.com (port 10000)\n\n**Mise à jour majeure:**\n• **Réintégration de la règle de prédiction complexe** (Parité Jeu + Parité Carte).\n• **Format du message de succès simplifié** (`📲Game:N:S statut :✅0️⃣`).\n• Réintégration des commandes `/time` et `/ec` avec persistance et logique de rotation."
@@ -1109,87 +2370,333 @@ openpyxl==3.1.2
         logger.info("✅ Fichier ren.zip envoyé")
 
     except Exception as e:
-        logger.error(f"Erreur création deploy: {e}")
+        logger.error("Erreur création deploy: %s", e)
         await event.respond(f"❌ Erreur: {e}")
 
 # --- Serveur Web ---
 
 async def index(request):
+    rows = "\n".join(
+        f"<p><strong>{t.name}:</strong> jeu actuel #{t.current_game_number}, "
+        f"{len(t.pending_predictions)} prédictions actives, A={t.a_offset}, R={t.r_offset}</p>"
+        for t in tenants
+    )
     html = f"""<!DOCTYPE html>
 <html>
 <head><title>Bot Prédiction Baccarat</title></head>
 <body>
 <h1>🎯 Bot de Prédiction Baccarat</h1>
 <p>Le bot est en ligne et surveille les canaux.</p>
-<p><strong>Jeu actuel:</strong> #{current_game_number}</p>
-<p><strong>Prédictions actives:</strong> {len(pending_predictions)}</p>
-<p><strong>Config:</strong> A={A_OFFSET}, R={R_OFFSET}</p>
+{rows}
 </body>
 </html>"""
     return web.Response(text=html, content_type='text/html', status=200)
 
+def tenant_health(tenant: Tenant) -> dict:
+    return {
+        'destinations': {
+            str(d.chat_id): {'ok': d.ok, 'queue': d.depth, 'sent': d.sent, 'failed': d.failed}
+            for d in tenant.destinations.values()
+        },
+        'prediction_channel_ok': tenant.prediction_channel_ok,
+        'current_game_number': tenant.current_game_number,
+        'pending_predictions': len(tenant.pending_predictions),
+        'dedupe_entries': len(tenant.processed_predictions) + len(tenant.processed_verifications),
+        'slo': tenant.slo.snapshot(),
+    }
+
+def health_report() -> dict:
+    """État de santé du processus et liste des seuils de disponibilité dépassés."""
+    now = monotonic()
+    lag = loop_monitor.snapshot()
+    # Avant le premier message, l'âge est compté depuis le démarrage
+    source_age = now - (last_source_event_at or started_at)
+
+    failures = []
+    if lag['p99_ms'] > HEALTH_MAX_LOOP_LAG_MS:
+        failures.append('loop_lag')
+    if lag['tick_age_s'] is not None and lag['tick_age_s'] * 1000 > HEALTH_MAX_LOOP_LAG_MS + loop_monitor.interval * 1000:
+        failures.append('loop_stalled')
+    # L'accès aux canaux est rapporté mais ne fait pas échouer la disponibilité:
+    # un redémarrage ne corrige pas une mauvaise configuration (boucle de redémarrages)
+    if source_age > HEALTH_MAX_SOURCE_AGE:
+        failures.append('source_stale')
+    if outbound_depth() > HEALTH_MAX_OUTBOUND:
+        failures.append('outbound_backlog')
+
+    # Les champs de premier niveau décrivent le bot principal; `tenants` détaille chaque bot
+    return {
+        'ready': not failures,
+        'failures': failures,
+        'uptime_s': round(now - started_at, 1),
+        'event_loop': current_backend(),
+        'loop_lag': lag,
+        'last_source_event_age_s': round(source_age, 1),
+        'outbound_queue_depth': outbound_depth(),
+        'backfill_pending_ids': backfiller.pending,
+        'backfill_fetched': backfiller.fetched,
+        'backfill_abandoned': backfiller.abandoned,
+        'source_channel_ok': source_channel_ok,
+        'lanes': {'control': control_lane.snapshot(), 'source': source_lane.snapshot()},
+        **tenant_health(primary),
+        'tenants': {t.name: tenant_health(t) for t in tenants},
+    }
+
 async def health_check(request):
-    return web.Response(text="OK", status=200)
+    """Disponibilité: 200 si tous les seuils sont respectés, 503 sinon (redémarrage par la plateforme)."""
+    report = health_report()
+    return web.json_response(report, status=200 if report['ready'] else 503)
+
+async def mem_endpoint(request):
+    """GET /mem?token=...&action=start|reset|stop&limit=10: mémoire du processus (JSON, même jeton que /export)."""
+    if not EXPORT_TOKEN or request.query.get('token') != EXPORT_TOKEN:
+        return web.Response(text="Forbidden", status=403)
+    action = request.query.get('action', '')
+    try:
+        limit = min(max(int(request.query.get('limit', '10')), 1), 100)
+    except ValueError:
+        return web.Response(text="Paramètres invalides", status=400)
+    if action == 'start':
+        await memory_profiler.start()
+    elif action == 'reset' and memory_profiler.active:
+        await memory_profiler.rebase()
+    elif action == 'stop':
+        memory_profiler.stop()
+    elif action not in ('', 'reset'):
+        return web.Response(text="Paramètres invalides", status=400)
+    return web.json_response(await memory_report(limit))
+
+async def export_endpoint(request):
+    """GET /export?token=...&from=AAAA-MM-JJ&to=AAAA-MM-JJ&format=csv|xlsx&tenant=main"""
+    if not EXPORT_TOKEN or request.query.get('token') != EXPORT_TOKEN:
+        return web.Response(text="Forbidden", status=403)
+
+    tenant = find_tenant(request.query.get('tenant', PRIMARY_TENANT))
+    if tenant is None:
+        return web.Response(text="Bot inconnu", status=404)
+
+    try:
+        date_from, date_to, fmt = check_export_params(
+            request.query.get('from'), request.query.get('to'), request.query.get('format'))
+    except ValueError:
+        return web.Response(text="Paramètres invalides", status=400)
+
+    try:
+        out_path, count = await asyncio.to_thread(tenant.prediction_history.export, fmt, date_from, date_to)
+    except Exception as e:
+        logger.error("Erreur export: %s", e, extra={'tenant': tenant.name})
+        return web.Response(text=f"Erreur export: {e}", status=500)
+    content_type = 'text/csv' if fmt == 'csv' else 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    response = web.StreamResponse(headers={
+        'Content-Type': content_type,
+        'Content-Disposition': f'attachment; filename="predictions.{fmt}"',
+        'X-Row-Count': str(count),
+    })
+    await response.prepare(request)
+    try:
+        with open(out_path, 'rb') as f:
+            while True:
+                chunk = await asyncio.to_thread(f.read, 64 * 1024)
+                if not chunk:
+                    break
+                await response.write(chunk)
+    finally:
+        os.remove(out_path)
+    await response.write_eof()
+    return response
+
+async def streaks_endpoint(request):
+    """GET /streaks?tenant=main: séries globales, par couleur et par parité (JSON)."""
+    tenant = find_tenant(request.query.get('tenant', PRIMARY_TENANT))
+    if tenant is None:
+        return web.Response(text="Bot inconnu", status=404)
+    return web.json_response(tenant.streak_tracker.to_dict())
 
 async def start_web_server():
+    global web_runner
     app = web.Application()
     app.router.add_get('/', index)
     app.router.add_get('/health', health_check)
+    app.router.add_get('/export', export_endpoint)
+    app.router.add_get('/streaks', streaks_endpoint)
+    app.router.add_get('/mem', mem_endpoint)
     runner = web.AppRunner(app)
     await runner.setup()
     site = web.TCPSite(runner, '0.0.0.0', PORT)
-    await site.start()
-    logger.info(f"🌐 Serveur web démarré sur le port {PORT}")
+    # Après une passation, l'ancien processus peut encore tenir le port quelques instants
+    for attempt in range(20):
+        try:
+            await site.start()
+            break
+        except OSError:
+            if attempt == 19:
+                raise
+            await asyncio.sleep(0.5)
+    web_runner = runner
+    logger.info("🌐 Serveur web démarré sur le port %s", PORT)
+
+# --- Passation entre processus ---
+
+def release_session():
+    """
+    Ancien processus: valide les sessions SQLite et cesse d'y enregistrer les entités,
+    pour que le nouveau processus puisse les utiliser sans attendre de verrou.
+    """
+    for tenant in tenants:
+        tenant.client.session.save_entities = False
+        tenant.client.session.save()
+    logger.info("🤝 Sessions libérées pour le nouveau processus")
+
+def restore_session():
+    """Ancien processus: la passation n'a pas eu lieu, les entités sont de nouveau enregistrées."""
+    for tenant in tenants:
+        tenant.client.session.save_entities = True
+    logger.info("🤝 Sessions reprises par ce processus")
+
+async def surrender_state() -> dict:
+    """Ancien processus: arrête de consommer, vide les envois en cours et retourne l'état."""
+    global processing_state
+    processing_state = 'stopped'
+    await asyncio.gather(*(
+        d.drain(HANDOVER_DRAIN_TIMEOUT) for tenant in tenants for d in tenant.destinations.values()
+    ))
+    if outbound_depth() > 0:
+        logger.warning("⚠️ Passation: %s envois encore en cours après %ss", outbound_depth(), HANDOVER_DRAIN_TIMEOUT)
+    # Le nouveau processus ajoute à la suite des mêmes fichiers d'historique et d'archive
+    await flush_prediction_histories()
+    await flush_game_archive()
+    return build_process_snapshot()
+
+async def shutdown_after_handover():
+    """Ancien processus: libère le port HTTP puis déconnecte tous les bots (fin de main())."""
+    simulations.shutdown()
+    if web_runner is not None:
+        await web_runner.cleanup()
+    for tenant in tenants:
+        await tenant.client.disconnect()
 
 # --- Démarrage Principal ---
 
 async def verify_channels():
-    """Vérifie l'accès aux canaux."""
-    global source_channel_ok, prediction_channel_ok
+    """Vérifie l'accès au canal source (bot principal) et aux canaux de prédiction de chaque bot."""
+    global source_channel_ok
 
     try:
         if SOURCE_CHANNEL_ID and SOURCE_CHANNEL_ID != 0:
             try:
                 entity = await client.get_entity(SOURCE_CHANNEL_ID)
                 source_channel_ok = True
-                logger.info(f"✅ Accès au canal source: {getattr(entity, 'title', SOURCE_CHANNEL_ID)}")
+                logger.info("✅ Accès au canal source: %s", getattr(entity, 'title', SOURCE_CHANNEL_ID))
             except Exception as e:
-                logger.error(f"❌ Impossible d'accéder au canal source: {e}")
-
-        if PREDICTION_CHANNEL_ID and PREDICTION_CHANNEL_ID != 0:
-            try:
-                entity = await client.get_entity(PREDICTION_CHANNEL_ID)
-                prediction_channel_ok = True
-                logger.info(f"✅ Accès au canal de prédiction: {getattr(entity, 'title', PREDICTION_CHANNEL_ID)}")
-            except Exception as e:
-                logger.error(f"❌ Impossible d'accéder au canal de prédiction: {e}")
+                logger.error("❌ Impossible d'accéder au canal source: %s", e)
+
+        for tenant in tenants:
+            for dest in tenant.destinations.values():
+                try:
+                    entity = await dest.probe(lambda: tenant.client.get_entity(dest.chat_id))
+                    logger.info("✅ Accès au canal de prédiction: %s", getattr(entity, 'title', dest.chat_id),
+                                extra={'tenant': tenant.name})
+                except Exception as e:
+                    logger.error("❌ Impossible d'accéder au canal de prédiction %s: %s", dest.chat_id, e,
+                                 extra={'tenant': tenant.name})
+            tenant.prediction_channel_ok = any(dest.ok for dest in tenant.destinations.values())
 
     except Exception as e:
-        logger.error(f"Erreur vérification canaux: {e}")
+        logger.error("Erreur vérification canaux: %s", e)
+
+async def connect_tenants():
+    """
+    Connecte chaque bot. Le bot principal est indispensable (il lit le canal source);
+    un bot supplémentaire qui ne peut pas se connecter est retiré sans arrêter les autres.
+    """
+    for tenant in list(tenants):
+        try:
+            # Avec une session déjà autorisée, start() ne refait pas la connexion par token
+            await tenant.client.start(bot_token=tenant.bot_token)
+            tenant.client.session.save()
+            me = await tenant.client.get_me()
+            logger.info("✅ Bot connecté: @%s", me.username, extra={'tenant': tenant.name})
+        except Exception as e:
+            if tenant is primary:
+                raise
+            logger.error("❌ Bot %s non connecté, ignoré: %s", tenant.name, e, extra={'tenant': tenant.name})
+            tenants.remove(tenant)
+            await tenant.client.disconnect()
 
 async def main():
     """Fonction principale."""
     try:
-        load_config() # Chargement de la config A, R et EC au démarrage
-        
-        await client.start(bot_token=BOT_TOKEN)
-        me = await client.get_me()
-        logger.info(f"✅ Bot connecté: @{me.username}")
+        boot_started = monotonic()
+        for tenant in tenants:
+            load_config(tenant) # Chargement de la config A, R et EC de chaque bot au démarrage
+            sync_mode_periods(tenant)
+
+        # Un ancien processus tourne encore: il libère les sessions avant notre connexion
+        handover_expected = bool(HANDOVER_SOCKET) and await request_prepare(HANDOVER_SOCKET, HANDOVER_TIMEOUT)
+
+        register_command_handlers()
+        await connect_tenants()
 
         await verify_channels()
+
+        # Reprise de l'état d'un processus déjà en cours (redéploiement sans interruption)
+        if handover_expected:
+            state = await request_handover(HANDOVER_SOCKET, HANDOVER_TIMEOUT)
+            if state is not None:
+                apply_process_snapshot(state)
+                logger.info(
+                    "🤝 État repris de l'ancien processus: %s prédictions actives (%s bots)",
+                    sum(len(t.pending_predictions) for t in tenants), len(tenants)
+                )
+        await start_processing()
+
+        if HANDOVER_SOCKET:
+            await serve_handover(HANDOVER_SOCKET, release_session, surrender_state, shutdown_after_handover,
+                                 restore_session, HANDOVER_PREPARE_TIMEOUT)
+
+        asyncio.create_task(loop_monitor.run())
+        asyncio.create_task(watch_slos())
+        asyncio.create_task(watch_destinations())
+        asyncio.create_task(watch_prediction_histories())
+        if game_archive is not None:
+            asyncio.create_task(watch_game_archive())
         await start_web_server()
 
+        # Rechargement à chaud de la configuration (fichiers surveillés + SIGHUP)
+        if CONFIG_WATCH_INTERVAL > 0:
+            asyncio.create_task(watch_config_file())
+        try:
+            asyncio.get_running_loop().add_signal_handler(
+                signal.SIGHUP, lambda: [asyncio.create_task(reload_config(t, "SIGHUP")) for t in tenants]
+            )
+        except (NotImplementedError, AttributeError):
+            pass # Pas de SIGHUP (Windows)
+
         # Lancer les tâches de reset automatique
         asyncio.create_task(schedule_periodic_reset())
         asyncio.create_task(schedule_daily_reset())
 
-        logger.info("🚀 Bot opérationnel - En attente de messages...")
-        await client.run_until_disconnected()
+        # API simulée: flux de jeux synthétiques sur le canal source
+        if fake_conditions is not None and fake_conditions.feed_interval > 0:
+            asyncio.create_task(play_source_feed(
+                client, SOURCE_CHANNEL_ID, fake_conditions.feed_interval, fake_conditions.feed_start
+            ))
 
-    except Exception as e:
-        logger.error(f"Erreur principale: {e}")
-        import traceback
-        logger.error(traceback.format_exc())
+        # Persiste les entités résolues (access hashes des canaux) pour le prochain démarrage
+        for tenant in tenants:
+            tenant.client.session.save()
+
+        logger.info(
+            "🚀 Bot opérationnel - En attente de messages (%s bots, boucle %s)...", len(tenants), current_backend(),
+            extra={'stage': 'boot', 'latency_ms': round((monotonic() - boot_started) * 1000, 1)}
+        )
+        await asyncio.gather(*(t.client.run_until_disconnected() for t in tenants))
+        simulations.shutdown()
+        await flush_prediction_histories()
+        await flush_game_archive()
+
+    except Exception:
+        logger.exception("Erreur principale")
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    run_event_loop(main(), EVENT_LOOP)
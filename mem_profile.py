@@ -0,0 +1,126 @@
+"""
+Profilage mémoire à la demande (tracemalloc) et relevés de la mémoire résidente du processus
+"""
+import os
+import sys
+import asyncio
+import tracemalloc
+from collections import deque
+from time import time as wall_time
+
+RSS_HISTORY = 240 # Relevés conservés (epoch, octets)
+
+def read_rss() -> int:
+    """Mémoire résidente actuelle en octets (pic si /proc est indisponible, 0 si inconnue)."""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024 # Octets sur macOS, Ko ailleurs
+    except (ImportError, OSError):
+        return 0
+
+def format_bytes(size: float) -> str:
+    sign = '-' if size < 0 else ''
+    size = abs(size)
+    for unit in ('o', 'Ko', 'Mo'):
+        if size < 1024:
+            return f"{sign}{size:.0f} {unit}" if unit == 'o' else f"{sign}{size:.1f} {unit}"
+        size /= 1024
+    return f"{sign}{size:.1f} Go"
+
+class MemoryProfiler:
+    """
+    Inactif par défaut: tracemalloc reste arrêté et rien n'est relevé en
+    arrière-plan. `start()` démarre le traçage et prend l'instantané de
+    référence; `top()` compare un nouvel instantané à cette référence
+    (allocations par fichier:ligne). Pendant le traçage, la mémoire résidente
+    est relevée toutes les `interval` secondes.
+    """
+
+    def __init__(self, interval: float = 60.0):
+        self.interval = interval
+        self.rss_history = deque(maxlen=RSS_HISTORY)
+        self.baseline = None
+        self.started_at = None # Epoch
+        self._sampler = None
+
+    @property
+    def active(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def sample_rss(self) -> int:
+        rss = read_rss()
+        self.rss_history.append((wall_time(), rss))
+        return rss
+
+    def _snapshot(self):
+        # Les allocations de tracemalloc et du chargement de modules ne sont pas celles du bot
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+            tracemalloc.Filter(False, '<unknown>'),
+        ))
+
+    async def start(self, frames: int = 1):
+        if not self.active:
+            tracemalloc.start(frames)
+            self.started_at = wall_time()
+        await self.rebase()
+        if self._sampler is None or self._sampler.done():
+            self._sampler = asyncio.create_task(self._sample_while_active())
+
+    async def rebase(self):
+        """Nouvel instantané de référence pour les comparaisons suivantes."""
+        self.baseline = await asyncio.to_thread(self._snapshot)
+        self.sample_rss()
+
+    def stop(self):
+        tracemalloc.stop()
+        self.baseline = None
+        self.started_at = None
+        if self._sampler is not None:
+            self._sampler.cancel()
+            self._sampler = None
+
+    async def _sample_while_active(self):
+        while self.active:
+            self.sample_rss()
+            await asyncio.sleep(self.interval)
+
+    def traced(self) -> tuple:
+        """(mémoire tracée actuelle, pic) en octets."""
+        return tracemalloc.get_traced_memory() if self.active else (0, 0)
+
+    async def top(self, limit: int = 10) -> list:
+        """Plus fortes croissances depuis la référence, par fichier:ligne."""
+        if not self.active or self.baseline is None:
+            return []
+        snapshot = await asyncio.to_thread(self._snapshot)
+        stats = await asyncio.to_thread(snapshot.compare_to, self.baseline, 'lineno')
+        result = []
+        for stat in stats[:limit]:
+            frame = stat.traceback[0]
+            result.append({
+                'location': f"{frame.filename}:{frame.lineno}",
+                'size': stat.size,
+                'size_diff': stat.size_diff,
+                'count': stat.count,
+                'count_diff': stat.count_diff,
+            })
+        return result
+
+    def status(self) -> dict:
+        current, peak = self.traced()
+        return {
+            'active': self.active,
+            'started_at': self.started_at,
+            'traced_current': current,
+            'traced_peak': peak,
+            'rss_history': [[round(ts, 1), rss] for ts, rss in self.rss_history],
+        }
@@ -0,0 +1,120 @@
+"""
+Historique des prédictions terminées (CSV en ajout seul) et export XLSX/CSV
+"""
+import os
+import csv
+import tempfile
+import threading
+from collections import deque
+
+HISTORY_COLUMNS = [
+    'base_game', 'base_suit', 'target_game', 'predicted_suit',
+    'outcome', 'attempt', 'created_at', 'finished_at'
+]
+
+class PredictionHistory:
+    """
+    Journal des prédictions terminées. `record()` ne fait que mettre le résultat
+    en attente (aucune écriture sur la boucle asyncio); `flush()`, exécuté dans un
+    thread, l'ajoute en fin de fichier. Les exports relisent le fichier ligne par
+    ligne (mémoire constante).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+        self._writer = None
+        self._pending = deque() # Lignes en attente d'écriture
+        self._lock = threading.Lock() # Un seul flush() à la fois (tâche périodique, exports)
+
+    def _open(self):
+        is_new = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        self._file = open(self.path, 'a', encoding='utf-8', newline='')
+        self._writer = csv.writer(self._file)
+        if is_new:
+            self._writer.writerow(HISTORY_COLUMNS)
+
+    def record(self, base_game: int, base_suit: str, target_game: int, predicted_suit: str,
+               outcome: str, attempt: int, created_at: str, finished_at: str):
+        """Met une prédiction terminée en attente d'écriture (voir flush())."""
+        self._pending.append([base_game, base_suit, target_game, predicted_suit,
+                              outcome, attempt, created_at, finished_at])
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def flush(self) -> int:
+        """
+        Écrit les lignes en attente et retourne leur nombre.
+        Appel bloquant: à exécuter dans un thread (asyncio.to_thread).
+        """
+        with self._lock:
+            if not self._pending:
+                return 0
+            if self._writer is None:
+                self._open()
+            count = 0
+            while self._pending:
+                self._writer.writerow(self._pending.popleft())
+                count += 1
+            self._file.flush()
+            return count
+
+    def iter_rows(self, date_from: str = None, date_to: str = None):
+        """
+        Parcourt l'historique en flux, filtré sur la date de création
+        (bornes incluses, format AAAA-MM-JJ).
+        """
+        self.flush()
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'r', encoding='utf-8', newline='') as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if header != HISTORY_COLUMNS:
+                return
+            for row in reader:
+                if len(row) != len(HISTORY_COLUMNS):
+                    continue
+                day = row[6][:10]
+                if date_from and day < date_from:
+                    continue
+                if date_to and day > date_to:
+                    continue
+                yield row
+
+    def export(self, fmt: str = 'xlsx', date_from: str = None, date_to: str = None) -> tuple:
+        """
+        Écrit l'export dans un fichier temporaire et retourne (chemin, nombre de lignes).
+        Appel bloquant: à exécuter dans un thread (asyncio.to_thread).
+        """
+        suffix = '.csv' if fmt == 'csv' else '.xlsx'
+        fd, out_path = tempfile.mkstemp(prefix='predictions_', suffix=suffix)
+        os.close(fd)
+        count = 0
+        try:
+            if fmt == 'csv':
+                with open(out_path, 'w', encoding='utf-8', newline='') as out:
+                    writer = csv.writer(out)
+                    writer.writerow(HISTORY_COLUMNS)
+                    for row in self.iter_rows(date_from, date_to):
+                        writer.writerow(row)
+                        count += 1
+            else:
+                from openpyxl import Workbook
+                # Mode écriture seule: les lignes sont écrites au fil de l'eau, sans garder la feuille en mémoire
+                workbook = Workbook(write_only=True)
+                sheet = workbook.create_sheet('Prédictions')
+                sheet.append(HISTORY_COLUMNS)
+                for row in self.iter_rows(date_from, date_to):
+                    row[0] = int(row[0])
+                    row[2] = int(row[2])
+                    row[5] = int(row[5])
+                    sheet.append(row)
+                    count += 1
+                workbook.save(out_path)
+        except Exception:
+            os.remove(out_path)
+            raise
+        return out_path, count
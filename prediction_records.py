@@ -0,0 +1,117 @@
+"""
+Structures compactes pour les prédictions en cours et l'historique récent des résultats
+"""
+from array import array
+from time import monotonic, time as wall_time
+
+from config import ALL_SUITS
+
+# Couleurs codées en entiers (index dans ALL_SUITS): ♥=0, ♠=1, ♦=2, ♣=3
+SUIT_CODES = {suit: code for code, suit in enumerate(ALL_SUITS)}
+
+def suit_code(suit: str) -> int:
+    """Code entier d'une couleur normalisée (-1 si inconnue)."""
+    return SUIT_CODES.get(suit, -1)
+
+def suit_from_code(code: int) -> str:
+    """Couleur normalisée d'un code entier ('' si inconnu)."""
+    return ALL_SUITS[code] if 0 <= code < len(ALL_SUITS) else ''
+
+def monotonic_to_wall(timestamp: float) -> float:
+    """Convertit un horodatage monotonic() en temps epoch."""
+    return wall_time() - (monotonic() - timestamp)
+
+class Prediction:
+    """Prédiction en attente de vérification (une entrée de pending_predictions)."""
+
+    __slots__ = ('target_game', 'message_ids', 'suit', 'base_game', 'base_suit',
+                 'status', 'r_offset', 'verification_attempt', 'created_at')
+
+    def __init__(self, target_game: int, message_ids: dict, suit: int, base_game: int, base_suit: int,
+                 r_offset: int, status: str = '⏳', verification_attempt: int = 0, created_at: float = None):
+        self.target_game = target_game
+        self.message_ids = message_ids  # Canal de destination -> id du message publié
+        self.suit = suit  # Code entier (voir SUIT_CODES)
+        self.base_game = base_game
+        self.base_suit = base_suit  # Code entier
+        self.status = status
+        self.r_offset = r_offset
+        self.verification_attempt = verification_attempt
+        self.created_at = monotonic() if created_at is None else created_at
+
+    @property
+    def suit_symbol(self) -> str:
+        return suit_from_code(self.suit)
+
+    @property
+    def base_suit_symbol(self) -> str:
+        return suit_from_code(self.base_suit)
+
+class OutcomeRing:
+    """
+    Derniers résultats de prédiction dans des colonnes `array` de taille fixe.
+    Les plus anciens sont écrasés une fois la capacité atteinte.
+    """
+
+    WIN = 1
+    LOSS = 0
+
+    def __init__(self, capacity: int = 4096):
+        self.capacity = capacity
+        self.target_game = array('l', [0]) * capacity
+        self.base_game = array('l', [0]) * capacity
+        self.suit = array('b', [0]) * capacity
+        self.base_suit = array('b', [0]) * capacity
+        self.outcome = array('b', [0]) * capacity
+        self.attempt = array('b', [0]) * capacity
+        self.created_at = array('d', [0.0]) * capacity  # Epoch
+        self.finished_at = array('d', [0.0]) * capacity  # Epoch
+        self._next = 0
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def append(self, pred: Prediction, won: bool, attempt: int, finished_at: float = None):
+        """Enregistre le résultat d'une prédiction terminée (O(1), sans allocation)."""
+        i = self._next
+        self.target_game[i] = pred.target_game
+        self.base_game[i] = pred.base_game
+        self.suit[i] = pred.suit
+        self.base_suit[i] = pred.base_suit
+        self.outcome[i] = self.WIN if won else self.LOSS
+        self.attempt[i] = attempt
+        self.created_at[i] = monotonic_to_wall(pred.created_at)
+        self.finished_at[i] = wall_time() if finished_at is None else finished_at
+        self._next = (i + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def _indexes(self, limit: int = None):
+        """Index des entrées, de la plus récente à la plus ancienne."""
+        count = self._size if limit is None else min(limit, self._size)
+        for k in range(1, count + 1):
+            yield (self._next - k) % self.capacity
+
+    def recent(self, limit: int = None):
+        """Derniers résultats (plus récent d'abord) sous forme de dictionnaires."""
+        for i in self._indexes(limit):
+            yield {
+                'target_game': self.target_game[i],
+                'base_game': self.base_game[i],
+                'suit': suit_from_code(self.suit[i]),
+                'base_suit': suit_from_code(self.base_suit[i]),
+                'won': self.outcome[i] == self.WIN,
+                'attempt': self.attempt[i],
+                'created_at': self.created_at[i],
+                'finished_at': self.finished_at[i],
+            }
+
+    def summary(self, limit: int = None) -> tuple:
+        """(victoires, défaites) sur les `limit` derniers résultats."""
+        wins = sum(self.outcome[i] for i in self._indexes(limit))
+        total = self._size if limit is None else min(limit, self._size)
+        return wins, total - wins
+
+    def clear(self):
+        self._next = 0
+        self._size = 0
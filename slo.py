@@ -0,0 +1,155 @@
+"""
+Objectifs de latence (SLO) évalués sur une fenêtre glissante, avec l'étape la plus lente
+"""
+from collections import deque
+from time import monotonic
+
+from loop_monitor import percentile
+
+# Étapes mesurées pour chaque envoi/édition, dans l'ordre du parcours
+STAGES = ('processing', 'queue', 'telegram')
+STAGE_LABELS = {
+    'processing': "traitement (réception -> mise en file)",
+    'queue': "file d'envoi (attente, essais, FloodWait)",
+    'telegram': "appel Telegram",
+}
+
+class SloObjective:
+    """
+    Un objectif (« 95% des mesures sous `threshold_ms` ») et ses mesures récentes.
+    Les compteurs (total, hors objectif, somme par étape des mesures hors objectif)
+    sont mis à jour à l'ajout et au retrait: l'évaluation ne reparcourt pas la fenêtre.
+    """
+
+    def __init__(self, name: str, label: str, threshold_ms: float):
+        self.name = name
+        self.label = label
+        self.threshold_ms = threshold_ms
+        self.samples = deque() # (monotonic(), total_ms, durées par étape en ms)
+        self.breaches = 0
+        self.stage_totals = [0.0] * len(STAGES) # Mesures hors objectif uniquement
+        self.last_alert_at = None
+
+    def add(self, now: float, total_ms: float, stages: tuple):
+        self.samples.append((now, total_ms, stages))
+        if total_ms > self.threshold_ms:
+            self.breaches += 1
+            for i, value in enumerate(stages):
+                self.stage_totals[i] += value
+
+    def prune(self, cutoff: float):
+        """Retire les mesures plus anciennes que `cutoff`."""
+        samples = self.samples
+        while samples and samples[0][0] < cutoff:
+            _, total_ms, stages = samples.popleft()
+            if total_ms > self.threshold_ms:
+                self.breaches -= 1
+                for i, value in enumerate(stages):
+                    self.stage_totals[i] -= value
+
+    @property
+    def compliance(self) -> float:
+        return 1 - self.breaches / len(self.samples) if self.samples else 1.0
+
+    def worst_stage(self):
+        """(étape, moyenne en ms) de l'étape la plus lente parmi les mesures hors objectif."""
+        if not self.breaches:
+            return None, 0.0
+        i = max(range(len(STAGES)), key=lambda i: self.stage_totals[i])
+        return STAGES[i], self.stage_totals[i] / self.breaches
+
+    def snapshot(self) -> dict:
+        values = sorted(total for _, total, _ in self.samples)
+        stage, stage_ms = self.worst_stage()
+        return {
+            'threshold_ms': self.threshold_ms,
+            'samples': len(values),
+            'compliance': round(self.compliance, 4),
+            'p50_ms': round(percentile(values, 0.50), 1),
+            'p95_ms': round(percentile(values, 0.95), 1),
+            'max_ms': round(values[-1], 1) if values else 0.0,
+            'worst_stage': stage,
+            'worst_stage_ms': round(stage_ms, 1),
+            'stage_mean_ms': {
+                name: round(total / self.breaches, 1) for name, total in zip(STAGES, self.stage_totals)
+            } if self.breaches else {},
+        }
+
+class SloWatchdog:
+    """
+    Objectifs de latence d'un bot: publication d'une prédiction après le message
+    source et édition du statut après la finalisation. `due_alerts()` retourne
+    les objectifs dépassés dont la dernière alerte date de plus de `alert_interval`.
+    """
+
+    def __init__(self, prediction_ms: float, status_ms: float, target: float = 0.95,
+                 window: float = 600.0, alert_interval: float = 1800.0, min_samples: int = 5):
+        self.target = target
+        self.window = window
+        self.alert_interval = alert_interval
+        self.min_samples = min_samples
+        self.objectives = {}
+        if prediction_ms > 0:
+            self.objectives['prediction'] = SloObjective(
+                'prediction', f"prédiction publiée ≤ {prediction_ms:g} ms après le message source", prediction_ms
+            )
+        if status_ms > 0:
+            self.objectives['status'] = SloObjective(
+                'status', f"statut édité ≤ {status_ms:g} ms après la finalisation", status_ms
+            )
+
+    def record(self, name: str, received_at: float, submitted_at: float, called_at: float, now: float = None):
+        """Mesure d'un envoi réussi: réception du message source, mise en file, dernier appel, fin."""
+        objective = self.objectives.get(name)
+        if objective is None:
+            return
+        now = monotonic() if now is None else now
+        stages = (
+            (submitted_at - received_at) * 1000,
+            (called_at - submitted_at) * 1000,
+            (now - called_at) * 1000,
+        )
+        objective.prune(now - self.window)
+        objective.add(now, (now - received_at) * 1000, stages)
+
+    def timed(self, name: str, received_at: float, call, on_success=None):
+        """
+        Enveloppe une opération de Destination.submit pour la mesurer. Sans
+        heure de réception (messages récupérés après coup) ou sans objectif, rien n'est mesuré.
+        """
+        if received_at is None or name not in self.objectives:
+            return call, on_success
+        submitted_at = monotonic()
+        called_at = [submitted_at] # Début du dernier essai
+
+        def timed_call():
+            called_at[0] = monotonic()
+            return call()
+
+        def timed_success(result):
+            self.record(name, received_at, submitted_at, called_at[0])
+            if on_success is not None:
+                on_success(result)
+        return timed_call, timed_success
+
+    def due_alerts(self, now: float = None) -> list:
+        """Objectifs sous la cible (avec assez de mesures) et hors délai d'alerte; marque l'alerte."""
+        now = monotonic() if now is None else now
+        due = []
+        for objective in self.objectives.values():
+            objective.prune(now - self.window)
+            if len(objective.samples) < self.min_samples or objective.compliance >= self.target:
+                continue
+            if objective.last_alert_at is not None and now - objective.last_alert_at < self.alert_interval:
+                continue
+            objective.last_alert_at = now
+            due.append(objective)
+        return due
+
+    def snapshot(self, now: float = None) -> dict:
+        now = monotonic() if now is None else now
+        result = {}
+        for name, objective in self.objectives.items():
+            objective.prune(now - self.window)
+            result[name] = objective.snapshot()
+        return result
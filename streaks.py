@@ -0,0 +1,86 @@
+"""
+Séries de victoires/défaites et distribution des essais gagnants, mises à jour à chaque résultat
+"""
+from prediction_records import suit_code, suit_from_code
+
+MAX_ATTEMPT = 10 # ✅0️⃣ à ✅🔟
+
+class StreakStats:
+    """Compteurs de taille constante pour un segment (global, une couleur ou une parité)."""
+
+    __slots__ = ('wins', 'losses', 'current', 'longest_win', 'longest_loss', 'attempts')
+
+    def __init__(self):
+        self.wins = 0
+        self.losses = 0
+        self.current = 0 # > 0: victoires consécutives, < 0: défaites consécutives
+        self.longest_win = 0
+        self.longest_loss = 0
+        self.attempts = [0] * (MAX_ATTEMPT + 1) # Victoires par index d'essai (N+0 ... N+10)
+
+    def record(self, won: bool, attempt: int):
+        if won:
+            self.wins += 1
+            self.current = self.current + 1 if self.current > 0 else 1
+            self.longest_win = max(self.longest_win, self.current)
+            self.attempts[min(max(attempt, 0), MAX_ATTEMPT)] += 1
+        else:
+            self.losses += 1
+            self.current = self.current - 1 if self.current < 0 else -1
+            self.longest_loss = max(self.longest_loss, -self.current)
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.wins + self.losses
+        return self.wins / total if total else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            'wins': self.wins,
+            'losses': self.losses,
+            'hit_rate': round(self.hit_rate, 4),
+            'current': self.current,
+            'longest_win': self.longest_win,
+            'longest_loss': self.longest_loss,
+            'attempts': list(self.attempts),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        stats = cls()
+        for key in ('wins', 'losses', 'current', 'longest_win', 'longest_loss'):
+            setattr(stats, key, data.get(key, 0))
+        attempts = data.get('attempts', [])
+        stats.attempts = (list(attempts) + [0] * (MAX_ATTEMPT + 1))[:MAX_ATTEMPT + 1]
+        return stats
+
+class StreakTracker:
+    """Séries globales, par couleur prédite et par parité du jeu source."""
+
+    def __init__(self):
+        self.overall = StreakStats()
+        self.by_suit = {}  # Code couleur -> StreakStats
+        self.by_parity = {'pair': StreakStats(), 'impair': StreakStats()}
+
+    def record(self, suit: int, base_game: int, won: bool, attempt: int):
+        """Intègre un résultat en O(1)."""
+        self.overall.record(won, attempt)
+        stats = self.by_suit.get(suit)
+        if stats is None:
+            stats = self.by_suit[suit] = StreakStats()
+        stats.record(won, attempt)
+        self.by_parity['impair' if base_game % 2 else 'pair'].record(won, attempt)
+
+    def to_dict(self) -> dict:
+        return {
+            'overall': self.overall.to_dict(),
+            'by_suit': {suit_from_code(code): stats.to_dict() for code, stats in sorted(self.by_suit.items())},
+            'by_parity': {parity: stats.to_dict() for parity, stats in self.by_parity.items()},
+        }
+
+    def load_dict(self, data: dict):
+        """Restaure l'état produit par to_dict() (passation entre processus)."""
+        self.overall = StreakStats.from_dict(data.get('overall', {}))
+        self.by_suit = {suit_code(suit): StreakStats.from_dict(stats) for suit, stats in data.get('by_suit', {}).items()}
+        for parity in self.by_parity:
+            self.by_parity[parity] = StreakStats.from_dict(data.get('by_parity', {}).get(parity, {}))
@@ -0,0 +1,135 @@
+"""
+Mode multi-bots: plusieurs tokens dans un même processus, chacun avec son
+canal de prédiction, son admin, sa configuration et son état
+"""
+import json
+import os
+import re
+
+from config import (
+    A_OFFSET_DEFAULT, R_OFFSET_DEFAULT, normalize_channel_id, FREQUENCY_WINDOW, FREQUENCY_MIN_SAMPLES,
+    SLO_PREDICTION_MS, SLO_STATUS_MS, SLO_TARGET, SLO_WINDOW_SECONDS, SLO_ALERT_INTERVAL, SLO_MIN_SAMPLES,
+    TUNING_WINDOW, TUNING_MIN_SAMPLES, TUNING_R_PENALTY, TUNING_MARGIN, STATE_HORIZON_GAMES
+)
+from daily_report import DailyStats
+from eviction import RecentKeys
+from fanout import Destination
+from frequency_model import FrequencyModel
+from prediction_history import PredictionHistory
+from prediction_records import OutcomeRing
+from slo import SloWatchdog
+from streaks import StreakTracker
+from tuning import OffsetTuner
+
+PREDICTORS = ('parity', 'frequency') # Règle de parité (défaut) ou modèle de fréquences
+PRIMARY_TENANT = 'main' # Bot configuré par les variables d'environnement (BOT_TOKEN, ADMIN_ID, ...)
+TENANT_NAME_PATTERN = re.compile(r'^[A-Za-z0-9_-]{1,32}$')
+
+class Tenant:
+    """
+    Un bot (token) et tout son état: offsets, modes /time et /ec, prédictions
+    en cours, dédoublonnage, destinations et statistiques. Les messages source
+    sont analysés une seule fois puis passés à chaque Tenant.
+    """
+
+    def __init__(self, name: str, bot_token: str, admin_id: int, prediction_channel_ids: list,
+                 config_file: str, history_file: str, session_file: str,
+                 max_retries: int = 3, retry_delay: float = 1.0):
+        self.name = name
+        self.bot_token = bot_token
+        self.admin_id = admin_id
+        self.config_file = config_file
+        self.session_file = session_file
+        self.client = None # TelegramClient, créé au démarrage
+
+        # Configuration persistante (config_file) et modes spéciaux
+        self.config_mtime = None # mtime_ns du fichier au dernier chargement/sauvegarde par le bot
+        self.a_offset = A_OFFSET_DEFAULT
+        self.r_offset = R_OFFSET_DEFAULT
+        self.prediction_block_until = None
+        self.transfer_enabled = True
+        self.ec_active = False
+        self.ec_gaps = []  # Liste des écarts [3, 4, 5, ...]
+        self.ec_gap_index = 0
+        self.ec_last_source_game = 0 # Le numéro de jeu source (N) qui a déclenché la dernière prédiction
+        self.ec_first_trigger_done = False # Vrai après la première prédiction P1
+        self.predictor = PREDICTORS[0] # Choisi par /model
+
+        # Prédictions et dédoublonnage
+        self.pending_predictions = {} # Jeu cible -> Prediction
+        self.processed_predictions = RecentKeys() # Jeux source déjà utilisés pour une prédiction
+        self.processed_verifications = RecentKeys() # Messages finalisés déjà vérifiés
+        self.frequency_model = FrequencyModel(FREQUENCY_WINDOW, FREQUENCY_MIN_SAMPLES) # Toujours alimenté
+        self.tuner = OffsetTuner( # /tune (alimenté même inactif)
+            TUNING_WINDOW, TUNING_MIN_SAMPLES, TUNING_R_PENALTY, TUNING_MARGIN, STATE_HORIZON_GAMES
+        )
+        self.current_game_number = 0
+
+        # Destinations: chacune a sa file d'envoi/édition et ses essais
+        self.destinations = {
+            chat_id: Destination(chat_id, max_retries, retry_delay) for chat_id in prediction_channel_ids
+        }
+        self.prediction_channel_ok = False # Au moins une destination accessible
+
+        self.outcome_history = OutcomeRing(4096) # Derniers résultats (lu par /status, analyses, exports)
+        self.streak_tracker = StreakTracker() # Séries et distribution des essais (/streaks)
+        self.prediction_history = PredictionHistory(history_file) # Prédictions terminées (/export)
+        self.daily_stats = DailyStats() # Compteurs de la journée en cours (rapport de 00h59 WAT)
+        self.slo = SloWatchdog( # Latences source -> publication et finalisation -> édition
+            SLO_PREDICTION_MS, SLO_STATUS_MS, SLO_TARGET, SLO_WINDOW_SECONDS, SLO_ALERT_INTERVAL, SLO_MIN_SAMPLES
+        )
+
+    def __repr__(self):
+        return f"Tenant({self.name!r})"
+
+    def is_admin(self, sender_id) -> bool:
+        return bool(self.admin_id) and sender_id == self.admin_id
+
+    def outbound_depth(self) -> int:
+        """Envois/éditions Telegram en attente ou en cours, toutes destinations confondues."""
+        return sum(dest.depth for dest in self.destinations.values())
+
+def load_tenant_specs(path: str) -> list:
+    """
+    Lit les bots supplémentaires depuis un fichier JSON:
+    `[{"name": "vip", "bot_token": "...", "admin_id": 123, "prediction_channel_ids": [-100...]}]`.
+    Retourne une liste de dictionnaires validés (vide si le fichier n'existe pas).
+    Lève ValueError si le fichier est invalide.
+    """
+    if not path or not os.path.exists(path):
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        specs = json.load(f)
+    if not isinstance(specs, list):
+        raise ValueError("la racine doit être une liste de bots")
+
+    names = {PRIMARY_TENANT}
+    validated = []
+    for spec in specs:
+        name = spec.get('name', '')
+        if not isinstance(name, str) or not TENANT_NAME_PATTERN.match(name):
+            raise ValueError(f"nom de bot invalide: {name!r}")
+        if name in names:
+            raise ValueError(f"nom de bot en double: {name!r}")
+        names.add(name)
+
+        bot_token = spec.get('bot_token') or ''
+        if not bot_token:
+            raise ValueError(f"{name}: bot_token manquant")
+        admin_id = int(spec.get('admin_id') or 0)
+
+        channels = spec.get('prediction_channel_ids', [])
+        if isinstance(channels, str):
+            channels = channels.split(',')
+        channel_ids = [normalize_channel_id(str(c)) for c in channels]
+        channel_ids = list(dict.fromkeys(c for c in channel_ids if c))
+        if not channel_ids:
+            raise ValueError(f"{name}: aucun canal de prédiction valide")
+
+        validated.append({
+            'name': name,
+            'bot_token': bot_token,
+            'admin_id': admin_id,
+            'prediction_channel_ids': channel_ids,
+        })
+    return validated
@@ -0,0 +1,17 @@
+"""
+Les modules du bot sont à la racine du dépôt (pas de paquet). Les tests
+`async def` s'exécutent chacun dans une boucle neuve (asyncio.run).
+"""
+import os
+import sys
+import asyncio
+import inspect
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def pytest_pyfunc_call(pyfuncitem):
+    if not inspect.iscoroutinefunction(pyfuncitem.obj):
+        return None
+    args = {name: pyfuncitem.funcargs[name] for name in pyfuncitem._fixtureinfo.argnames}
+    asyncio.run(pyfuncitem.obj(**args))
+    return True
@@ -0,0 +1,53 @@
+import asyncio
+
+from backfill import GapBackfiller
+
+class Message:
+    def __init__(self, id: int):
+        self.id = id
+
+async def run(backfiller: GapBackfiller, first_id: int, last_id: int):
+    backfiller.request(first_id, last_id)
+    while backfiller._workers:
+        await asyncio.sleep(0.001)
+
+async def ignore(message):
+    pass
+
+async def test_skips_messages_seen_live():
+    fetched, handled = [], []
+
+    async def fetch(ids):
+        fetched.append(list(ids))
+        return [Message(i) for i in ids]
+
+    async def handle(message):
+        handled.append(message.id)
+
+    backfiller = GapBackfiller(fetch, handle)
+    backfiller.mark_seen(12)
+    await run(backfiller, 10, 14)
+    assert fetched == [[10, 11, 13, 14]]
+    assert handled == [10, 11, 13, 14]
+
+async def test_failed_batch_is_retried():
+    calls = []
+
+    async def flaky(ids):
+        calls.append(list(ids))
+        if len(calls) == 1:
+            raise ConnectionError("coupure")
+        return [Message(i) for i in ids]
+
+    backfiller = GapBackfiller(flaky, ignore, max_retries=2, retry_delay=0)
+    await run(backfiller, 1, 3)
+    assert calls == [[1, 2, 3], [1, 2, 3]]
+    assert backfiller.fetched == 3 and backfiller.abandoned == 0
+
+async def test_batch_is_abandoned_after_max_retries():
+    async def always_down(ids):
+        raise ConnectionError("coupure")
+
+    backfiller = GapBackfiller(always_down, ignore, max_retries=2, retry_delay=0)
+    await run(backfiller, 1, 3)
+    assert backfiller.abandoned == 3 and backfiller.pending == 0
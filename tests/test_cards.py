@@ -0,0 +1,48 @@
+from cards import (
+    CARD_SUIT, CARD_VALUE, HAND_CACHE_SIZE, MAX_HAND_CARDS, card_code, decode_hand, format_hand,
+    _hand_cache, hand_mask, hand_points, hand_total, is_natural,
+)
+from prediction_records import suit_code
+
+def test_decodes_values_and_suits_in_message_order():
+    hand = decode_hand("K♠️9♥️")
+    assert [CARD_VALUE[c] for c in hand] == [13, 9]
+    assert [CARD_SUIT[c] for c in hand] == [suit_code('♠'), suit_code('♥')]
+
+def test_every_spelling_of_a_card_gives_the_same_code():
+    expected = card_code(10, suit_code('♥'))
+    for text in ("10♥", "T♥", "t♥", "10❤️", "10❤", "10♥️"):
+        assert decode_hand(text) == bytes([expected]), text
+
+def test_card_without_value_keeps_its_suit():
+    hand = decode_hand("♦️")
+    assert CARD_VALUE[hand[0]] == 0
+    assert CARD_SUIT[hand[0]] == suit_code('♦')
+
+def test_baccarat_points_and_totals():
+    assert hand_points(decode_hand("K♠9♥")) == 9
+    assert hand_total(decode_hand("7♠8♥")) == 5
+    assert hand_total(decode_hand("A♠2♥3♦")) == 6
+    assert hand_total(decode_hand("10♠J♥Q♦")) == 0
+
+def test_natural_needs_eight_or_nine_with_two_cards():
+    assert is_natural(decode_hand("K♠8♥"))
+    assert is_natural(decode_hand("4♠5♥"))
+    assert not is_natural(decode_hand("4♠4♥A♦"))
+    assert not is_natural(decode_hand("2♠5♥"))
+
+def test_suit_mask_and_formatting():
+    hand = decode_hand("K♠️9♥️2♠️")
+    assert hand_mask(hand) == (1 << suit_code('♠')) | (1 << suit_code('♥'))
+    assert format_hand(hand) == "K♠9♥2♠"
+    assert format_hand(hand, {'♠': '♠️'}) == "K♠️9♥2♠️"
+
+def test_malformed_groups_are_truncated_and_empty_groups_decode_to_nothing():
+    assert len(decode_hand("A♠" * (MAX_HAND_CARDS + 3))) == MAX_HAND_CARDS
+    assert decode_hand("") == b''
+    assert decode_hand("sans carte") == b''
+
+def test_cache_is_bounded():
+    for number in range(HAND_CACHE_SIZE + 10):
+        decode_hand(f"#{number} A♠")
+    assert len(_hand_cache) <= HAND_CACHE_SIZE
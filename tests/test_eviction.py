@@ -0,0 +1,45 @@
+from eviction import RecentKeys
+
+def test_evicts_entries_older_than_the_horizon_in_insertion_order():
+    keys = RecentKeys()
+    for game in range(1, 6):
+        keys.add(f"{game}_msg", game, now=float(game))
+    removed = keys.evict(current_game=5, max_age=2.5, max_games=100, now=6.0)
+    assert removed == 3
+    assert list(keys) == ['4_msg', '5_msg']
+
+def test_evicts_entries_too_far_from_the_current_game():
+    keys = RecentKeys()
+    keys.add('1000_a', 1000, now=0.0)
+    keys.add('1001_b', 1001, now=0.0)
+    keys.add('2_c', 2, now=0.0)
+    # Retour à #1 d'une nouvelle journée: les jeux de la veille sont loin du jeu courant
+    assert keys.evict(current_game=3, max_age=3600, max_games=200, now=1.0) == 2
+    assert list(keys) == ['2_c']
+
+def test_eviction_stops_at_the_first_entry_within_the_horizon():
+    keys = RecentKeys()
+    keys.add('10_a', 10, now=100.0)
+    keys.add('500_b', 500, now=0.0) # Plus vieux, mais derrière une entrée récente
+    assert keys.evict(current_game=10, max_age=50, max_games=200, now=120.0) == 0
+    assert len(keys) == 2
+
+def test_add_keeps_the_first_insertion():
+    keys = RecentKeys()
+    keys.add('7_a', 7, now=0.0)
+    keys.add('7_a', 7, now=100.0)
+    assert keys.evict(current_game=7, max_age=50, max_games=200, now=60.0) == 1
+    assert '7_a' not in keys
+
+def test_round_trip_and_legacy_format():
+    keys = RecentKeys()
+    keys.add('12_x', 12)
+    restored = RecentKeys()
+    restored.load(keys.to_list())
+    assert list(restored) == ['12_x']
+
+    legacy = RecentKeys()
+    legacy.load(['sans_numero', '40_y'])
+    assert list(legacy) == ['sans_numero', '40_y']
+    # L'ancien format ne donne que la clé: le jeu est déduit du préfixe numérique (0 sinon)
+    assert legacy.evict(current_game=40, max_age=3600, max_games=10) == 1
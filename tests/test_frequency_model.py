@@ -0,0 +1,54 @@
+from frequency_model import FrequencyModel, context_index
+
+HEARTS, SPADES, DIAMONDS = 0, 1, 2
+
+def feed(model: FrequencyModel, first_game: int, count: int, suit: int, value: int, mask: int, lags):
+    """Jeux source `first_game`... de même contexte, dont chaque jeu finalisé a le 1er groupe `mask`."""
+    for game in range(first_game, first_game + count):
+        model.observe_context(game, suit, value)
+        model.observe_result(game, mask, lags)
+
+def test_context_index_is_unique_per_suit_parity_and_value():
+    indexes = {context_index(s, g, v) for s in range(4) for g in range(2) for v in range(14)}
+    assert len(indexes) == 4 * 2 * 14
+    assert context_index(-1, 1, 5) == -1
+
+def test_predicts_the_most_frequent_suit_once_enough_samples():
+    model = FrequencyModel(window=100, min_samples=5)
+    assert model.predict(HEARTS, 2, 5, 1) == -1
+    feed(model, 1, 40, HEARTS, 5, 1 << DIAMONDS, lags=(1,))
+    assert model.predict(HEARTS, 2, 5, 1) == DIAMONDS
+    assert model.predict(HEARTS, 3, 5, 1) == DIAMONDS
+
+def test_window_drops_the_oldest_observations():
+    model = FrequencyModel(window=10, min_samples=1)
+    feed(model, 1, 10, SPADES, 3, 1 << HEARTS, lags=(1,))
+    feed(model, 11, 10, SPADES, 3, 1 << DIAMONDS, lags=(1,))
+    assert model.samples(1) == 10
+    for parity in (0, 1):
+        total, rates = model.marginal_rates(SPADES, parity, 1)
+        assert total == 5 # Jeux source pairs / impairs de la fenêtre
+        assert rates[HEARTS] == 0.0 and rates[DIAMONDS] == 1.0
+
+def test_repeated_edits_of_a_game_are_counted_once():
+    model = FrequencyModel(window=100, min_samples=1)
+    model.observe_context(10, HEARTS, 2)
+    for _ in range(3):
+        model.observe_result(11, 1 << SPADES, (1,))
+    assert model.samples(1) == 1
+
+def test_changing_a_does_not_reset_other_offsets():
+    model = FrequencyModel(window=100, min_samples=1)
+    feed(model, 1, 30, HEARTS, 5, 1 << SPADES, lags=(1, 2))
+    before = model.samples(1)
+    feed(model, 31, 10, HEARTS, 5, 1 << SPADES, lags=(2,)) # A passe à 2 (ex: /tune auto)
+    assert model.samples(1) == before
+    assert model.samples(2) > before
+    assert model.lags == [1, 2]
+
+def test_round_trip():
+    model = FrequencyModel(window=50, min_samples=1)
+    feed(model, 1, 30, DIAMONDS, 9, 1 << HEARTS, lags=(1, 3))
+    restored = FrequencyModel(window=50, min_samples=1)
+    restored.load_dict(model.to_dict())
+    assert restored.to_dict() == model.to_dict()
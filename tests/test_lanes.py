@@ -0,0 +1,50 @@
+import asyncio
+
+from lanes import ControlLane, SourceLane
+
+async def drain(lane: SourceLane):
+    while lane.depth:
+        await asyncio.sleep(0.001)
+    await asyncio.sleep(0.001)
+
+def recording_lane(handled: list, **kwargs) -> SourceLane:
+    async def handle(item):
+        handled.append(item)
+    return SourceLane(handle, **kwargs)
+
+async def test_source_lane_processes_in_order_and_coalesces_edits():
+    handled = []
+    lane = recording_lane(handled)
+    lane.submit('new-1')
+    lane.submit('edit-2a', coalesce_key=2)
+    lane.submit('edit-2b', coalesce_key=2) # Remplace l'édition encore en file
+    lane.submit('new-3')
+    await drain(lane)
+    assert handled == ['new-1', 'edit-2b', 'new-3']
+    assert lane.coalesced == 1
+
+async def test_source_lane_sheds_the_oldest_events_beyond_capacity():
+    handled = []
+    lane = recording_lane(handled, capacity=2)
+    for item in range(5):
+        lane.submit(item)
+    await drain(lane)
+    assert handled == [3, 4]
+    assert lane.shed == 3
+
+async def test_commands_run_before_the_next_source_event():
+    order = []
+    control = ControlLane(max_hold=1.0)
+    lane = recording_lane(order, control=control)
+
+    async def command():
+        await asyncio.sleep(0.02)
+        order.append('command')
+
+    command_task = asyncio.create_task(control.run(command()))
+    await asyncio.sleep(0) # La commande a démarré
+    lane.submit('event')
+    await command_task
+    await drain(lane)
+    assert order == ['command', 'event']
+    assert control.depth == 0
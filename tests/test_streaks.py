@@ -0,0 +1,42 @@
+from prediction_records import suit_code
+from streaks import MAX_ATTEMPT, StreakStats, StreakTracker
+
+def test_streak_stats_counts_current_and_longest_runs():
+    stats = StreakStats()
+    for won in (True, True, True, False, False, True):
+        stats.record(won, 0)
+    assert (stats.wins, stats.losses) == (4, 2)
+    assert stats.current == 1
+    assert stats.longest_win == 3
+    assert stats.longest_loss == 2
+    assert stats.hit_rate == 4 / 6
+
+def test_attempts_are_clamped_to_the_emoji_range():
+    stats = StreakStats()
+    stats.record(True, 0)
+    stats.record(True, 2)
+    stats.record(True, 99)
+    stats.record(False, 3) # Une défaite ne compte pas d'essai gagnant
+    assert stats.attempts[0] == 1
+    assert stats.attempts[2] == 1
+    assert stats.attempts[MAX_ATTEMPT] == 1
+    assert sum(stats.attempts) == 3
+
+def test_tracker_segments_by_suit_and_parity():
+    tracker = StreakTracker()
+    hearts, spades = suit_code('♥'), suit_code('♠')
+    tracker.record(hearts, 10, True, 0)
+    tracker.record(hearts, 11, False, 2)
+    tracker.record(spades, 13, True, 1)
+    assert (tracker.overall.wins, tracker.overall.losses) == (2, 1)
+    assert (tracker.by_suit[hearts].wins, tracker.by_suit[hearts].losses) == (1, 1)
+    assert tracker.by_parity['pair'].wins == 1
+    assert (tracker.by_parity['impair'].wins, tracker.by_parity['impair'].losses) == (1, 1)
+
+def test_tracker_round_trip():
+    tracker = StreakTracker()
+    for game in range(20):
+        tracker.record(game % 4, game, game % 3 != 0, game % 3)
+    restored = StreakTracker()
+    restored.load_dict(tracker.to_dict())
+    assert restored.to_dict() == tracker.to_dict()
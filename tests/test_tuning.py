@@ -0,0 +1,90 @@
+import json
+
+import pytest
+
+from tuning import GAME_MEMORY, OffsetTuner, validate_settings
+
+HEARTS, SPADES = 0, 1
+
+def play(tuner: OffsetTuner, games, suit: int = HEARTS, mask_of=lambda game: 1 << HEARTS):
+    """Chaque jeu prédit `suit` et son 1er groupe vaut `mask_of(jeu)`."""
+    for game in games:
+        tuner.observe_prediction(game, suit)
+        tuner.observe_result(game, mask_of(game))
+
+def test_validate_settings():
+    assert validate_settings({'mode': 'auto', 'a_min': 1, 'a_max': 2, 'r_min': 0, 'r_max': 1})['mode'] == 'auto'
+    for bad in ({'mode': 'x'}, {'a_min': 0}, {'a_min': 3, 'a_max': 2}, {'r_max': 11}, {'a_max': True}, []):
+        with pytest.raises(ValueError):
+            validate_settings(bad)
+
+def test_rates_come_from_the_sliding_window():
+    tuner = OffsetTuner(window=20, min_samples=1)
+    tuner.set_bounds(1, 2, 0, 1)
+    # Couleur prédite présente un jeu sur deux (jeux pairs)
+    play(tuner, range(1, 200), mask_of=lambda game: 1 << HEARTS if game % 2 == 0 else 1 << SPADES)
+    assert tuner.samples() == 20
+    assert tuner.rate(1, 0) == pytest.approx(0.5)
+    assert tuner.rate(1, 1) == 1.0 # Le jeu suivant rattrape toujours
+    assert tuner.rate(2, 5) is None # Hors bornes
+
+def test_recommends_only_beyond_the_margin_and_after_min_samples():
+    tuner = OffsetTuner(window=50, min_samples=30, r_penalty=0.05, margin=0.02)
+    tuner.set_bounds(1, 3, 0, 2)
+    # Gagne seulement sur les jeux multiples de 3: A=3 avec R=0 est parfait pour les jeux source multiples de 3
+    play(tuner, range(1, 20), mask_of=lambda game: 1 << HEARTS if game % 3 == 0 else 1 << SPADES)
+    assert tuner.recommend(1, 0) is None # Pas encore assez de jeux
+    play(tuner, range(20, 200), mask_of=lambda game: 1 << HEARTS if game % 3 == 0 else 1 << SPADES)
+    best = tuner.recommend(1, 0)
+    assert best is not None and best[:2] != (1, 0)
+    assert tuner.recommend(*best[:2]) is None # Déjà au meilleur réglage
+
+def test_late_games_do_not_wipe_the_window():
+    tuner = OffsetTuner(window=50, min_samples=1, rollover_games=200)
+    tuner.set_bounds(1, 1, 0, 1)
+    play(tuner, range(400, 480))
+    samples, masks = tuner.samples(), len(tuner._masks)
+    tuner.observe_result(470, 1 << HEARTS) # Jeu récupéré / finalisé dans le désordre
+    tuner.observe_result(479 - GAME_MEMORY, 1 << HEARTS) # Trop ancien: ignoré
+    assert tuner.samples() == samples
+    assert len(tuner._masks) == masks
+    assert tuner._last_game == 479
+
+def test_large_backwards_jump_is_a_new_day():
+    tuner = OffsetTuner(window=50, min_samples=1, rollover_games=200)
+    tuner.set_bounds(1, 1, 0, 0)
+    play(tuner, range(900, 960))
+    samples = tuner.samples()
+    play(tuner, range(1, 10))
+    assert tuner._last_game == 9
+    assert set(tuner._masks) == set(range(1, 10))
+    # Les compteurs de la fenêtre sont gardés; seuls les jeux de la veille sont oubliés
+    assert tuner.samples() == min(50, samples + 8)
+
+def test_round_trip_keeps_the_rings():
+    tuner = OffsetTuner(window=30, min_samples=1)
+    tuner.set_bounds(1, 2, 0, 2)
+    play(tuner, range(1, 80), mask_of=lambda game: 1 << (game % 4))
+    restored = OffsetTuner(window=30, min_samples=1)
+    restored.set_bounds(1, 2, 0, 2)
+    restored.load_dict(tuner.to_dict())
+    assert restored.scores() == tuner.scores()
+
+    other_bounds = OffsetTuner(window=30, min_samples=1)
+    other_bounds.load_dict(tuner.to_dict()) # Bornes par défaut (1-3, 0-3): observations ignorées
+    assert other_bounds.samples() == 0
+
+def test_each_offset_is_scored_with_its_own_suit():
+    tuner = OffsetTuner(window=20, min_samples=1)
+    tuner.set_bounds(1, 2, 0, 0)
+    for game in range(1, 60):
+        # A=1 aurait prédit cœur (toujours sorti), A=2 pique (jamais sorti)
+        tuner.observe_prediction(game, {1: HEARTS, 2: SPADES})
+        tuner.observe_result(game, 1 << HEARTS)
+    assert tuner.rate(1, 0) == 1.0
+    assert tuner.rate(2, 0) == 0.0
+
+    restored = OffsetTuner(window=20, min_samples=1)
+    restored.set_bounds(1, 2, 0, 0)
+    restored.load_dict(json.loads(json.dumps(tuner.to_dict())))
+    assert restored._suits == tuner._suits
@@ -0,0 +1,237 @@
+"""
+Réglage automatique de A_OFFSET et R_OFFSET (/tune): chaque combinaison comprise
+dans les bornes de l'admin est évaluée sur les derniers jeux finalisés
+"""
+from array import array
+from time import monotonic, time as wall_time
+
+TUNING_MODES = ('off', 'propose', 'auto')
+A_LIMIT = 20 # Bornes admissibles: A de 1 à A_LIMIT, R de 0 à 10 (comme /r)
+R_LIMIT = 10
+GAME_MEMORY = 64 # Jeux dont la couleur prédite et le résultat sont gardés (> A_LIMIT + R_LIMIT)
+MAX_CHANGES = 20 # Changements conservés pour /tune
+ROLLOVER_GAMES = 200 # Recul des numéros de jeu vu comme une nouvelle journée (comme STATE_HORIZON_GAMES)
+
+def validate_settings(settings: dict) -> dict:
+    """Vérifie le mode et les bornes (section `tuning` de bot_config.json). Lève ValueError si invalide."""
+    def is_int(value):
+        return isinstance(value, int) and not isinstance(value, bool)
+
+    if not isinstance(settings, dict):
+        raise ValueError(f"tuning invalide: {settings!r}")
+    mode = settings.get('mode', 'off')
+    bounds = [settings.get(key, default) for key, default in (('a_min', 1), ('a_max', 3), ('r_min', 0), ('r_max', 3))]
+    if mode not in TUNING_MODES:
+        raise ValueError(f"tuning.mode invalide ({', '.join(TUNING_MODES)}): {mode!r}")
+    if not all(is_int(value) for value in bounds):
+        raise ValueError(f"bornes de tuning invalides: {bounds!r}")
+    a_min, a_max, r_min, r_max = bounds
+    if not 1 <= a_min <= a_max <= A_LIMIT or not 0 <= r_min <= r_max <= R_LIMIT:
+        raise ValueError(f"bornes de tuning invalides: A {a_min}-{a_max} (1 à {A_LIMIT}), R {r_min}-{r_max} (0 à {R_LIMIT})")
+    return {'mode': mode, 'a_min': a_min, 'a_max': a_max, 'r_min': r_min, 'r_max': r_max}
+
+class OffsetTuner:
+    """
+    Pour chaque jeu source, la couleur que le bot a prédite est confrontée au
+    1er groupe des jeux N+A à N+A+R pour toutes les combinaisons (A, R) des
+    bornes. Quand la couleur prédite dépend de A (prédicteur par fréquences),
+    chaque valeur de A est évaluée avec la couleur qu'elle aurait prédite. Par valeur de A, un anneau des `window` derniers essais gagnants
+    (ou échec) et les compteurs associés sont mis à jour en O(1) à chaque jeu
+    finalisé: le taux de réussite de chaque combinaison se lit sans reparcourir
+    l'historique. Le score est ce taux moins `r_penalty` par essai
+    supplémentaire, pour ne pas pousser R au maximum.
+
+    Un jeu reçu en retard (récupéré après un trou, finalisé dans le désordre)
+    est évalué normalement; seul un recul de plus de `rollover_games` numéros
+    est traité comme le retour à #1 d'une nouvelle journée.
+    """
+
+    def __init__(self, window: int = 500, min_samples: int = 200, r_penalty: float = 0.05, margin: float = 0.02,
+                 rollover_games: int = ROLLOVER_GAMES):
+        self.window = window
+        self.min_samples = min_samples
+        self.r_penalty = r_penalty
+        self.margin = margin # Avance minimale du meilleur score sur le réglage actuel
+        self.rollover_games = rollover_games
+        self.mode = 'off'
+        self.a_min, self.a_max, self.r_min, self.r_max = 1, 3, 0, 3
+        self.last_change_at = None # monotonic() du dernier changement appliqué ou proposé
+        self.proposal = None # (A, R) proposé en mode 'propose'
+        self.changes = [] # [epoch, (A, R) avant, (A, R) après, taux, mode]
+        self._suits = {} # Jeu source -> code couleur prédite, ou {A: code couleur}
+        self._masks = {} # Jeu finalisé -> masque des couleurs du 1er groupe
+        self._last_game = 0
+        self._reset_counters()
+
+    def _reset_counters(self):
+        count = self.a_max - self.a_min + 1
+        # first_hit[a][k]: essais gagnés au k-ième essai (k = r_max + 1: perdu sur tout R)
+        self._first_hit = [array('l', [0]) * (self.r_max + 2) for _ in range(count)]
+        self._rings = [array('b', [0]) * self.window for _ in range(count)]
+        self._next = [0] * count
+        self._size = [0] * count
+
+    def apply_settings(self, settings: dict):
+        """Mode et bornes validés par validate_settings()."""
+        self.mode = settings['mode']
+        self.set_bounds(settings['a_min'], settings['a_max'], settings['r_min'], settings['r_max'])
+        if self.mode != 'propose':
+            self.proposal = None
+
+    def set_bounds(self, a_min: int, a_max: int, r_min: int, r_max: int):
+        """Nouvelles bornes; les compteurs repartent de zéro si elles changent."""
+        if (a_min, a_max, r_min, r_max) != (self.a_min, self.a_max, self.r_min, self.r_max):
+            self.a_min, self.a_max, self.r_min, self.r_max = a_min, a_max, r_min, r_max
+            self._reset_counters()
+            self.proposal = None
+
+    def observe_prediction(self, game_number: int, suit):
+        """
+        Couleur prédite pour un jeu source (que la prédiction soit publiée ou non):
+        un code couleur, ou {A: code couleur} si la couleur dépend de A.
+        """
+        if isinstance(suit, dict):
+            suit = {a_offset: code for a_offset, code in suit.items() if code >= 0}
+            if not suit:
+                return
+        elif suit < 0:
+            return
+        self._suits.pop(game_number, None)
+        self._suits[game_number] = suit
+        if len(self._suits) > GAME_MEMORY:
+            del self._suits[next(iter(self._suits))]
+
+    def observe_result(self, game_number: int, first_group_mask: int):
+        """Jeu finalisé: termine l'évaluation du jeu source N = jeu - A - r_max pour chaque A."""
+        if game_number < self._last_game - self.rollover_games:
+            # Nouvelle journée: les résultats de la veille ne correspondent plus aux numéros
+            self._masks.clear()
+            self._suits = {game: suit for game, suit in self._suits.items() if game <= game_number + 1}
+            self._last_game = game_number
+        elif game_number <= self._last_game - GAME_MEMORY:
+            return # Jeu en retard déjà sorti de la mémoire des jeux récents
+        else:
+            self._last_game = max(self._last_game, game_number)
+        if game_number in self._masks:
+            return
+        self._masks[game_number] = first_group_mask
+        if len(self._masks) > GAME_MEMORY:
+            del self._masks[next(iter(self._masks))]
+
+        r_max = self.r_max
+        for index, a_offset in enumerate(range(self.a_min, self.a_max + 1)):
+            source = game_number - a_offset - r_max
+            suit = self._suits.get(source)
+            if isinstance(suit, dict):
+                suit = suit.get(a_offset)
+            if suit is None:
+                continue
+            bit = 1 << suit
+            outcome = r_max + 1
+            for attempt in range(r_max + 1):
+                if self._masks.get(source + a_offset + attempt, 0) & bit:
+                    outcome = attempt
+                    break
+            self._push(index, outcome)
+
+    def _push(self, index: int, outcome: int):
+        ring, first_hit = self._rings[index], self._first_hit[index]
+        i = self._next[index]
+        if self._size[index] == self.window:
+            first_hit[ring[i]] -= 1
+        else:
+            self._size[index] += 1
+        ring[i] = outcome
+        first_hit[outcome] += 1
+        self._next[index] = (i + 1) % self.window
+
+    def samples(self) -> int:
+        return min(self._size) if self._size else 0
+
+    def rate(self, a_offset: int, r_offset: int):
+        """Taux de réussite de (A, R) sur la fenêtre (None hors bornes ou sans observation)."""
+        if not self.a_min <= a_offset <= self.a_max or not 0 <= r_offset <= self.r_max:
+            return None
+        index = a_offset - self.a_min
+        if not self._size[index]:
+            return None
+        return sum(self._first_hit[index][:r_offset + 1]) / self._size[index]
+
+    def score(self, a_offset: int, r_offset: int):
+        rate = self.rate(a_offset, r_offset)
+        return None if rate is None else rate - self.r_penalty * r_offset
+
+    def scores(self) -> list:
+        """[(A, R, taux, score)] des combinaisons des bornes, meilleur score en premier."""
+        result = []
+        for a_offset in range(self.a_min, self.a_max + 1):
+            for r_offset in range(self.r_min, self.r_max + 1):
+                rate = self.rate(a_offset, r_offset)
+                if rate is not None:
+                    result.append((a_offset, r_offset, rate, rate - self.r_penalty * r_offset))
+        result.sort(key=lambda item: item[3], reverse=True)
+        return result
+
+    def recommend(self, a_offset: int, r_offset: int):
+        """
+        Meilleure combinaison (A, R, taux) si elle dépasse le réglage actuel d'au
+        moins `margin` (ou si celui-ci est hors bornes), None sinon ou si trop peu
+        de jeux ont été évalués.
+        """
+        if self.samples() < self.min_samples:
+            return None
+        scores = self.scores()
+        if not scores:
+            return None
+        best_a, best_r, best_rate, best_score = scores[0]
+        if (best_a, best_r) == (a_offset, r_offset):
+            return None
+        current = self.score(a_offset, r_offset)
+        in_bounds = self.r_min <= r_offset <= self.r_max and current is not None
+        if in_bounds and best_score < current + self.margin:
+            return None
+        return best_a, best_r, best_rate
+
+    def cooling_down(self, interval: float, now: float = None) -> bool:
+        now = monotonic() if now is None else now
+        return self.last_change_at is not None and now - self.last_change_at < interval
+
+    def record_change(self, before: tuple, after: tuple, rate: float, now: float = None):
+        self.last_change_at = monotonic() if now is None else now
+        self.changes.append([wall_time(), list(before), list(after), rate, self.mode])
+        del self.changes[:-MAX_CHANGES]
+
+    def settings(self) -> dict:
+        """Mode et bornes (enregistrés dans bot_config.json)."""
+        return {'mode': self.mode, 'a_min': self.a_min, 'a_max': self.a_max, 'r_min': self.r_min, 'r_max': self.r_max}
+
+    def to_dict(self) -> dict:
+        """Observations de chaque anneau (de la plus ancienne à la plus récente) et jeux récents."""
+        rings = []
+        for index, ring in enumerate(self._rings):
+            start = (self._next[index] - self._size[index]) % self.window
+            rings.append([ring[(start + k) % self.window] for k in range(self._size[index])])
+        return {
+            'bounds': [self.a_min, self.a_max, self.r_min, self.r_max],
+            'rings': rings,
+            'suits': [[game, suit] for game, suit in self._suits.items()],
+            'masks': [[game, mask] for game, mask in self._masks.items()],
+            'last_game': self._last_game,
+            'changes': self.changes,
+        }
+
+    def load_dict(self, data: dict):
+        self.changes = data.get('changes', [])[-MAX_CHANGES:]
+        self._suits = {
+            game: {int(a_offset): code for a_offset, code in suit.items()} if isinstance(suit, dict) else suit
+            for game, suit in data.get('suits', [])
+        }
+        self._masks = {game: mask for game, mask in data.get('masks', [])}
+        self._last_game = data.get('last_game', 0)
+        self._reset_counters()
+        if data.get('bounds') != [self.a_min, self.a_max, self.r_min, self.r_max]:
+            return # Observations prises avec d'autres bornes
+        for index, outcomes in enumerate(data.get('rings', [])[:len(self._rings)]):
+            for outcome in outcomes[-self.window:]:
+                if 0 <= outcome <= self.r_max + 1:
+                    self._push(index, outcome)